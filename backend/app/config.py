@@ -6,12 +6,98 @@ class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
     openai_api_key: str
+    openai_base_url: str = "https://api.openai.com/v1"  # Point at benchmarks/fake_openai.py for load tests
     realtime_model: str = "gpt-4o-realtime-preview-2024-12-17"
     gpt4_model: str = "gpt-4-turbo"
     interview_duration_seconds: int = 1800  # 30 minutes
-    code_review_line_threshold: int = 5
+    interview_wrap_up_warning_seconds: int = 300  # Warn this long before the end; 0 disables
+    time_update_interval_seconds: float = 15.0  # Remaining-time push cadence; 0 disables
+    problem_catalog_dir: str = ""  # Directory of problem JSON/YAML files; empty uses the bundled bank
+    problem_catalog_max_loaded: int = 256  # Full problem bodies kept in memory
+    problem_catalog_index_path: str = ""  # Persisted index, so restarts skip unchanged files
+    code_review_line_threshold: int = 5  # Change score (per the trigger policy) that makes a review due
+    review_trigger_policy: str = "edit_distance"  # "lines", "edit_distance" or "ast"
+    review_debounce_ms: int = 1500  # Quiet period after the last edit before reviewing
+    review_min_interval_seconds: float = 20.0
+    review_max_per_session: int = 30
+    review_trigger_record_path: str = ""  # JSONL file of edits for offline replay; empty disables
+    code_review_streaming: bool = True
+    code_history_resolution_seconds: float = 1.0  # Code updates closer together are stored as one
+    code_history_max_sessions: int = 2000  # Histories kept for playback; least recently updated evicted
+    prompt_code_token_budget: int = 2000  # Longer code is windowed around recent changes
+    prompt_previous_reviews: int = 3  # Earlier reviews summarized in each prompt
     backend_port: int = 8000
     cors_origins: str = "http://localhost:3000"
+    websocket_per_message_deflate: bool = True  # Compress WebSocket frames; under plain uvicorn use --ws-per-message-deflate
+    metrics_loop_lag_interval_seconds: float = 0.5  # Event-loop lag probe period for /metrics; 0 disables
+    node_id: str = ""  # This node's name in CLUSTER_NODES; empty is the first listed node
+    cluster_nodes: str = ""  # "node-a=http://10.0.0.1:8000,node-b=http://10.0.0.2:8000"; empty runs a single node
+    event_bus: str = "memory"  # "memory" (single process) or "socket" (shared broker)
+    event_bus_address: str = "127.0.0.1:7700"  # Broker address for the socket bus
+    http2_enabled: bool = True
+    http_pool_max_connections: int = 100
+    http_pool_max_keepalive: int = 20
+    http_pool_keepalive_expiry: float = 30.0
+    openai_connect_timeout: float = 5.0
+    openai_default_timeout: float = 30.0
+    openai_review_timeout: float = 60.0
+    openai_ephemeral_key_timeout: float = 30.0
+    openai_inject_timeout: float = 10.0
+    openai_max_concurrent_requests: int = 16
+    openai_requests_per_minute: int = 500  # 0 disables the limit
+    openai_tokens_per_minute: int = 150000  # 0 disables the limit
+    openai_incremental_max_wait_ms: int = 10000  # Shed queued incremental reviews after this long
+    openai_injection_max_wait_ms: int = 5000  # Shed queued context injections after this long
+    openai_max_queue_depth: int = 200
+    upstream_adaptive_timeouts: bool = True  # Time out and hedge OpenAI calls by observed latency
+    upstream_latency_window: int = 200  # Recent latencies kept per call type
+    upstream_latency_min_samples: int = 20  # Fixed timeouts and no hedging until this many
+    upstream_timeout_multiplier: float = 2.0  # Attempt timeout = p99 x this, capped by the OPENAI_*_TIMEOUT
+    upstream_min_timeout_seconds: float = 2.0
+    upstream_hedge_percentile: float = 95.0  # Send a duplicate request once the first runs past this
+    upstream_max_hedge_ratio: float = 0.1  # Share of calls that may be hedged; 0 disables hedging
+    upstream_max_retries: int = 2
+    upstream_retry_backoff_ms: int = 500  # Doubled per retry, with jitter, unless Retry-After says otherwise
+    upstream_max_retry_after_seconds: float = 20.0  # Give up rather than wait longer than this
+    circuit_breaker_failure_threshold: int = 5  # Consecutive failures that open a breaker; 0 disables
+    circuit_breaker_reset_seconds: float = 30.0  # Fail fast this long before probing again
+    ephemeral_key_pool_size: int = 4  # 0 mints every key on demand
+    ephemeral_key_ttl_seconds: int = 600
+    ephemeral_key_min_remaining_seconds: int = 120
+    session_store: str = "memory"  # "memory" or "sqlite"
+    session_store_path: str = "sessions.db"
+    session_store_flush_interval_ms: int = 200  # Batching window for code updates; full saves are written at once
+    session_expiry_grace_seconds: int = 600  # Kept resident this long past the interview
+    session_completed_retention_seconds: int = 300  # Then compacted once COMPLETE
+    max_resident_sessions: int = 1000
+    session_archive_max_entries: int = 10000
+    session_archive_dir: str = ""  # Directory for durable archive records; empty keeps them in memory only
+    sandbox_enabled: bool = True  # Run candidate code against the problem examples locally
+    sandbox_workers: int = 2
+    sandbox_time_limit_ms: int = 1000  # Per test case
+    sandbox_memory_limit_mb: int = 256
+    sandbox_max_jobs_per_worker: int = 100  # Recycle workers after this many runs
+    complexity_estimation_enabled: bool = True  # Time the final solution at increasing input sizes
+    complexity_max_input_size: int = 16384
+    complexity_time_limit_ms: int = 2000  # Per timed run
+    complexity_size_budget_ms: int = 250  # Stop growing inputs once a run takes this long
+    complexity_cache_max_entries: int = 256
+    review_cache_max_entries: int = 1024
+    review_cache_ttl_seconds: int = 86400  # 24 hours
+    review_cache_path: str = ""  # SQLite file for the on-disk tier; empty disables it
+    response_cache_max_entries: int = 512  # Serialized /problems and in-progress /results responses
+    results_store_max_entries: int = 10000  # Finished interview reports kept in memory
+    results_store_dir: str = ""  # Directory for durable report documents; empty keeps them in memory only
+    job_queue_path: str = "jobs.db"  # SQLite file for background jobs; ":memory:" loses them on restart
+    job_workers: int = 2  # Background job worker tasks; 0 only enqueues (another process runs them)
+    job_max_attempts: int = 5
+    job_retry_backoff_seconds: float = 5.0  # Doubled after each failed attempt, with jitter
+    job_retry_backoff_max_seconds: float = 300.0
+    job_lease_seconds: float = 300.0  # A running job is cancelled, or reclaimed if its worker died, after this long
+    evaluation_jobs_enabled: bool = True  # Rate finished interviews in a background job
+    evaluation_concurrency: int = 2  # Evaluations run at once per process
+    response_compression_min_bytes: int = 1024  # Smaller responses are sent uncompressed
+    problems_cache_max_age_seconds: int = 60
 
     model_config = SettingsConfigDict(
         env_file=".env",
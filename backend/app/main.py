@@ -1,14 +1,65 @@
 """FastAPI main application."""
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings
 from app.routes import session_router, websocket_router
+from app.services import (
+    http_pool,
+    review_cache,
+    ephemeral_key_pool,
+    session_manager,
+    code_executor,
+    static_analyzer,
+    upstream_scheduler,
+    upstream_resilience,
+    prompt_builder,
+    response_cache,
+    interview_timer,
+    session_affinity,
+    event_bus,
+    metrics,
+    code_history,
+    results_store,
+    job_queue,
+)
+from app.services.metrics import loop_lag_monitor
+from app.services.upstream_resilience import OPEN
+from data.problems import catalog as problem_catalog
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown."""
+    http_pool.start()
+    ephemeral_key_pool.start()
+    session_manager.start()
+    event_bus.start()
+    interview_timer.start()
+    loop_lag_monitor.start()
+    job_queue.start()
+    if settings.sandbox_enabled:
+        await code_executor.pool.start()
+    yield
+    await job_queue.stop()
+    await loop_lag_monitor.stop()
+    await interview_timer.stop()
+    await event_bus.stop()
+    await code_executor.pool.stop()
+    await ephemeral_key_pool.stop()
+    await http_pool.close()
+    await session_manager.stop()
+
 
 app = FastAPI(
     title="AlgoView API",
     description="Backend API for AlgoView - AI-powered coding interview platform",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -24,6 +75,39 @@ app.add_middleware(
 app.include_router(session_router)
 app.include_router(websocket_router)
 
+# Metrics read from service state at scrape time
+metrics.callback(
+    "algoview_active_sessions",
+    "Active resident sessions, by interview phase.",
+    ("phase",),
+    lambda: {(phase,): count for phase, count in session_manager.phase_counts().items()},
+)
+metrics.callback(
+    "algoview_cache_lookups_total",
+    "Cache lookups, by cache and result.",
+    ("cache", "result"),
+    lambda: {
+        ("review", "hit"): review_cache.hits,
+        ("review", "disk_hit"): review_cache.disk_hits,
+        ("review", "miss"): review_cache.misses,
+        ("response", "hit"): response_cache.hits,
+        ("response", "miss"): response_cache.misses,
+        ("response", "not_modified"): response_cache.not_modified,
+        ("problem", "hit"): problem_catalog.hits,
+        ("problem", "miss"): problem_catalog.misses,
+    },
+    kind="counter",
+)
+metrics.callback(
+    "algoview_openai_circuit_open",
+    "Whether a call type's circuit breaker is open (1) or closed/probing (0).",
+    ("call",),
+    lambda: {
+        (name,): 1 if policy.breaker.state == OPEN else 0
+        for name, policy in upstream_resilience.policies.items()
+    },
+)
+
 
 @app.get("/")
 async def root():
@@ -41,6 +125,39 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/stats")
+async def service_stats():
+    """Cache and pool statistics."""
+    job_queue_stats = await asyncio.to_thread(job_queue.stats)
+    return {
+        "review_cache": review_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "results_store": results_store.stats(),
+        "job_queue": job_queue_stats,
+        "prompts": prompt_builder.stats(),
+        "http_pool": http_pool.stats(),
+        "upstream_scheduler": upstream_scheduler.stats(),
+        "upstream_resilience": upstream_resilience.stats(),
+        "ephemeral_key_pool": ephemeral_key_pool.stats(),
+        "sessions": session_manager.stats(),
+        "code_history": code_history.stats(),
+        "interview_timer": interview_timer.stats(),
+        "affinity": session_affinity.stats(),
+        "event_bus": event_bus.stats(),
+        "sandbox": code_executor.pool.stats(),
+        "static_analysis": static_analyzer.stats(),
+        "problem_catalog": problem_catalog.stats(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -48,5 +165,6 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=settings.backend_port,
+        ws_per_message_deflate=settings.websocket_per_message_deflate,
         reload=True,  # For development
     )
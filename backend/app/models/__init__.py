@@ -1,10 +1,25 @@
 from .session import InterviewSession, InterviewPhase
-from .interview import CodeReview, LLMNotes, FinalRatings
+from .interview import (
+    CodeReview,
+    ComplexityEstimate,
+    StaticAnalysis,
+    TestCaseResult,
+    TestRunResult,
+    LLMNotes,
+    FinalRatings,
+)
+from .messages import ClientMessage, ServerMessage
 
 __all__ = [
     "InterviewSession",
     "InterviewPhase",
     "CodeReview",
+    "ComplexityEstimate",
+    "StaticAnalysis",
+    "TestCaseResult",
+    "TestRunResult",
     "LLMNotes",
     "FinalRatings",
+    "ClientMessage",
+    "ServerMessage",
 ]
@@ -1,5 +1,31 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, List, Optional
+
+
+class ComplexityEstimate(BaseModel):
+    """Time complexity measured by timing the code at increasing input sizes."""
+
+    time_complexity: Optional[str] = None  # Best-fitting class, e.g. "O(n^2)"
+    exponent: Optional[float] = None  # Slope of the log-log fit
+    reference_time_complexity: Optional[str] = None  # Of the problem's optimal_solution
+    slowdown: Optional[float] = None  # Candidate time / reference time at the largest common size
+    is_optimal: Optional[bool] = None
+    sizes: List[int] = []
+    timings_ms: List[float] = []
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
+class StaticAnalysis(BaseModel):
+    """Findings from analyzing the code locally, before any LLM review."""
+
+    fingerprint: str
+    syntax_error: Optional[str] = None
+    error_line: Optional[int] = None
+    error_column: Optional[int] = None
+    findings: List[str] = []
+    functions: List[str] = []
+    max_loop_depth: int = 0
 
 
 class CodeReview(BaseModel):
@@ -13,6 +39,28 @@ class CodeReview(BaseModel):
     time_complexity: Optional[str] = None
     space_complexity: Optional[str] = None
     is_optimal: Optional[bool] = None
+    complexity_estimate: Optional[ComplexityEstimate] = None
+
+
+class TestCaseResult(BaseModel):
+    """Outcome of running the candidate's code on one test case."""
+
+    input: str
+    expected: Any
+    actual: Any = None
+    passed: bool = False
+    error: Optional[str] = None
+    duration_ms: float = 0.0
+
+
+class TestRunResult(BaseModel):
+    """Outcome of running the candidate's code against a problem's test cases."""
+
+    passed: int = 0
+    total: int = 0
+    results: List[TestCaseResult] = []
+    error: Optional[str] = None  # Set when the code couldn't be run at all
+    duration_ms: float = 0.0
 
 
 class LLMNotes(BaseModel):
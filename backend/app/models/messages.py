@@ -0,0 +1,187 @@
+"""Session WebSocket protocol: every client and server message type."""
+
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field, TypeAdapter
+from typing_extensions import TypedDict  # typing.TypedDict isn't supported by pydantic before 3.12
+
+from .interview import ComplexityEstimate, TestRunResult
+from .session import InterviewPhase
+
+
+class EditOp(TypedDict, total=False):
+    """One text edit, in UTF-16 offsets of the buffer as left by the previous op."""
+
+    start: int
+    end: int
+    text: str
+
+
+# Client -> server
+
+
+class CodeDeltaMessage(BaseModel):
+    type: Literal["code_delta"] = "code_delta"
+    base_revision: Optional[int] = None
+    ops: List[EditOp] = []
+    checksum: Optional[int] = None
+
+
+class CodeSnapshotMessage(BaseModel):
+    type: Literal["code_snapshot"] = "code_snapshot"
+    code: str = ""
+    revision: int = 0
+
+
+class CodeUpdateMessage(BaseModel):
+    """Legacy full-buffer update."""
+
+    type: Literal["code_update"] = "code_update"
+    code: str = ""
+
+
+class CodeCompleteMessage(BaseModel):
+    type: Literal["code_complete"] = "code_complete"
+
+
+class PhaseTransitionMessage(BaseModel):
+    type: Literal["phase_transition"] = "phase_transition"
+    phase: InterviewPhase
+
+
+class PingMessage(BaseModel):
+    type: Literal["ping"] = "ping"
+
+
+ClientMessage = Annotated[
+    Union[
+        CodeDeltaMessage,
+        CodeSnapshotMessage,
+        CodeUpdateMessage,
+        CodeCompleteMessage,
+        PhaseTransitionMessage,
+        PingMessage,
+    ],
+    Field(discriminator="type"),
+]
+
+client_message_adapter: TypeAdapter = TypeAdapter(ClientMessage)
+
+
+# Server -> client
+
+
+class ReviewPayload(BaseModel):
+    """Review fields sent to the client (complexity fields on final reviews only)."""
+
+    feedback: str
+    bugs: List[str] = []
+    suggestions: List[str] = []
+
+
+class FinalReviewPayload(ReviewPayload):
+    time_complexity: Optional[str] = None
+    space_complexity: Optional[str] = None
+    is_optimal: Optional[bool] = None
+    complexity_estimate: Optional[ComplexityEstimate] = None
+
+
+class ConnectedMessage(BaseModel):
+    type: Literal["connected"] = "connected"
+    session_id: str
+    phase: str
+    revision: int
+    checksum: int
+    codec: str
+    remaining_time: Optional[float] = None
+
+
+class CodeAckMessage(BaseModel):
+    type: Literal["code_ack"] = "code_ack"
+    revision: int
+
+
+class ResyncRequiredMessage(BaseModel):
+    type: Literal["resync_required"] = "resync_required"
+    revision: int
+    reason: str
+
+
+class TestResultsMessage(TestRunResult):
+    type: Literal["test_results"] = "test_results"
+    revision: int
+
+
+class ReviewDeltaMessage(BaseModel):
+    type: Literal["review_delta"] = "review_delta"
+    review_id: int
+    is_final: bool
+    section: str
+    text: str
+
+
+class ReviewTriggeredMessage(BaseModel):
+    type: Literal["review_triggered"] = "review_triggered"
+    line_count: int
+    review: ReviewPayload
+
+
+class FinalReviewMessage(BaseModel):
+    type: Literal["final_review"] = "final_review"
+    review: FinalReviewPayload
+
+
+class PhaseUpdatedMessage(BaseModel):
+    type: Literal["phase_updated"] = "phase_updated"
+    phase: str
+
+
+class TimeUpdateMessage(BaseModel):
+    type: Literal["time_update"] = "time_update"
+    remaining: float
+
+
+class DeadlineMessage(BaseModel):
+    """A phase deadline fired: "wrap_up" (time is nearly up) or "expired"."""
+
+    type: Literal["deadline"] = "deadline"
+    event: str
+    remaining: float
+
+
+class JobUpdateMessage(BaseModel):
+    """A background job for the session changed status (see job_queue)."""
+
+    type: Literal["job_update"] = "job_update"
+    job_id: int
+    kind: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+
+
+class PongMessage(BaseModel):
+    type: Literal["pong"] = "pong"
+    remaining_time: Optional[float] = None
+
+
+class ErrorMessage(BaseModel):
+    type: Literal["error"] = "error"
+    message: str
+
+
+ServerMessage = Union[
+    ConnectedMessage,
+    CodeAckMessage,
+    ResyncRequiredMessage,
+    TestResultsMessage,
+    ReviewDeltaMessage,
+    ReviewTriggeredMessage,
+    FinalReviewMessage,
+    PhaseUpdatedMessage,
+    TimeUpdateMessage,
+    DeadlineMessage,
+    JobUpdateMessage,
+    PongMessage,
+    ErrorMessage,
+]
@@ -27,6 +27,8 @@ class InterviewSession(BaseModel):
     code: str = ""
     line_count: int = 0
     last_review_line: int = 0
+    last_review_fingerprint: Optional[str] = None
+    last_reviewed_code: str = ""
     llm_notes: Dict[str, List[str]] = {
         "clarifying_questions": [],
         "technical_skills": [],
@@ -34,6 +36,7 @@ class InterviewSession(BaseModel):
         "concerns": [],
     }
     code_reviews: List[Dict] = []
+    test_results: Optional[Dict] = None
     final_ratings: Optional[Dict] = None
     realtime_session_id: Optional[str] = None
     is_active: bool = True
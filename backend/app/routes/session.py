@@ -1,11 +1,26 @@
 """Session management endpoints."""
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
-from app.services import session_manager, openai_client
-from data.problems import get_problem, get_all_problems
+from app.config import settings
+from app.services import (
+    session_manager,
+    ephemeral_key_pool,
+    response_cache,
+    interview_timer,
+    session_affinity,
+    code_history,
+    results_store,
+    job_queue,
+)
+from app.services.results_store import build_results
+from data.problems import catalog, get_problem, list_problems as list_problem_summaries
 
 router = APIRouter(prefix="/api/session", tags=["session"])
 
@@ -18,6 +33,15 @@ class CreateSessionResponse(BaseModel):
     problem: Dict[str, Any]
 
 
+class SessionRouteResponse(BaseModel):
+    """Response for session routing."""
+
+    session_id: str
+    node_id: str
+    url: Optional[str]
+    local: bool
+
+
 class SessionStatusResponse(BaseModel):
     """Response for session status."""
 
@@ -46,11 +70,12 @@ async def create_session(problem_id: str = "two-sum"):
         raise HTTPException(status_code=404, detail="Problem not found")
 
     # Create session
-    session = session_manager.create_session(problem_id)
+    session = await session_manager.create_session(problem_id)
 
-    # Generate ephemeral key for Realtime API
+    # Take a pre-minted ephemeral key for Realtime API (minted on demand if
+    # the pool is empty)
     try:
-        ephemeral_response = await openai_client.create_ephemeral_key()
+        ephemeral_response = await ephemeral_key_pool.acquire()
         ephemeral_key = ephemeral_response.get("value")
 
         if not ephemeral_key:
@@ -61,14 +86,18 @@ async def create_session(problem_id: str = "two-sum"):
         # Store realtime session reference (if available in response)
         if "session_id" in ephemeral_response:
             session.realtime_session_id = ephemeral_response["session_id"]
+            session_manager.save_session(session)
 
     except Exception as e:
         # Clean up session if ephemeral key creation fails
-        session_manager.delete_session(session.session_id)
+        await session_manager.delete_session(session.session_id)
         raise HTTPException(
             status_code=500, detail=f"Failed to create session: {str(e)}"
         )
 
+    # Deadlines fire even if the client never connects
+    interview_timer.track(session.session_id, session.start_time)
+
     return CreateSessionResponse(
         session_id=session.session_id, ephemeral_key=ephemeral_key, problem=problem
     )
@@ -79,12 +108,12 @@ async def get_session_status(session_id: str):
     """Get current session status."""
     from app.services import interview_orchestrator
 
-    session = session_manager.get_session(session_id)
+    session = await session_manager.load_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    elapsed = interview_orchestrator.get_elapsed_time(session_id)
-    remaining = interview_orchestrator.get_remaining_time(session_id)
+    elapsed = await interview_orchestrator.get_elapsed_time(session_id)
+    remaining = await interview_orchestrator.get_remaining_time(session_id)
 
     return SessionStatusResponse(
         session_id=session.session_id,
@@ -97,33 +126,151 @@ async def get_session_status(session_id: str):
     )
 
 
+@router.get("/route/{session_id}", response_model=SessionRouteResponse)
+async def get_session_route(session_id: str):
+    """
+    Which node owns a session (by consistent hash of its id), for load
+    balancers and clients to send its WebSocket there. `url` is null when no
+    cluster is configured.
+    """
+    return SessionRouteResponse(
+        session_id=session_id,
+        node_id=session_affinity.owner(session_id),
+        url=session_affinity.owner_url(session_id),
+        local=session_affinity.is_local(session_id),
+    )
+
+
+@router.get("/results/export")
+async def export_results(ids: str):
+    """
+    Stream finished interviews' reports as newline-delimited JSON, one
+    stored document per line (no re-rendering). `ids` is a comma-separated
+    list of session ids; like the per-session results endpoint, a report is
+    only served to a caller who knows its session id.
+    """
+    session_ids = [part.strip() for part in ids.split(",") if part.strip()]
+    if not session_ids:
+        raise HTTPException(status_code=400, detail="No session ids given")
+    return StreamingResponse(
+        results_store.export(session_ids), media_type="application/x-ndjson"
+    )
+
+
 @router.get("/results/{session_id}")
-async def get_session_results(session_id: str):
-    """Get final interview results."""
-    session = session_manager.get_session(session_id)
+async def get_session_results(session_id: str, request: Request):
+    """
+    Get final interview results.
+
+    Finished interviews are served from their materialized report (built
+    once when the session reached evaluation). Sessions still in progress
+    are rendered through the response cache until the session is next
+    saved. Either way, polls with If-None-Match get a 304 while nothing
+    changed.
+    """
+    document = results_store.get(session_id)
+    if document is not None:
+        return response_cache.send(request, document, cache_control="private, no-cache")
+
+    session = await session_manager.load_session(
+        session_id
+    ) or session_manager.get_archived_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    problem = get_problem(session.problem_id)
+    return response_cache.respond(
+        request,
+        key=f"results:{session_id}",
+        version=f"{session_manager.revision(session_id)}:{catalog.version}",
+        build=lambda: build_results(session),
+        cache_control="private, no-cache",
+    )
 
-    # Get the final review from code_reviews
-    final_review = None
-    for review in session.code_reviews:
-        if review.get("is_final"):
-            final_review = review
-            break
 
-    return {
-        "session_id": session.session_id,
-        "problem": problem,
-        "candidate_code": session.code,
-        "final_review": final_review,
-        "llm_notes": session.llm_notes,
-        "final_ratings": session.final_ratings,
-    }
+@router.get("/jobs/{session_id}")
+async def get_session_jobs(session_id: str):
+    """
+    Background jobs for a session (such as the post-interview evaluation)
+    with their status: queued, running, succeeded or failed. Connected
+    clients also get a job_update message on every change.
+    """
+    jobs = await asyncio.to_thread(job_queue.jobs_for_session, session_id)
+    if not jobs and not (
+        await session_manager.load_session(session_id)
+        or session_manager.get_archived_session(session_id)
+    ):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session_id": session_id, "jobs": jobs}
+
+
+async def _code_history(session_id: str):
+    """A session's code history and the time its offsets count from."""
+    history = code_history.get(session_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail="No code history for session")
+    session = await session_manager.load_session(
+        session_id
+    ) or session_manager.get_archived_session(session_id)
+    return history, session.start_time if session else history.start_time
+
+
+@router.get("/history/{session_id}")
+async def stream_code_history(session_id: str):
+    """
+    Stream the evolution of the candidate's code for timeline playback, as
+    newline-delimited JSON: {"type": "keyframe", "t", "code"} resets the
+    code, {"type": "edit", "t", "start", "end", "text"} replaces the
+    characters (code points) from start to end. `t` is seconds since the
+    session started.
+    """
+    history, origin = await _code_history(session_id)
+
+    def lines():
+        for event in history.events():
+            event["t"] = round(event["t"] - origin, 3)
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/history/{session_id}/at")
+async def get_code_at(session_id: str, t: float = Query(..., ge=0)):
+    """The candidate's code `t` seconds into the session."""
+    history, origin = await _code_history(session_id)
+
+    return {"session_id": session_id, "t": t, "code": history.at(origin + t) or ""}
 
 
 @router.get("/problems")
-async def list_problems():
-    """List all available problems."""
-    return {"problems": get_all_problems()}
+async def list_problems(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    difficulty: Optional[str] = None,
+    tag: Optional[str] = None,
+    q: Optional[str] = None,
+):
+    """
+    List problems, easiest first, as summaries (id, title, difficulty, tags).
+    Filter by difficulty, tag, or a title substring `q`; fetch full problems
+    by creating a session.
+    """
+
+    def build() -> Dict[str, Any]:
+        total, summaries = list_problem_summaries(
+            offset, limit, difficulty=difficulty, tag=tag, query=q
+        )
+        return {
+            "problems": [summary.to_dict() for summary in summaries],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
+
+    return response_cache.respond(
+        request,
+        key=f"problems:{offset}:{limit}:{difficulty}:{tag}:{q}",
+        version=catalog.version,
+        build=build,
+        cache_control=f"public, max-age={settings.problems_cache_max_age_seconds}",
+    )
@@ -1,10 +1,23 @@
 """WebSocket endpoint for code updates and real-time communication."""
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, Any
-import json
 
-from app.services import session_manager, interview_orchestrator
+from app.models.messages import ConnectedMessage, ErrorMessage
+from app.services import (
+    session_manager,
+    interview_orchestrator,
+    interview_timer,
+    event_bus,
+    SessionActor,
+)
+from app.services.event_bus import session_channel
+from app.services.metrics import websocket_connections
+from app.services.message_codec import (
+    DEFAULT_CODEC,
+    MessageChannel,
+    MessageError,
+    negotiate_codec,
+)
 
 router = APIRouter(tags=["websocket"])
 
@@ -14,118 +27,89 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """
     WebSocket endpoint for real-time code updates and state synchronization.
 
+    The wire codec is negotiated through the WebSocket subprotocol: clients
+    offer any of "algoview.msgpack", "algoview.orjson" (binary frames) and
+    "algoview.json" in order of preference. Without a subprotocol, messages
+    are JSON text frames. Message schemas live in app/models/messages.py.
+
+    The connection is subscribed to the session's event-bus channel, so
+    reviews, phase changes and timer pushes reach it whichever node produced
+    them (see /api/session/route/{session_id} for the owner node).
+
     Client sends:
-        - type: "code_update", code: str, line_count: int
+        - type: "code_delta", base_revision: int, ops: [{start, end, text}], checksum: int
+        - type: "code_snapshot", code: str, revision: int
+        - type: "code_update", code: str (legacy full-buffer update)
         - type: "code_complete"
-        - type: "phase_transition", phase: str
+        - type: "phase_transition", phase: str (an InterviewPhase value)
+        - type: "ping"
 
     Server sends:
+        - type: "connected", session_id: str, phase: str, revision: int, checksum: int, codec: str, remaining_time: float | None
+        - type: "code_ack", revision: int
+        - type: "resync_required", revision: int, reason: str
+        - type: "test_results", revision: int, passed: int, total: int, results: [TestCaseResult], error: str | None
+        - type: "review_delta", review_id: int, is_final: bool, section: str, text: str
         - type: "review_triggered", review: CodeReview
+        - type: "final_review", review: CodeReview
         - type: "phase_updated", phase: str
-        - type: "time_update", remaining: float
+        - type: "pong", remaining_time: float | None
+        - type: "time_update", remaining: float (pushed every TIME_UPDATE_INTERVAL_SECONDS)
+        - type: "deadline", event: "wrap_up" | "expired", remaining: float
         - type: "error", message: str
     """
-    await websocket.accept()
+    codec = negotiate_codec(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=codec.subprotocol if codec else None)
+    channel = MessageChannel(websocket, codec or DEFAULT_CODEC)
 
     # Verify session exists
-    session = session_manager.get_session(session_id)
+    session = await session_manager.load_session(session_id)
     if not session:
-        await websocket.send_json({"type": "error", "message": "Session not found"})
+        await channel.send(ErrorMessage(message="Session not found"))
         await websocket.close()
         return
 
+    actor = SessionActor(session, channel.send)
+    interview_timer.track(session_id, session.start_time)
+    remaining = interview_timer.remaining(session_id)
+    if remaining is None:
+        remaining = await interview_orchestrator.get_remaining_time(session_id)
+    unsubscribe = None
+    websocket_connections.inc()
+
     try:
         # Send initial connection success
-        await websocket.send_json(
-            {
-                "type": "connected",
-                "session_id": session_id,
-                "phase": session.current_phase,
-            }
+        await actor.reply(
+            ConnectedMessage(
+                session_id=session_id,
+                phase=session.current_phase,
+                revision=actor.buffer.revision,
+                checksum=actor.buffer.checksum,
+                codec=channel.codec.name,
+                remaining_time=remaining,
+            )
         )
 
-        while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-            message: Dict[str, Any] = json.loads(data)
-
-            message_type = message.get("type")
-
-            if message_type == "code_update":
-                # Handle code update
-                code = message.get("code", "")
-                line_count = message.get("line_count", 0)
-
-                review = await interview_orchestrator.handle_code_update(
-                    session_id, code, line_count
-                )
-
-                if review:
-                    # Review was triggered
-                    await websocket.send_json(
-                        {
-                            "type": "review_triggered",
-                            "line_count": line_count,
-                            "review": {
-                                "feedback": review.feedback,
-                                "bugs": review.bugs,
-                                "suggestions": review.suggestions,
-                            },
-                        }
-                    )
+        unsubscribe = event_bus.subscribe(session_channel(session_id), channel.send_payload)
+        actor.start()
 
-            elif message_type == "code_complete":
-                # Handle code completion
-                final_review = await interview_orchestrator.handle_code_completion(
-                    session_id
-                )
-
-                if final_review:
-                    await websocket.send_json(
-                        {
-                            "type": "final_review",
-                            "review": {
-                                "feedback": final_review.feedback,
-                                "bugs": final_review.bugs,
-                                "suggestions": final_review.suggestions,
-                                "time_complexity": final_review.time_complexity,
-                                "space_complexity": final_review.space_complexity,
-                                "is_optimal": final_review.is_optimal,
-                            },
-                        }
-                    )
-
-                    # Update phase
-                    await websocket.send_json(
-                        {"type": "phase_updated", "phase": "evaluation"}
-                    )
-
-            elif message_type == "phase_transition":
-                # Handle phase transition
-                new_phase = message.get("phase")
-                session.current_phase = new_phase
-
-                await websocket.send_json(
-                    {"type": "phase_updated", "phase": new_phase}
-                )
-
-            elif message_type == "ping":
-                # Heartbeat
-                remaining = interview_orchestrator.get_remaining_time(session_id)
-                await websocket.send_json(
-                    {"type": "pong", "remaining_time": remaining}
-                )
-
-            else:
-                await websocket.send_json(
-                    {"type": "error", "message": f"Unknown message type: {message_type}"}
-                )
+        while True:
+            # Receive message from client and hand it to the session actor;
+            # reviews run in the background so this loop never waits on GPT
+            try:
+                message = await channel.receive()
+            except MessageError as e:
+                await actor.reply(ErrorMessage(message=str(e)))
+                continue
+            actor.post(message)
 
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for session {session_id}")
     except Exception as e:
         print(f"WebSocket error for session {session_id}: {e}")
-        await websocket.send_json({"type": "error", "message": str(e)})
+        await actor.reply(ErrorMessage(message=str(e)))
     finally:
-        # Clean up could go here if needed
-        pass
+        websocket_connections.dec()
+        if unsubscribe:
+            unsubscribe()
+        await actor.stop()
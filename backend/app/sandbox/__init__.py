@@ -0,0 +1,5 @@
+"""Sandboxed execution of candidate code in worker processes."""
+
+from .pool import SandboxPool, SandboxWorker
+
+__all__ = ["SandboxPool", "SandboxWorker"]
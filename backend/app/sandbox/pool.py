@@ -0,0 +1,224 @@
+"""Warm pool of sandbox worker processes."""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+
+# The whole environment a worker sees; nothing is inherited from the server
+WORKER_ENV = {"PATH": "/usr/bin:/bin", "LANG": "C.UTF-8"}
+
+# Strings shaped like API keys, scrubbed from results even if not configured
+SECRET_PATTERN = re.compile(r"sk-[A-Za-z0-9_\-]{16,}")
+REDACTED = "[redacted]"
+
+
+class SandboxWorker:
+    """One worker subprocess speaking JSON lines over stdin/stdout."""
+
+    def __init__(self, process: asyncio.subprocess.Process, workdir: str):
+        self.process = process
+        self.workdir = workdir
+        self.jobs = 0
+
+    @classmethod
+    async def spawn(cls, memory_limit_mb: int) -> "SandboxWorker":
+        # An empty working directory, so relative paths (.env, sessions.db) miss
+        workdir = tempfile.mkdtemp(prefix="algoview-sandbox-")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-I",  # Isolated: ignores PYTHON* variables and the user's site-packages
+                WORKER_SCRIPT,
+                str(memory_limit_mb),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=dict(WORKER_ENV),
+                cwd=workdir,
+            )
+        except Exception:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+        worker = cls(process, workdir)
+        try:
+            await worker._read()  # Wait for the ready line
+        except Exception:
+            worker.kill()
+            raise
+        return worker
+
+    async def run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        self.jobs += 1
+        self.process.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        return await self._read()
+
+    async def _read(self) -> Dict[str, Any]:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Sandbox worker exited")
+        return json.loads(line)
+
+    def kill(self) -> None:
+        if self.process.returncode is None:
+            self.process.kill()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class SandboxPool:
+    """
+    Pre-started sandbox workers, so running candidate code costs an IPC round
+    trip instead of an interpreter start-up.
+
+    Workers are recycled after `max_jobs_per_worker` jobs or after a job
+    that changed interpreter-wide state, and killed and replaced when a job
+    overruns its wall-clock timeout or crashes the process. Replacement
+    happens in the background.
+
+    Results are scrubbed before they leave the pool: any of `secrets`, or
+    anything shaped like an API key, is replaced in returned strings.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        memory_limit_mb: int = 256,
+        max_jobs_per_worker: int = 100,
+        secrets: Iterable[str] = (),
+    ):
+        self.size = size
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.secrets = [secret for secret in secrets if secret]
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[SandboxWorker] = []
+        self._spawning: set = set()
+
+        self.jobs = 0
+        self.timeouts = 0
+        self.crashes = 0
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """Start the workers."""
+        if self.started:
+            return
+        self._idle = asyncio.Queue()
+        workers = await asyncio.gather(
+            *(SandboxWorker.spawn(self.memory_limit_mb) for _ in range(self.size)),
+            return_exceptions=True,
+        )
+        for worker in workers:
+            if isinstance(worker, Exception):
+                print(f"Failed to start sandbox worker: {worker}")
+                self._replace(None)
+            else:
+                self._workers.append(worker)
+                self._idle.put_nowait(worker)
+
+    async def stop(self) -> None:
+        """Kill all workers."""
+        for task in list(self._spawning):
+            task.cancel()
+        for worker in self._workers:
+            worker.kill()
+        for worker in self._workers:
+            try:
+                await worker.process.wait()
+            except Exception:
+                pass
+        self._workers = []
+        self._idle = None
+
+    async def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Run a job on the next free worker, waiting for one if all are busy."""
+        if not self.started:
+            await self.start()
+
+        worker: SandboxWorker = await self._idle.get()
+        self.jobs += 1
+        started = time.perf_counter()
+
+        try:
+            result = await asyncio.wait_for(worker.run(job), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._replace(worker)
+            return {"ok": False, "error": f"Execution timed out after {timeout:.1f}s"}
+        except asyncio.CancelledError:
+            # The worker may be mid-job; don't hand it to anyone else
+            self._replace(worker)
+            raise
+        except Exception as e:
+            self.crashes += 1
+            self._replace(worker)
+            return {"ok": False, "error": f"Sandbox worker crashed: {e}"}
+
+        result = self._redact(result)
+        result["wall_ms"] = (time.perf_counter() - started) * 1000
+
+        if result.pop("recycle", False) or worker.jobs >= self.max_jobs_per_worker:
+            self._replace(worker)
+        else:
+            self._idle.put_nowait(worker)
+        return result
+
+    def _redact(self, value: Any) -> Any:
+        """Copy of a worker response with secrets blanked out of every string."""
+        if isinstance(value, str):
+            for secret in self.secrets:
+                value = value.replace(secret, REDACTED)
+            return SECRET_PATTERN.sub(REDACTED, value)
+        if isinstance(value, dict):
+            return {key: self._redact(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._redact(item) for item in value]
+        return value
+
+    def _replace(self, worker: Optional[SandboxWorker]) -> None:
+        """Kill a worker and start its replacement in the background."""
+        if worker is not None:
+            worker.kill()
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+        task = asyncio.create_task(self._spawn_replacement())
+        self._spawning.add(task)
+        task.add_done_callback(self._spawning.discard)
+
+    async def _spawn_replacement(self) -> None:
+        try:
+            worker = await SandboxWorker.spawn(self.memory_limit_mb)
+        except Exception as e:
+            print(f"Failed to start sandbox worker: {e}")
+            await asyncio.sleep(1)
+            self._replace(None)
+            return
+
+        if self._idle is None:
+            worker.kill()
+            return
+        self._workers.append(worker)
+        self._idle.put_nowait(worker)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "size": self.size,
+            "jobs": self.jobs,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+        }
@@ -0,0 +1,373 @@
+"""
+Sandbox worker process.
+
+Runs as a standalone script (`python -I worker.py`) so it never imports the
+application. Reads one JSON job per line from stdin and writes one JSON
+result per line to a private copy of stdout; the candidate's own output goes
+to /dev/null. Only the standard library may be used here.
+
+Isolation: resource limits, per-test alarms, and an audit hook that denies
+sockets, subprocesses and file access outside the worker's own temporary
+directory (reads of the standard library excepted). The parent process enforces the wall-clock limit by killing
+workers that stop responding, starts workers with an empty environment in an
+empty directory, and recycles a worker after any job that changed
+interpreter-wide state (builtins or loaded modules), so one submission can't
+affect the next.
+"""
+
+import builtins
+import gc
+import json
+import os
+import random
+import resource
+import signal
+import sys
+import time
+from typing import Any, Callable, Dict, Tuple
+
+# Longest repr of a non-JSON return value sent back to the parent
+MAX_REPR_CHARS = 1000
+
+
+class TestTimeout(Exception):
+    """Raised inside candidate code when a single test runs out of time."""
+
+
+def _on_alarm(signum, frame):
+    raise TestTimeout()
+
+
+# Audit events that reach outside the process; denied outright
+DENIED_EVENTS = (
+    "socket.",
+    "subprocess.Popen",
+    "os.exec",
+    "os.system",
+    "os.fork",
+    "os.forkpty",
+    "os.posix_spawn",
+    "os.spawn",
+    "os.kill",
+    "os.killpg",
+    "os.chdir",
+    "signal.pthread_kill",
+    "ctypes.",
+    "sys.addaudithook",
+)
+
+# Audit events whose leading arguments are file system paths
+PATH_EVENTS = {
+    "os.listdir": 1,
+    "os.scandir": 1,
+    "os.remove": 1,
+    "os.rmdir": 1,
+    "os.mkdir": 1,
+    "os.chmod": 1,
+    "os.chown": 1,
+    "os.truncate": 1,
+    "os.utime": 1,
+    "os.rename": 2,
+    "os.link": 2,
+    "os.symlink": 2,
+    "shutil.rmtree": 1,
+    "shutil.copyfile": 2,
+    "shutil.move": 2,
+}
+
+
+def _inside(path: Any, roots: Tuple[str, ...]) -> bool:
+    if isinstance(path, bytes):
+        path = os.fsdecode(path)
+    if not isinstance(path, str):
+        return False  # File descriptors, including the protocol pipe
+    path = os.path.realpath(path)
+    return any(path == root or path.startswith(root + os.sep) for root in roots)
+
+
+def _audit_hook(workdir: str, import_roots: Tuple[str, ...]) -> Callable:
+    """
+    Deny network, process and file access outside the working directory.
+    Read-only opens are also allowed under the import path, so candidate code
+    can still import the standard library.
+    """
+    writable = (workdir,)
+    readable = writable + import_roots
+
+    def hook(event: str, args: Tuple[Any, ...]) -> None:
+        if event.startswith(DENIED_EVENTS):
+            raise PermissionError(f"{event} is not allowed in the sandbox")
+        if event == "open":
+            path, mode, flags = args
+            writing = any(c in (mode or "") for c in "wax+") or flags & (
+                os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+            )
+            if not _inside(path, writable if writing else readable):
+                raise PermissionError(f"Access to {path!r} is not allowed in the sandbox")
+        elif event in PATH_EVENTS:
+            for path in args[: PATH_EVENTS[event]]:
+                roots = readable if event in ("os.listdir", "os.scandir") else writable
+                if not _inside(path, roots):
+                    raise PermissionError(
+                        f"Access to {path!r} is not allowed in the sandbox"
+                    )
+
+    return hook
+
+
+def _lock_down(memory_limit_mb: int) -> None:
+    """
+    Apply resource limits, then install an audit hook that denies network,
+    process and outside file access for the rest of the worker's life. Audit
+    hooks can't be removed, and they see the low-level calls (`_socket`,
+    `os.open`) that replacing module attributes would miss.
+    """
+    memory = memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    try:
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    except (ValueError, OSError):
+        pass
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    signal.signal(signal.SIGALRM, _on_alarm)
+
+    sys.dont_write_bytecode = True
+    import_roots = tuple(
+        os.path.realpath(path) for path in sys.path if path and os.path.exists(path)
+    )
+    sys.addaudithook(_audit_hook(os.path.realpath(os.getcwd()), import_roots))
+
+
+def _describe(value: Any) -> Any:
+    """JSON-safe rendering of a return value for reporting."""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        text = repr(value)
+        if len(text) > MAX_REPR_CHARS:
+            text = text[:MAX_REPR_CHARS] + "..."
+        return text
+
+
+_PRISTINE_BUILTINS: Dict[str, Any] = {}
+
+
+def _fingerprint() -> Dict[str, Tuple[Any, Dict[str, int]]]:
+    """Identity of every loaded module and of each of its attributes."""
+    return {
+        name: (module, {key: id(value) for key, value in list(vars(module).items())})
+        for name, module in list(sys.modules.items())
+        if module is not None
+    }
+
+
+def _tampered(baseline: Dict[str, Tuple[Any, Dict[str, int]]]) -> bool:
+    """
+    Whether a job changed shared interpreter state. Modules imported since
+    the baseline are dropped so the next job imports them afresh; a baseline
+    module that was replaced, or had an attribute rebound or removed, means
+    the worker must be recycled.
+    """
+    for name in list(sys.modules):
+        if name not in baseline:
+            del sys.modules[name]
+    for name, (module, attributes) in baseline.items():
+        if sys.modules.get(name) is not module:
+            return True
+        current = vars(module)
+        for key, identity in attributes.items():
+            if key not in current or id(current[key]) != identity:
+                return True
+    return False
+
+
+def _normalize(value: Any, unordered: bool) -> Any:
+    if isinstance(value, tuple):
+        value = list(value)
+    if unordered and isinstance(value, list):
+        try:
+            return sorted(value)
+        except TypeError:
+            return value
+    return value
+
+
+def _load_function(code: str, function_name: str) -> Callable:
+    # A private copy, so rebinding a builtin only affects this job
+    namespace: Dict[str, Any] = {
+        "__name__": "__candidate__",
+        "__builtins__": dict(_PRISTINE_BUILTINS),
+    }
+    exec(compile(code, "<candidate>", "exec"), namespace)
+
+    function = namespace.get(function_name)
+    if function is None:
+        # Class-based solutions (LeetCode style)
+        solution = namespace.get("Solution")
+        if solution is not None:
+            function = getattr(solution(), function_name, None)
+    if not callable(function):
+        raise NameError(f"Function '{function_name}' is not defined")
+    return function
+
+
+def _call_with_limit(function: Callable, test: Dict[str, Any], time_limit: float):
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        return function(*test.get("args", []), **test.get("kwargs", {}))
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def run_tests(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the candidate's function against each test case."""
+    started = time.perf_counter()
+    time_limit = job.get("time_limit", 1.0)
+
+    try:
+        function = _load_function(job["code"], job["function_name"])
+    except SyntaxError as e:
+        return {"ok": False, "error": f"SyntaxError: {e.msg} (line {e.lineno})"}
+    except BaseException as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    results = []
+    for test in job["tests"]:
+        test_started = time.perf_counter()
+        result: Dict[str, Any] = {"passed": False}
+        try:
+            actual = _call_with_limit(function, test, time_limit)
+            unordered = test.get("unordered", False)
+            result["actual"] = _describe(actual)
+            result["passed"] = _normalize(actual, unordered) == _normalize(
+                test["expected"], unordered
+            )
+        except TestTimeout:
+            result["error"] = f"Time limit exceeded ({time_limit:.2f}s)"
+        except MemoryError:
+            result["error"] = "Memory limit exceeded"
+        except RecursionError:
+            result["error"] = "RecursionError: maximum recursion depth exceeded"
+        except BaseException as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["duration_ms"] = (time.perf_counter() - test_started) * 1000
+        results.append(result)
+
+    return {
+        "ok": True,
+        "results": results,
+        "duration_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def _generate_value(spec: Dict[str, Any], size: int, rng: random.Random) -> Any:
+    kind = spec["kind"]
+    if kind == "int":
+        return rng.randint(spec["lo"], spec["hi"])
+    if kind == "int_list":
+        return [rng.randint(spec["lo"], spec["hi"]) for _ in range(size)]
+    if kind == "str":
+        alphabet = spec.get("alphabet", "abcdefghijklmnopqrstuvwxyz")
+        return "".join(rng.choice(alphabet) for _ in range(size))
+    return spec.get("value")
+
+
+def _copy(value: Any) -> Any:
+    """Fresh copy of a generated input, so in-place mutation can't skew repeats."""
+    return list(value) if isinstance(value, list) else value
+
+
+def benchmark(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Time the function on generated inputs of increasing size.
+
+    Each size is run up to `repeats` times (fewer once `budget` seconds have
+    been spent on it) and the fastest run is kept. Sizes stop growing once
+    a run takes longer than `budget`, or at the first run over `time_limit`.
+    """
+    time_limit = job.get("time_limit", 2.0)
+    budget = job.get("budget", 0.25)
+    repeats = job.get("repeats", 3)
+
+    try:
+        function = _load_function(job["code"], job["function_name"])
+    except SyntaxError as e:
+        return {"ok": False, "error": f"SyntaxError: {e.msg} (line {e.lineno})"}
+    except BaseException as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    rng = random.Random(job.get("seed", 0))
+    samples = []
+    timed_out = False
+
+    gc.disable()
+    try:
+        for size in job["sizes"]:
+            inputs = {
+                name: _generate_value(spec, size, rng)
+                for name, spec in job["params"].items()
+            }
+
+            runs = []
+            while len(runs) < repeats and sum(runs) < budget:
+                kwargs = {name: _copy(value) for name, value in inputs.items()}
+                started = time.perf_counter()
+                try:
+                    _call_with_limit(function, {"kwargs": kwargs}, time_limit)
+                except TestTimeout:
+                    timed_out = True
+                    break
+                except BaseException as e:
+                    return {"ok": False, "error": f"{type(e).__name__} at n={size}: {e}"}
+                runs.append(time.perf_counter() - started)
+
+            if timed_out:
+                break
+            samples.append({"size": size, "seconds": min(runs)})
+            if min(runs) > budget:
+                break
+    finally:
+        gc.enable()
+
+    return {"ok": True, "samples": samples, "timed_out": timed_out}
+
+
+OPERATIONS = {
+    "run_tests": run_tests,
+    "benchmark": benchmark,
+}
+
+
+def main() -> None:
+    memory_limit_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+
+    # Keep a private handle for results; candidate prints go to /dev/null
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+    _lock_down(memory_limit_mb)
+    _PRISTINE_BUILTINS.update(vars(builtins))
+    baseline = _fingerprint()
+    protocol.write(json.dumps({"ready": True}) + "\n")
+
+    for line in sys.stdin:
+        try:
+            job = json.loads(line)
+            operation = OPERATIONS[job["op"]]
+            response = operation(job)
+        except BaseException as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        sys.setrecursionlimit(1000)
+        if _tampered(baseline):
+            response["recycle"] = True
+        protocol.write(json.dumps(response) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,78 @@
+from .session_store import SessionStore, InMemorySessionStore, SQLiteSessionStore
+from .session_archive import SessionArchive
+from .code_history import CodeHistoryStore, code_history
+from .session_affinity import SessionAffinity, session_affinity
+from .event_bus import EventBus, event_bus
+from .results_store import ResultsStore, results_store
 from .session_manager import SessionManager, session_manager
+from .metrics import MetricsRegistry, metrics
+from .http_pool import HTTPPool, http_pool
+from .upstream_scheduler import UpstreamScheduler, upstream_scheduler
+from .upstream_resilience import UpstreamResilience, upstream_resilience
+from .review_cache import ReviewCache, review_cache
+from .response_cache import ResponseCache, response_cache
+from .prompt_builder import PromptBuilder, prompt_builder
 from .openai_client import OpenAIClient, openai_client
+from .ephemeral_key_pool import EphemeralKeyPool, ephemeral_key_pool
+from .code_executor import CodeExecutor, code_executor
+from .complexity_estimator import ComplexityEstimator, complexity_estimator
+from .review_triggers import ReviewTrigger, TriggerPolicy, review_trigger
+from .static_analyzer import StaticAnalyzer, static_analyzer
+from .job_queue import JobQueue, job_queue
 from .code_reviewer import CodeReviewer, code_reviewer
 from .interview_orchestrator import InterviewOrchestrator, interview_orchestrator
+from .interview_timer import InterviewTimer, interview_timer
+from .session_actor import SessionActor
 
 __all__ = [
+    "SessionStore",
+    "InMemorySessionStore",
+    "SQLiteSessionStore",
+    "SessionArchive",
+    "CodeHistoryStore",
+    "code_history",
+    "SessionAffinity",
+    "session_affinity",
+    "EventBus",
+    "event_bus",
+    "ResultsStore",
+    "results_store",
     "SessionManager",
     "session_manager",
+    "MetricsRegistry",
+    "metrics",
+    "HTTPPool",
+    "http_pool",
+    "UpstreamScheduler",
+    "upstream_scheduler",
+    "UpstreamResilience",
+    "upstream_resilience",
+    "ReviewCache",
+    "review_cache",
+    "ResponseCache",
+    "response_cache",
+    "PromptBuilder",
+    "prompt_builder",
     "OpenAIClient",
     "openai_client",
+    "EphemeralKeyPool",
+    "ephemeral_key_pool",
+    "CodeExecutor",
+    "code_executor",
+    "ComplexityEstimator",
+    "complexity_estimator",
+    "ReviewTrigger",
+    "TriggerPolicy",
+    "review_trigger",
+    "StaticAnalyzer",
+    "static_analyzer",
+    "JobQueue",
+    "job_queue",
     "CodeReviewer",
     "code_reviewer",
     "InterviewOrchestrator",
     "interview_orchestrator",
+    "InterviewTimer",
+    "interview_timer",
+    "SessionActor",
 ]
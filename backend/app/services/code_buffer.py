@@ -0,0 +1,124 @@
+"""Versioned per-session code buffer for delta-based code sync."""
+
+import zlib
+from typing import Any, Dict, List
+
+
+class CodeSyncError(Exception):
+    """Raised when an edit can't be applied and the client must resync."""
+
+
+def code_checksum(text: str) -> int:
+    """CRC32 of the UTF-8 encoded text, as computed by the frontend."""
+    try:
+        return zlib.crc32(text.encode("utf-8"))
+    except UnicodeEncodeError:
+        # Lone surrogates; TextEncoder encodes each as U+FFFD
+        text = text.encode("utf-16-le", "surrogatepass").decode("utf-16-le", "replace")
+        return zlib.crc32(text.encode("utf-8"))
+
+
+class CodeBuffer:
+    """
+    Server-side copy of the candidate's editor buffer.
+
+    Clients send range-replace edits against a base revision instead of the
+    whole buffer. Offsets are UTF-16 code units (what the browser and Monaco
+    use); they only need translating once the buffer holds characters outside
+    the Basic Multilingual Plane, which is tracked so ASCII code stays on the
+    fast path.
+    """
+
+    def __init__(self, text: str = "", revision: int = 0):
+        self.reset(text, revision)
+
+    @property
+    def checksum(self) -> int:
+        return code_checksum(self.text)
+
+    @property
+    def line_count(self) -> int:
+        return self.text.count("\n") + 1
+
+    def reset(self, text: str, revision: int) -> None:
+        """Replace the whole buffer (full-snapshot fallback)."""
+        self.text = text
+        self.revision = revision
+        self._has_astral = _has_astral(text)
+
+    def apply(
+        self, base_revision: int, ops: List[Dict[str, Any]], checksum: int
+    ) -> int:
+        """
+        Apply a batch of edits made on top of `base_revision`.
+
+        Each op is {"start": int, "end": int, "text": str} and is relative to
+        the buffer as left by the previous op. The checksum covers the
+        resulting buffer; on mismatch the buffer is left untouched.
+
+        Returns:
+            The new revision
+        """
+        if base_revision != self.revision:
+            raise CodeSyncError(
+                f"Base revision {base_revision} does not match {self.revision}"
+            )
+
+        text = self.text
+        has_astral = self._has_astral
+
+        for op in ops:
+            start = op.get("start")
+            end = op.get("end", start)
+            insert = op.get("text", "")
+
+            if not isinstance(start, int) or not isinstance(end, int):
+                raise CodeSyncError("Edit offsets must be integers")
+
+            if has_astral:
+                start = _utf16_to_index(text, start)
+                end = _utf16_to_index(text, end)
+
+            if _has_lone_surrogate(insert):
+                raise CodeSyncError("Edit text splits a surrogate pair")
+
+            if not 0 <= start <= end <= len(text):
+                raise CodeSyncError(f"Edit range {start}-{end} out of bounds")
+
+            text = text[:start] + insert + text[end:]
+            has_astral = has_astral or _has_astral(insert)
+
+        if code_checksum(text) != checksum:
+            raise CodeSyncError("Checksum mismatch after applying edits")
+
+        self.text = text
+        self.revision = base_revision + 1
+        self._has_astral = has_astral
+        return self.revision
+
+
+def _has_astral(text: str) -> bool:
+    # ASCII text can't contain astral characters; check the cheap case first.
+    if text.isascii():
+        return False
+    return any(ord(char) > 0xFFFF for char in text)
+
+
+def _has_lone_surrogate(text: str) -> bool:
+    if text.isascii():
+        return False
+    return any(0xD800 <= ord(char) <= 0xDFFF for char in text)
+
+
+def _utf16_to_index(text: str, offset: int) -> int:
+    """Translate a UTF-16 code unit offset into a Python string index."""
+    units = 0
+    for index, char in enumerate(text):
+        if units >= offset:
+            if units > offset:
+                raise CodeSyncError(f"Edit offset {offset} splits a surrogate pair")
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1
+    if units > offset:
+        raise CodeSyncError(f"Edit offset {offset} splits a surrogate pair")
+    return len(text) if units == offset else len(text) + (offset - units)
@@ -0,0 +1,129 @@
+"""Run candidate code against a problem's test cases in the sandbox pool."""
+
+import ast
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.models import TestCaseResult, TestRunResult
+from app.sandbox import SandboxPool
+
+
+def parse_example_input(text: str) -> Dict[str, Any]:
+    """Parse an example input like "nums = [2,7,11,15], target = 9" into kwargs."""
+    call = ast.parse(f"f({text})", mode="eval").body
+    return {keyword.arg: ast.literal_eval(keyword.value) for keyword in call.keywords}
+
+
+def solution_function_name(problem: Dict[str, Any]) -> Optional[str]:
+    """Name of the function candidates implement for this problem."""
+    if problem.get("function_name"):
+        return problem["function_name"]
+    try:
+        tree = ast.parse(problem.get("optimal_solution", ""))
+    except SyntaxError:
+        return None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            return node.name
+    return None
+
+
+class CodeExecutor:
+    """Execute candidate solutions locally instead of asking GPT whether they work."""
+
+    def __init__(self, pool: SandboxPool):
+        self.pool = pool
+        self._test_cases: Dict[str, List[Dict[str, Any]]] = {}
+
+    def get_test_cases(self, problem: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Test cases built from the problem's examples (cached per problem)."""
+        problem_id = problem.get("id", "")
+        if problem_id not in self._test_cases:
+            unordered = problem.get("unordered_output", False)
+            cases = []
+            for example in problem.get("examples", []):
+                try:
+                    cases.append(
+                        {
+                            "input": example["input"],
+                            "kwargs": parse_example_input(example["input"]),
+                            "expected": ast.literal_eval(example["output"]),
+                            "unordered": unordered,
+                        }
+                    )
+                except (SyntaxError, ValueError, KeyError) as e:
+                    print(f"Skipping unparseable example for {problem_id}: {e}")
+            self._test_cases[problem_id] = cases
+        return self._test_cases[problem_id]
+
+    async def run_tests(self, code: str, problem: Dict[str, Any]) -> TestRunResult:
+        """Run the code against every test case of the problem."""
+        function_name = solution_function_name(problem)
+        cases = self.get_test_cases(problem)
+        if not function_name or not cases:
+            return TestRunResult(error="No runnable test cases for this problem")
+
+        time_limit = settings.sandbox_time_limit_ms / 1000
+        response = await self.pool.run(
+            {
+                "op": "run_tests",
+                "code": code,
+                "function_name": function_name,
+                "time_limit": time_limit,
+                "tests": [
+                    {
+                        "kwargs": case["kwargs"],
+                        "expected": case["expected"],
+                        "unordered": case["unordered"],
+                    }
+                    for case in cases
+                ],
+            },
+            # Per-test alarms should fire first; this catches hangs in C code
+            timeout=time_limit * len(cases) + 1.0,
+        )
+
+        if not response.get("ok"):
+            return TestRunResult(total=len(cases), error=response.get("error"))
+
+        results = [
+            TestCaseResult(
+                input=case["input"],
+                expected=case["expected"],
+                actual=result.get("actual"),
+                passed=result.get("passed", False),
+                error=result.get("error"),
+                duration_ms=result.get("duration_ms", 0.0),
+            )
+            for case, result in zip(cases, response["results"])
+        ]
+        return TestRunResult(
+            passed=sum(1 for result in results if result.passed),
+            total=len(results),
+            results=results,
+            duration_ms=response.get("wall_ms", response.get("duration_ms", 0.0)),
+        )
+
+    def format_for_prompt(self, result: TestRunResult) -> str:
+        """Summarize a test run for inclusion in a review prompt."""
+        if result.error:
+            return f"Could not run the code: {result.error}"
+
+        lines = [f"{result.passed}/{result.total} example tests passed."]
+        for case in result.results:
+            if case.passed:
+                continue
+            outcome = case.error or f"got {case.actual!r}"
+            lines.append(f"- Input {case.input}: expected {case.expected!r}, {outcome}")
+        return "\n".join(lines)
+
+
+# Singleton instance
+code_executor = CodeExecutor(
+    SandboxPool(
+        size=settings.sandbox_workers,
+        memory_limit_mb=settings.sandbox_memory_limit_mb,
+        max_jobs_per_worker=settings.sandbox_max_jobs_per_worker,
+        secrets=[settings.openai_api_key],
+    )
+)
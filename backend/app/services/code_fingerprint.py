@@ -0,0 +1,142 @@
+"""Normalized fingerprints of candidate code."""
+
+import ast
+import hashlib
+import io
+import tokenize
+from typing import Dict, Optional
+
+
+class _DocstringStripper(ast.NodeTransformer):
+    """Remove docstrings from modules, classes and functions."""
+
+    def _strip(self, node):
+        self.generic_visit(node)
+        body = node.body
+        if (
+            body
+            and isinstance(body[0], ast.Expr)
+            and isinstance(body[0].value, ast.Constant)
+            and isinstance(body[0].value.value, str)
+        ):
+            node.body = body[1:] or [ast.Pass()]
+        return node
+
+    visit_Module = _strip
+    visit_ClassDef = _strip
+    visit_FunctionDef = _strip
+    visit_AsyncFunctionDef = _strip
+
+
+class _IdentifierRenamer(ast.NodeTransformer):
+    """Rename identifiers bound in the code to positional placeholders."""
+
+    def __init__(self, names: Dict[str, str]):
+        self.names = names
+
+    def _rename(self, name: Optional[str]) -> Optional[str]:
+        if name is None:
+            return None
+        return self.names.get(name, name)
+
+    def visit_Name(self, node: ast.Name):
+        node.id = self._rename(node.id)
+        return node
+
+    def visit_arg(self, node: ast.arg):
+        node.arg = self._rename(node.arg)
+        node.annotation = None
+        return node
+
+    def visit_keyword(self, node: ast.keyword):
+        node.arg = self._rename(node.arg)
+        self.generic_visit(node)
+        return node
+
+    def _visit_def(self, node):
+        node.name = self._rename(node.name)
+        self.generic_visit(node)
+        return node
+
+    visit_FunctionDef = _visit_def
+    visit_AsyncFunctionDef = _visit_def
+    visit_ClassDef = _visit_def
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        node.name = self._rename(node.name)
+        self.generic_visit(node)
+        return node
+
+    def visit_alias(self, node: ast.alias):
+        if node.asname:
+            node.asname = self._rename(node.asname)
+        return node
+
+
+def _bound_names(tree: ast.AST) -> Dict[str, str]:
+    """Map every name the code binds to a placeholder, in order of appearance."""
+    names: Dict[str, str] = {}
+
+    def bind(name: Optional[str]) -> None:
+        if name and name not in names:
+            names[name] = f"_v{len(names)}"
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bind(node.id)
+        elif isinstance(node, ast.arg):
+            bind(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bind(node.name)
+        elif isinstance(node, ast.ExceptHandler):
+            bind(node.name)
+        elif isinstance(node, ast.alias) and node.asname:
+            bind(node.asname)
+
+    return names
+
+
+def canonicalize(code: str) -> Optional[str]:
+    """
+    Canonical form of the code's AST, or None if it doesn't parse.
+
+    Comments, whitespace, docstrings, type annotations on arguments and the
+    names of locally bound identifiers don't affect the result; builtins,
+    attributes and literals do.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    tree = _DocstringStripper().visit(tree)
+    tree = _IdentifierRenamer(_bound_names(tree)).visit(tree)
+    return ast.dump(tree, annotate_fields=False)
+
+
+def fingerprint(code: str) -> str:
+    """
+    Stable hash of the code that ignores names, comments and formatting.
+
+    Code that doesn't parse falls back to a hash of its tokens without
+    comments and blank lines.
+    """
+    canonical = canonicalize(code)
+    if canonical is None:
+        canonical = "text:" + _normalize_tokens(code)
+
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _normalize_tokens(code: str) -> str:
+    """Join the code's tokens, dropping comments and insignificant whitespace."""
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type in (tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER):
+                continue
+            tokens.append(token.string)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Unterminated brackets/strings: fall back to stripped lines
+        return "\n".join(line.strip() for line in code.splitlines() if line.strip())
+    return " ".join(tokens)
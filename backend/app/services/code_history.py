@@ -0,0 +1,270 @@
+"""Compact per-session history of the candidate's code, for timeline playback."""
+
+import bisect
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+
+Edit = Tuple[int, int, str]  # (start, end, inserted text), in characters
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Length of the common prefix, by bisecting on slice comparisons (done in C)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid :] == b[len(b) - mid :]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def diff(old: str, new: str) -> Edit:
+    """The single range replacement turning `old` into `new`."""
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    return prefix, len(old) - suffix, new[prefix : len(new) - suffix]
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _iter_entries(data: bytes) -> Iterator[Tuple[int, Edit]]:
+    """(milliseconds since the keyframe, edit) for each packed entry."""
+    pos = 0
+    while pos < len(data):
+        ms, pos = _get_varint(data, pos)
+        start, pos = _get_varint(data, pos)
+        deleted, pos = _get_varint(data, pos)
+        size, pos = _get_varint(data, pos)
+        text = data[pos : pos + size].decode("utf-8")
+        pos += size
+        yield ms, (start, start + deleted, text)
+
+
+class _Segment:
+    """A keyframe and the edits after it, zlib-compressed once sealed."""
+
+    __slots__ = ("start", "keyframe", "ops", "sealed", "entries")
+
+    def __init__(self, start: float, text: str):
+        self.start = start
+        self.keyframe = zlib.compress(text.encode("utf-8"))
+        self.ops = bytearray()
+        self.sealed = False
+        self.entries = 0
+
+    def seal(self) -> None:
+        self.ops = zlib.compress(bytes(self.ops))
+        self.sealed = True
+
+    def text(self) -> str:
+        return zlib.decompress(self.keyframe).decode("utf-8")
+
+    def packed_ops(self) -> bytes:
+        return zlib.decompress(self.ops) if self.sealed else bytes(self.ops)
+
+    @property
+    def size(self) -> int:
+        return len(self.keyframe) + len(self.ops)
+
+
+class CodeHistory:
+    """
+    Every state of one session's code, stored as keyframes plus diffs.
+
+    Each update is stored as the single range replacement from the previous
+    state (varint-packed), and nearby updates less than `resolution`
+    seconds apart are merged, so a burst of typing costs one entry. A new
+    keyframe starts once the open segment's diffs reach `keyframe_ratio`
+    times the code size, which bounds how much a seek replays; closed
+    segments are zlib-compressed. Seeking bisects the segment start times,
+    then replays one segment.
+    """
+
+    def __init__(
+        self,
+        resolution: float = 1.0,
+        keyframe_ratio: float = 4.0,
+        min_segment_bytes: int = 512,
+    ):
+        self.resolution = resolution
+        self.keyframe_ratio = keyframe_ratio
+        self.min_segment_bytes = min_segment_bytes
+        self._segments: List[_Segment] = []
+        self._starts: List[float] = []
+        self._text = ""
+        self._before_entry = ""  # Text before the open entry, to merge into it
+        self._entry_offset = -1  # Where the open entry starts in the ops; -1 after a keyframe
+        self._entry_time = 0.0
+        self._entry_chars = 0
+        self.updates = 0
+
+    def record(self, text: str, now: float) -> None:
+        """Record the code as of `now` (timestamps must not go backwards)."""
+        self.updates += 1
+        if not self._segments:
+            self._keyframe(text, now)
+            return
+        if text == self._text:
+            return
+
+        segment = self._segments[-1]
+        edit = diff(self._text, text)
+        if self._entry_offset >= 0 and now - self._entry_time < self.resolution:
+            # Merge into the open entry, unless the edits are far apart and
+            # one replacement spanning both would be bigger than two
+            merged = diff(self._before_entry, text)
+            if len(merged[2]) <= self._entry_chars + len(edit[2]):
+                del segment.ops[self._entry_offset :]
+                segment.entries -= 1
+                self._append(segment, merged, text, now)
+                return
+
+        budget = max(self.min_segment_bytes, self.keyframe_ratio * len(text))
+        if len(segment.ops) >= budget:
+            segment.seal()
+            self._keyframe(text, now)
+            return
+        self._before_entry = self._text
+        self._entry_offset = len(segment.ops)
+        self._entry_time = now
+        self._append(segment, edit, text, now)
+
+    def _append(self, segment: _Segment, edit: Edit, text: str, now: float) -> None:
+        start, end, insert = edit
+        encoded = insert.encode("utf-8")
+        _put_varint(segment.ops, max(0, int((now - segment.start) * 1000)))
+        _put_varint(segment.ops, start)
+        _put_varint(segment.ops, end - start)
+        _put_varint(segment.ops, len(encoded))
+        segment.ops += encoded
+        segment.entries += 1
+        self._entry_chars = len(insert)
+        self._text = text
+
+    def _keyframe(self, text: str, now: float) -> None:
+        self._segments.append(_Segment(now, text))
+        self._starts.append(now)
+        self._text = text
+        self._entry_offset = -1
+
+    def at(self, timestamp: float) -> Optional[str]:
+        """The code as of `timestamp`, or None before the first record."""
+        index = bisect.bisect_right(self._starts, timestamp) - 1
+        if index < 0:
+            return None
+        segment = self._segments[index]
+        text = segment.text()
+        limit_ms = (timestamp - segment.start) * 1000
+        for ms, (start, end, insert) in _iter_entries(segment.packed_ops()):
+            if ms > limit_ms:
+                break
+            text = text[:start] + insert + text[end:]
+        return text
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """Keyframes and edits in order, decompressing one segment at a time."""
+        for segment in list(self._segments):
+            yield {"type": "keyframe", "t": segment.start, "code": segment.text()}
+            for ms, (start, end, insert) in _iter_entries(segment.packed_ops()):
+                yield {
+                    "type": "edit",
+                    "t": segment.start + ms / 1000,
+                    "start": start,
+                    "end": end,
+                    "text": insert,
+                }
+
+    @property
+    def code(self) -> str:
+        return self._text
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return self._starts[0] if self._starts else None
+
+    @property
+    def size(self) -> int:
+        """Bytes held for keyframes and diffs."""
+        return sum(segment.size for segment in self._segments)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "updates": self.updates,
+            "entries": sum(segment.entries for segment in self._segments),
+            "keyframes": len(self._segments),
+            "bytes": self.size,
+            "code_bytes": len(self._text.encode("utf-8")),
+        }
+
+
+class CodeHistoryStore:
+    """Histories by session id, least recently updated evicted past `max_sessions`."""
+
+    def __init__(self, max_sessions: int = 2000, resolution: float = 1.0):
+        self.max_sessions = max_sessions
+        self.resolution = resolution
+        self._histories: "OrderedDict[str, CodeHistory]" = OrderedDict()
+        self.evicted = 0
+
+    def record(self, session_id: str, text: str, now: float) -> None:
+        history = self._histories.get(session_id)
+        if history is None:
+            history = self._histories[session_id] = CodeHistory(resolution=self.resolution)
+            while len(self._histories) > self.max_sessions:
+                self._histories.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._histories.move_to_end(session_id)
+        history.record(text, now)
+
+    def get(self, session_id: str) -> Optional[CodeHistory]:
+        return self._histories.get(session_id)
+
+    def discard(self, session_id: str) -> None:
+        self._histories.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._histories),
+            "max_sessions": self.max_sessions,
+            "bytes": sum(history.size for history in self._histories.values()),
+            "evicted": self.evicted,
+        }
+
+
+# Singleton instance
+code_history = CodeHistoryStore(
+    max_sessions=settings.code_history_max_sessions,
+    resolution=settings.code_history_resolution_seconds,
+)
@@ -1,20 +1,84 @@
 """GPT-4 code review service."""
 
+import asyncio
+import json
+import time
 import openai
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 from app.config import settings
-from app.models import CodeReview
+from app.models import (
+    CodeReview,
+    ComplexityEstimate,
+    FinalRatings,
+    LLMNotes,
+    StaticAnalysis,
+    TestRunResult,
+)
+from app.services.code_executor import code_executor
+from app.services.complexity_estimator import complexity_estimator
+from app.services.static_analyzer import static_analyzer
+from app.services.upstream_scheduler import (
+    Grant,
+    Priority,
+    UpstreamOverloaded,
+    upstream_scheduler,
+)
+from app.services.prompt_builder import prompt_builder
+from app.services.http_pool import http_pool
+from app.services.metrics import openai_errors, openai_request_seconds
+from app.services.review_cache import review_cache
+from app.services.review_parser import ReviewStreamParser
+from app.services.upstream_resilience import UpstreamError, upstream_resilience
+
+
+ReviewDeltaHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Expected completion sizes, reserved against the token rate limit up front
+INCREMENTAL_COMPLETION_TOKENS = 200
+FINAL_COMPLETION_TOKENS = 800
+EVALUATION_COMPLETION_TOKENS = 600
+
+RATING_FIELDS = (
+    "communication",
+    "problem_solving",
+    "code_quality",
+    "technical_skills",
+    "optimization",
+)
 
 
 class CodeReviewer:
     """Review code using GPT-4."""
 
     def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+        self._client: Optional[openai.AsyncOpenAI] = None
         self.model = settings.gpt4_model
 
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        """OpenAI client bound to the shared connection pool."""
+        http_client = http_pool.client
+        if self._client is None or self._client._client is not http_client:
+            self._client = openai.AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                http_client=http_client,
+                timeout=http_pool.timeout(settings.openai_review_timeout),
+                max_retries=0,  # Retries are upstream_resilience's job
+            )
+        return self._client
+
     async def review_code(
-        self, code: str, problem: Dict[str, Any], is_final: bool = False
+        self,
+        code: str,
+        problem: Dict[str, Any],
+        is_final: bool = False,
+        on_delta: Optional[ReviewDeltaHandler] = None,
+        test_results: Optional[TestRunResult] = None,
+        complexity: Optional[ComplexityEstimate] = None,
+        analysis: Optional[StaticAnalysis] = None,
+        previous_code: str = "",
+        previous_reviews: Optional[List[Dict[str, Any]]] = None,
     ) -> CodeReview:
         """
         Review code using GPT-4.
@@ -23,153 +87,254 @@ class CodeReviewer:
             code: The Python code to review
             problem: The problem dictionary with description, examples, etc.
             is_final: If True, include time/space complexity and optimization analysis
+            on_delta: If given (and streaming is enabled), stream the completion
+                and call this with each parsed section delta as it arrives
+            test_results: Outcome of running the code on the problem's examples,
+                included in the prompt so correctness isn't left to GPT's guess
+            complexity: Measured complexity of the code (final reviews only)
+            analysis: Local static analysis findings to include in the prompt
+            previous_code: Code as of the last review; long code is windowed
+                around what changed since
+            previous_reviews: Earlier reviews, summarized compactly in the prompt
 
         Returns:
             CodeReview object with feedback
+
+        Failed final reviews come back as a review saying so; incremental
+        ones raise instead, since there is nothing useful to show.
+
+        Raises:
+            UpstreamOverloaded: If an incremental review was shed (or its
+                circuit breaker is open)
+            UpstreamError: If an incremental review failed upstream
         """
-        if is_final:
-            prompt = self._create_final_review_prompt(code, problem)
-        else:
-            prompt = self._create_incremental_review_prompt(code, problem)
+        line_count = len(code.split("\n"))
+
+        # Near-identical code (same AST modulo names/comments) shares a review
+        tests_summary = code_executor.format_for_prompt(test_results) if test_results else ""
+        complexity_summary = (
+            complexity_estimator.format_for_prompt(complexity) if complexity else ""
+        )
+        analysis_summary = static_analyzer.format_for_prompt(analysis) if analysis else ""
+        variant = f"{test_results.passed}/{test_results.total}" if test_results else ""
+        if complexity and complexity.time_complexity:
+            variant += f":{complexity.time_complexity}"
+        cache_key = review_cache.make_key(
+            problem.get("id", ""), is_final, code, variant=variant
+        )
+        cached = review_cache.get(cache_key)
+        if cached:
+            cached.line_count = line_count
+            return cached
+
+        prompt = prompt_builder.build(
+            code,
+            problem,
+            is_final=is_final,
+            previous_code=previous_code,
+            previous_reviews=previous_reviews,
+            tests_summary=tests_summary,
+            complexity_summary=complexity_summary,
+            analysis_summary=analysis_summary,
+        )
+        messages = prompt.messages
+
+        priority = Priority.FINAL_REVIEW if is_final else Priority.INCREMENTAL_REVIEW
+        call = "final_review" if is_final else "incremental_review"
+        prompt_tokens = prompt.tokens
+        completion_tokens = (
+            FINAL_COMPLETION_TOKENS if is_final else INCREMENTAL_COMPLETION_TOKENS
+        )
 
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert code reviewer for technical interviews. Provide constructive, specific feedback.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,  # More deterministic
-            )
+            async with upstream_scheduler.slot(
+                priority, tokens=prompt_tokens + completion_tokens
+            ) as grant:
+                started = time.monotonic()
+                if on_delta and settings.code_review_streaming:
+                    review = await self._stream_review(
+                        messages, is_final, on_delta, grant, prompt_tokens
+                    )
+                else:
+                    response = await upstream_resilience.call(
+                        call,
+                        lambda: self.client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=0.3,  # More deterministic
+                        ),
+                        grant=grant,
+                    )
+                    if response.usage:
+                        grant.record_usage(response.usage.total_tokens)
 
-            content = response.choices[0].message.content
-            return self._parse_review_response(content, is_final)
+                    content = response.choices[0].message.content
+                    review = self._parse_review_response(content, is_final)
+                elapsed = time.monotonic() - started
+                prompt_builder.record_latency(prompt, elapsed)
+                openai_request_seconds.observe(elapsed, call)
 
+        except UpstreamOverloaded as e:
+            if not is_final:
+                raise
+            # Final reviews aren't shed, so this is an open circuit breaker
+            print(f"Code review skipped: {e}")
+            return CodeReview(
+                line_count=line_count,
+                feedback=f"Unable to review code: {str(e)}",
+                is_final=is_final,
+            )
         except Exception as e:
+            openai_errors.inc(call)
             print(f"Code review error: {e}")
+            if not is_final:
+                # Nothing worth showing; the next trigger reviews newer code
+                if isinstance(e, UpstreamError):
+                    raise
+                raise UpstreamError(str(e)) from e
             return CodeReview(
-                line_count=len(code.split("\n")),
+                line_count=line_count,
                 feedback=f"Unable to review code: {str(e)}",
                 is_final=is_final,
             )
 
-    def _create_incremental_review_prompt(
-        self, code: str, problem: Dict[str, Any]
-    ) -> str:
-        """Create prompt for incremental code review (every 5 lines)."""
-        return f"""You are reviewing code for the following problem:
-
-**Problem**: {problem['title']}
-{problem['description']}
-
-**Current Code** (in progress):
-```python
-{code}
-```
-
-Provide a BRIEF review (2-3 sentences max) focusing on:
-1. Any obvious bugs or syntax errors
-2. If they're on the right track
-3. One quick suggestion if needed
-
-Be encouraging! This is work in progress. Format your response as:
-
-FEEDBACK: [your brief feedback]
-BUGS: [list any bugs, one per line, or "None"]
-SUGGESTIONS: [one suggestion, or "None"]
-"""
-
-    def _create_final_review_prompt(self, code: str, problem: Dict[str, Any]) -> str:
-        """Create prompt for final code review."""
-        return f"""You are reviewing the FINAL solution for the following problem:
-
-**Problem**: {problem['title']}
-{problem['description']}
-
-**Optimal Solution** (for reference):
-```python
-{problem['optimal_solution']}
-```
-Time: {problem['time_complexity']}, Space: {problem['space_complexity']}
-
-**Candidate's Solution**:
-```python
-{code}
-```
-
-Provide a comprehensive review:
-1. Does the solution work correctly?
-2. Any bugs or edge cases missed?
-3. Time and space complexity analysis
-4. Is this optimal? If not, what's better?
-5. Code quality feedback
-
-Format your response as:
-
-FEEDBACK: [detailed feedback paragraph]
-BUGS: [list bugs, one per line, or "None"]
-SUGGESTIONS: [list suggestions, one per line, or "None"]
-TIME_COMPLEXITY: [e.g., O(n)]
-SPACE_COMPLEXITY: [e.g., O(1)]
-IS_OPTIMAL: [Yes or No]
-"""
+        review_cache.put(cache_key, review)
+        return review
+
+    async def _stream_review(
+        self,
+        messages: list,
+        is_final: bool,
+        on_delta: ReviewDeltaHandler,
+        grant: Grant,
+        prompt_tokens: int,
+    ) -> CodeReview:
+        """Stream the completion, parsing sections as tokens arrive."""
+        parser = ReviewStreamParser(is_final)
+        newlines = 0
+        streamed_chars = 0
+
+        # Hedging and the adaptive timeout apply up to the first chunk, so
+        # streams keep their own latency window
+        call = "final_review_stream" if is_final else "incremental_review_stream"
+        stream, chunks, first = await upstream_resilience.call(
+            call,
+            lambda: self._open_stream(messages),
+            discard=lambda opened: opened[0].close(),
+            grant=grant,
+        )
+
+        async def consume() -> None:
+            nonlocal newlines, streamed_chars
+            chunk = first
+            while chunk is not None:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    newlines += text.count("\n")
+                    streamed_chars += len(text)
+                    for delta in parser.feed(text):
+                        await on_delta(delta)
+                chunk = await anext(chunks, None)
+
+        try:
+            await asyncio.wait_for(consume(), upstream_resilience.policy(call).max_timeout)
+        finally:
+            await stream.close()
+
+        for delta in parser.flush():
+            await on_delta(delta)
+
+        # Streamed responses carry no usage; estimate from the text received
+        grant.record_usage(prompt_tokens + streamed_chars // 4 + 1)
+        return parser.close(line_count=newlines + 1)
+
+    async def evaluate_interview(
+        self,
+        code: str,
+        problem: Dict[str, Any],
+        reviews: List[Dict[str, Any]],
+        test_results: Optional[TestRunResult] = None,
+    ) -> Tuple[FinalRatings, LLMNotes]:
+        """
+        Rate a finished interview from its final code and reviews.
+
+        Runs as a background job at the lowest upstream priority. Unlike
+        review_code, failures are raised so the job is retried.
+
+        Raises:
+            UpstreamOverloaded: If the call was shed or its circuit is open
+            UpstreamError: If upstream kept failing or timing out
+            ValueError: If the response isn't a valid ratings object
+        """
+        tests_summary = code_executor.format_for_prompt(test_results) if test_results else ""
+        prompt = prompt_builder.build_evaluation(code, problem, reviews, tests_summary)
+
+        async with upstream_scheduler.slot(
+            Priority.BACKGROUND, tokens=prompt.tokens + EVALUATION_COMPLETION_TOKENS
+        ) as grant:
+            started = time.monotonic()
+            try:
+                response = await upstream_resilience.call(
+                    "evaluation",
+                    lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=prompt.messages,
+                        temperature=0.3,
+                        response_format={"type": "json_object"},
+                    ),
+                    grant=grant,
+                )
+            except Exception:
+                openai_errors.inc("evaluation")
+                raise
+            if response.usage:
+                grant.record_usage(response.usage.total_tokens)
+            elapsed = time.monotonic() - started
+            prompt_builder.record_latency(prompt, elapsed)
+            openai_request_seconds.observe(elapsed, "evaluation")
+
+        return self._parse_evaluation(response.choices[0].message.content or "")
+
+    def _parse_evaluation(self, content: str) -> Tuple[FinalRatings, LLMNotes]:
+        """Parse the JSON evaluation, clamping ratings to 1-5."""
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError("Evaluation is not a JSON object")
+        ratings = FinalRatings(
+            **{field: min(5, max(1, int(data.get(field, 3)))) for field in RATING_FIELDS},
+            overall_feedback=str(data.get("overall_feedback", "")),
+            would_hire=bool(data.get("would_hire", False)),
+        )
+        notes = data.get("notes") if isinstance(data.get("notes"), dict) else {}
+        llm_notes = LLMNotes(
+            **{
+                field: [str(item) for item in notes.get(field) or []]
+                for field in LLMNotes.model_fields
+            }
+        )
+        return ratings, llm_notes
+
+    async def _open_stream(self, messages: list):
+        """Start a streamed completion and wait for its first chunk."""
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.3,  # More deterministic
+            stream=True,
+        )
+        chunks = stream.__aiter__()
+        try:
+            first = await anext(chunks, None)
+        except BaseException:
+            await stream.close()
+            raise
+        return stream, chunks, first
 
     def _parse_review_response(self, content: str, is_final: bool) -> CodeReview:
         """Parse GPT-4 response into CodeReview object."""
-        lines = content.strip().split("\n")
-
-        feedback = ""
-        bugs = []
-        suggestions = []
-        time_complexity = None
-        space_complexity = None
-        is_optimal = None
-
-        current_section = None
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("FEEDBACK:"):
-                current_section = "feedback"
-                feedback = line.replace("FEEDBACK:", "").strip()
-            elif line.startswith("BUGS:"):
-                current_section = "bugs"
-                bug_text = line.replace("BUGS:", "").strip()
-                if bug_text and bug_text.lower() != "none":
-                    bugs.append(bug_text)
-            elif line.startswith("SUGGESTIONS:"):
-                current_section = "suggestions"
-                sug_text = line.replace("SUGGESTIONS:", "").strip()
-                if sug_text and sug_text.lower() != "none":
-                    suggestions.append(sug_text)
-            elif line.startswith("TIME_COMPLEXITY:"):
-                time_complexity = line.replace("TIME_COMPLEXITY:", "").strip()
-            elif line.startswith("SPACE_COMPLEXITY:"):
-                space_complexity = line.replace("SPACE_COMPLEXITY:", "").strip()
-            elif line.startswith("IS_OPTIMAL:"):
-                optimal_text = line.replace("IS_OPTIMAL:", "").strip().lower()
-                is_optimal = "yes" in optimal_text
-            elif line and current_section == "feedback":
-                feedback += " " + line
-            elif line and current_section == "bugs" and line.lower() != "none":
-                if not line.startswith("SUGGESTIONS:"):
-                    bugs.append(line)
-            elif line and current_section == "suggestions" and line.lower() != "none":
-                suggestions.append(line)
-
-        return CodeReview(
-            line_count=len(content.split("\n")),
-            feedback=feedback,
-            bugs=bugs,
-            suggestions=suggestions,
-            is_final=is_final,
-            time_complexity=time_complexity,
-            space_complexity=space_complexity,
-            is_optimal=is_optimal,
-        )
+        parser = ReviewStreamParser(is_final)
+        parser.feed(content.strip())
+        return parser.close(line_count=len(content.split("\n")))
 
 
 # Singleton instance
@@ -0,0 +1,361 @@
+"""Estimate time complexity empirically by timing code at increasing input sizes."""
+
+import asyncio
+import math
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models import ComplexityEstimate
+from app.sandbox import SandboxPool
+from app.services.code_executor import code_executor, solution_function_name
+from app.services.code_fingerprint import fingerprint
+
+# Candidate growth models, cheapest first
+COMPLEXITY_CLASSES = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n^2)", lambda n: float(n) ** 2),
+    ("O(n^3)", lambda n: float(n) ** 3),
+]
+COMPLEXITY_RANK = {name: rank for rank, (name, _) in enumerate(COMPLEXITY_CLASSES)}
+
+# Runs faster than this are dominated by call overhead and timer noise
+MIN_RESOLVABLE_SECONDS = 50e-6
+MIN_SAMPLES = 3
+MIN_SIZE = 16
+
+# A candidate whose time ratio to the reference grows slower than n^0.25 is
+# in the reference's class; log factors are below what timing can resolve
+SAME_GROWTH_EXPONENT = 0.25
+
+_NUMBER = r"-?\s*\d+(?:\s*\*\s*10\s*\^\s*\d+)?|-?\s*10\s*\^\s*\d+"
+_LENGTH_RE = re.compile(rf"^\s*({_NUMBER})\s*<=\s*(\w+)\.length\s*<=\s*({_NUMBER})\s*$")
+_ELEMENT_RE = re.compile(rf"^\s*({_NUMBER})\s*<=\s*(\w+)\[i\]\s*<=\s*({_NUMBER})\s*$")
+_SCALAR_RE = re.compile(rf"^\s*({_NUMBER})\s*<=\s*(\w+)\s*<=\s*({_NUMBER})\s*$")
+
+
+def parse_bound(text: str) -> int:
+    """Parse constraint numbers like "10^4", "-10^9" or "5 * 10^4"."""
+    text = text.replace(" ", "")
+    sign = -1 if text.startswith("-") else 1
+    text = text.lstrip("-")
+    value = 1
+    for factor in text.split("*"):
+        if "^" in factor:
+            base, exponent = factor.split("^")
+            value *= int(base) ** int(exponent)
+        else:
+            value *= int(factor)
+    return sign * value
+
+
+def parse_constraints(constraints: List[str]) -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """Map each parameter to its "length", "element" and "value" bounds."""
+    bounds: Dict[str, Dict[str, Tuple[int, int]]] = {}
+    for constraint in constraints:
+        for kind, pattern in (
+            ("length", _LENGTH_RE),
+            ("element", _ELEMENT_RE),
+            ("value", _SCALAR_RE),
+        ):
+            match = pattern.match(constraint)
+            if match:
+                lo, name, hi = match.groups()
+                bounds.setdefault(name, {})[kind] = (parse_bound(lo), parse_bound(hi))
+                break
+    return bounds
+
+
+def input_specs(problem: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Generator spec for each parameter, based on the types in the first
+    example and the bounds in the constraints. None if any parameter has a
+    type we can't scale.
+    """
+    cases = code_executor.get_test_cases(problem)
+    if not cases:
+        return None
+
+    bounds = parse_constraints(problem.get("constraints", []))
+    specs: Dict[str, Dict[str, Any]] = {}
+    scales = False
+
+    for name, example in cases[0]["kwargs"].items():
+        param_bounds = bounds.get(name, {})
+        if isinstance(example, bool):
+            specs[name] = {"kind": "const", "value": example}
+        elif isinstance(example, int):
+            lo, hi = param_bounds.get("value", (-(10**9), 10**9))
+            specs[name] = {"kind": "int", "lo": lo, "hi": hi}
+        elif isinstance(example, list) and all(
+            isinstance(item, int) and not isinstance(item, bool) for item in example
+        ):
+            lo, hi = param_bounds.get("element", (-(10**9), 10**9))
+            specs[name] = {"kind": "int_list", "lo": lo, "hi": hi}
+            scales = True
+        elif isinstance(example, str):
+            specs[name] = {"kind": "str"}
+            scales = True
+        else:
+            return None
+
+    return specs if scales else None
+
+
+def input_sizes(problem: Dict[str, Any]) -> List[int]:
+    """Doubling input sizes up to the largest length the constraints allow."""
+    bounds = parse_constraints(problem.get("constraints", []))
+    lengths = [b["length"] for b in bounds.values() if "length" in b]
+    lo = max([MIN_SIZE] + [length[0] for length in lengths])
+    hi = min([settings.complexity_max_input_size] + [length[1] for length in lengths])
+
+    sizes = []
+    size = lo
+    while size < hi:
+        sizes.append(size)
+        size *= 2
+    sizes.append(hi)
+    return sizes
+
+
+def normalize_complexity(text: Optional[str]) -> Optional[str]:
+    """Map a stated complexity like "O(n²)" onto one of COMPLEXITY_CLASSES."""
+    if not text:
+        return None
+    text = text.replace("²", "^2").replace("³", "^3").replace("*", " ")
+    text = re.sub(r"\s+", " ", text).strip()
+    return text if text in COMPLEXITY_RANK else None
+
+
+def log_log_slope(points: List[Tuple[float, float]]) -> Optional[float]:
+    """Least-squares slope of log(y) against log(x)."""
+    if len(points) < 2:
+        return None
+    log_x = [math.log(x) for x, _ in points]
+    log_y = [math.log(y) for _, y in points]
+    mean_x = sum(log_x) / len(log_x)
+    mean_y = sum(log_y) / len(log_y)
+    spread = sum((x - mean_x) ** 2 for x in log_x)
+    if not spread:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(log_x, log_y)) / spread
+
+
+def resolvable(samples: List[Dict[str, float]]) -> Dict[int, float]:
+    """Samples slow enough to be measured reliably, by size."""
+    return {
+        sample["size"]: sample["seconds"]
+        for sample in samples
+        if sample["seconds"] >= MIN_RESOLVABLE_SECONDS
+    }
+
+
+def fit_complexity(samples: List[Dict[str, float]]) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Best-fitting complexity class and log-log slope for (size, seconds) samples.
+
+    Each class is fitted as t = c * f(n); the one with the least variance of
+    log(t / f(n)) wins.
+    """
+    points = sorted(resolvable(samples).items())
+    if len(points) < MIN_SAMPLES:
+        return None, None
+
+    exponent = log_log_slope(points)
+
+    best_name, best_error = None, math.inf
+    for name, growth in COMPLEXITY_CLASSES:
+        residuals = [math.log(t) - math.log(growth(n)) for n, t in points]
+        mean = sum(residuals) / len(residuals)
+        error = sum((r - mean) ** 2 for r in residuals)
+        if error < best_error:
+            best_name, best_error = name, error
+
+    return best_name, exponent
+
+
+class ComplexityEstimator:
+    """
+    Measure how the candidate's solution scales, instead of trusting GPT's guess.
+
+    The candidate and the problem's optimal_solution are timed in separate
+    sandbox workers on identical generated inputs. Reference runs are cached
+    per problem and candidate runs per code fingerprint.
+    """
+
+    def __init__(self, pool: SandboxPool, max_entries: int = 256):
+        self.pool = pool
+        self.max_entries = max_entries
+        self._estimates: "OrderedDict[str, ComplexityEstimate]" = OrderedDict()
+        self._references: Dict[str, Dict[str, Any]] = {}
+
+    async def estimate(
+        self, code: str, problem: Dict[str, Any]
+    ) -> Optional[ComplexityEstimate]:
+        """Estimate the code's complexity; None if the problem's inputs can't be generated."""
+        specs = input_specs(problem)
+        function_name = solution_function_name(problem)
+        if specs is None or not function_name:
+            return None
+
+        key = f"{problem.get('id', '')}:{fingerprint(code)}"
+        cached = self._estimates.get(key)
+        if cached is not None:
+            self._estimates.move_to_end(key)
+            return cached
+
+        sizes = input_sizes(problem)
+        candidate, reference = await asyncio.gather(
+            self._benchmark(code, function_name, specs, sizes),
+            self._reference(problem, function_name, specs, sizes),
+        )
+
+        if not candidate.get("ok"):
+            return ComplexityEstimate(error=candidate.get("error"))
+
+        samples = candidate["samples"]
+        reference_samples = reference.get("samples", []) if reference.get("ok") else []
+        time_complexity, exponent = fit_complexity(samples)
+        reference_complexity = (
+            normalize_complexity(problem.get("time_complexity"))
+            or fit_complexity(reference_samples)[0]
+        )
+
+        # Growth relative to the reference is far less noisy than the
+        # absolute fit (both runs see the same inputs and cache effects)
+        relative_exponent = self._relative_exponent(samples, reference_samples)
+        if relative_exponent is not None and reference_complexity:
+            if relative_exponent < SAME_GROWTH_EXPONENT:
+                time_complexity = reference_complexity
+            elif time_complexity and (
+                COMPLEXITY_RANK[time_complexity] <= COMPLEXITY_RANK[reference_complexity]
+            ):
+                # Measurably worse than the reference, whatever the absolute fit says
+                time_complexity = COMPLEXITY_CLASSES[
+                    min(
+                        COMPLEXITY_RANK[reference_complexity] + 1,
+                        len(COMPLEXITY_CLASSES) - 1,
+                    )
+                ][0]
+
+        estimate = ComplexityEstimate(
+            time_complexity=time_complexity,
+            exponent=round(exponent, 2) if exponent is not None else None,
+            reference_time_complexity=reference_complexity,
+            slowdown=self._slowdown(samples, reference_samples),
+            sizes=[sample["size"] for sample in samples],
+            timings_ms=[round(sample["seconds"] * 1000, 3) for sample in samples],
+            timed_out=candidate.get("timed_out", False),
+        )
+        if estimate.timed_out and time_complexity is None:
+            estimate.error = "Timed out before enough input sizes were measured"
+        if time_complexity and reference_complexity:
+            estimate.is_optimal = (
+                COMPLEXITY_RANK[time_complexity] <= COMPLEXITY_RANK[reference_complexity]
+            )
+
+        self._estimates[key] = estimate
+        while len(self._estimates) > self.max_entries:
+            self._estimates.popitem(last=False)
+        return estimate
+
+    async def _reference(
+        self,
+        problem: Dict[str, Any],
+        function_name: str,
+        specs: Dict[str, Dict[str, Any]],
+        sizes: List[int],
+    ) -> Dict[str, Any]:
+        problem_id = problem.get("id", "")
+        if problem_id not in self._references:
+            result = await self._benchmark(
+                problem.get("optimal_solution", ""), function_name, specs, sizes
+            )
+            if not result.get("ok"):
+                return result
+            self._references[problem_id] = result
+        return self._references[problem_id]
+
+    async def _benchmark(
+        self,
+        code: str,
+        function_name: str,
+        specs: Dict[str, Dict[str, Any]],
+        sizes: List[int],
+    ) -> Dict[str, Any]:
+        time_limit = settings.complexity_time_limit_ms / 1000
+        budget = settings.complexity_size_budget_ms / 1000
+        return await self.pool.run(
+            {
+                "op": "benchmark",
+                "code": code,
+                "function_name": function_name,
+                "params": specs,
+                "sizes": sizes,
+                "seed": 0,  # Same inputs for candidate and reference
+                "time_limit": time_limit,
+                "budget": budget,
+            },
+            timeout=len(sizes) * (budget + time_limit) + 1.0,
+        )
+
+    @staticmethod
+    def _relative_exponent(
+        samples: List[Dict[str, float]], reference: List[Dict[str, float]]
+    ) -> Optional[float]:
+        """Log-log slope of candidate time / reference time over shared sizes."""
+        candidate_times = resolvable(samples)
+        reference_times = resolvable(reference)
+        points = [
+            (size, candidate_times[size] / reference_times[size])
+            for size in sorted(candidate_times.keys() & reference_times.keys())
+        ]
+        if len(points) < MIN_SAMPLES:
+            return None
+        return log_log_slope(points)
+
+    @staticmethod
+    def _slowdown(
+        samples: List[Dict[str, float]], reference: List[Dict[str, float]]
+    ) -> Optional[float]:
+        reference_times = {sample["size"]: sample["seconds"] for sample in reference}
+        for sample in reversed(samples):
+            reference_time = reference_times.get(sample["size"])
+            if reference_time and reference_time >= MIN_RESOLVABLE_SECONDS:
+                return round(sample["seconds"] / reference_time, 2)
+        return None
+
+    def format_for_prompt(self, estimate: ComplexityEstimate) -> str:
+        """Summarize a measurement for inclusion in the final review prompt."""
+        if estimate.error:
+            return f"Could not measure: {estimate.error}"
+        if not estimate.time_complexity:
+            return "Inconclusive: runs were too fast to measure at these input sizes."
+
+        largest = estimate.sizes[-1] if estimate.sizes else 0
+        lines = [
+            f"Measured growth is {estimate.time_complexity} "
+            f"(log-log slope {estimate.exponent}) for n up to {largest}."
+        ]
+        if estimate.reference_time_complexity:
+            lines.append(
+                f"The optimal solution is {estimate.reference_time_complexity}."
+            )
+        if estimate.slowdown is not None:
+            lines.append(
+                f"The candidate is {estimate.slowdown}x the optimal solution's run time "
+                "at the largest size both completed."
+            )
+        if estimate.timed_out:
+            lines.append("Larger inputs hit the time limit.")
+        return "\n".join(lines)
+
+
+# Singleton instance
+complexity_estimator = ComplexityEstimator(
+    code_executor.pool, max_entries=settings.complexity_cache_max_entries
+)
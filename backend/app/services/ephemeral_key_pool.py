@@ -0,0 +1,159 @@
+"""Background-refilled pool of pre-minted Realtime ephemeral keys."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.openai_client import openai_client
+
+
+class EphemeralKeyPool:
+    """
+    Keep a few ephemeral Realtime keys ready so session creation doesn't wait
+    on OpenAI.
+
+    Every key is minted with the same interviewer session config, so any key
+    can serve any candidate. Keys are dropped and replaced once less than
+    `min_remaining_seconds` of their lifetime is left. When a burst drains
+    the pool, `acquire` mints on demand and the refill task catches up.
+    """
+
+    def __init__(
+        self,
+        target_size: int = 4,
+        min_remaining_seconds: float = 120,
+        retry_delay_seconds: float = 5,
+    ):
+        self.target_size = target_size
+        self.min_remaining_seconds = min_remaining_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+
+        # (expires_at, client_secrets response), soonest-expiring first
+        self._keys: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.refill_failures = 0
+        self.last_refill_ms: Optional[float] = None
+        self._refill_total_ms = 0.0
+        self._refill_count = 0
+
+    def start(self) -> None:
+        """Start the background refill task."""
+        if self.target_size > 0 and self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self) -> None:
+        """Stop refilling and forget pooled keys."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._keys.clear()
+
+    async def acquire(self) -> Dict[str, Any]:
+        """
+        Take a key from the pool, minting one on demand if the pool is empty.
+
+        Returns:
+            The client_secrets response, with 'value' containing the key
+        """
+        self._discard_expiring()
+
+        if self._keys:
+            self.hits += 1
+            _, key = self._keys.popleft()
+        else:
+            self.misses += 1
+            _, key = await self._mint()
+
+        # Top the pool back up in the background
+        self._wakeup.set()
+        return key
+
+    def _discard_expiring(self) -> None:
+        cutoff = time.time() + self.min_remaining_seconds
+        while self._keys and self._keys[0][0] <= cutoff:
+            self._keys.popleft()
+            self.expired += 1
+
+    async def _mint(self) -> Tuple[float, Dict[str, Any]]:
+        started = time.perf_counter()
+        key = await openai_client.create_ephemeral_key()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.last_refill_ms = elapsed_ms
+        self._refill_total_ms += elapsed_ms
+        self._refill_count += 1
+
+        # Not every response carries expires_at; fall back to the requested TTL
+        expires_at = key.get("expires_at") or (
+            time.time() + settings.ephemeral_key_ttl_seconds
+        )
+        return expires_at, key
+
+    async def _refill_loop(self) -> None:
+        while True:
+            # Cleared before refilling so an acquire() during minting isn't lost
+            self._wakeup.clear()
+            self._discard_expiring()
+            missing = self.target_size - len(self._keys)
+
+            if missing > 0:
+                results = await asyncio.gather(
+                    *(self._mint() for _ in range(missing)), return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        self.refill_failures += 1
+                        print(f"Ephemeral key refill failed: {result}")
+                    else:
+                        self._keys.append(result)
+
+                # Keep the soonest-expiring key at the front
+                self._keys = deque(sorted(self._keys, key=lambda entry: entry[0]))
+
+                if any(isinstance(result, Exception) for result in results):
+                    await asyncio.sleep(self.retry_delay_seconds)
+                    continue
+
+            # Sleep until a key needs refreshing or someone drains the pool
+            timeout = None
+            if self._keys:
+                refresh_at = self._keys[0][0] - self.min_remaining_seconds
+                timeout = max(1.0, refresh_at - time.time())
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._keys),
+            "target_size": self.target_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "refill_failures": self.refill_failures,
+            "last_refill_ms": self.last_refill_ms,
+            "avg_refill_ms": (
+                self._refill_total_ms / self._refill_count if self._refill_count else None
+            ),
+        }
+
+
+# Singleton instance
+ephemeral_key_pool = EphemeralKeyPool(
+    target_size=settings.ephemeral_key_pool_size,
+    min_remaining_seconds=settings.ephemeral_key_min_remaining_seconds,
+)
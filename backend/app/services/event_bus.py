@@ -0,0 +1,342 @@
+"""Pub/sub for session events, so any node can reach a session's connected clients."""
+
+import argparse
+import asyncio
+import json
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+
+Event = Dict[str, Any]
+Handler = Callable[[Event], Awaitable[None]]
+
+
+def session_channel(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+class EventBus:
+    """
+    Base bus: local handlers per channel, fan-out left to subclasses.
+
+    Handlers for a channel run one at a time, in publish order, so a client
+    sees a session's events in the order they were produced.
+    """
+
+    backend = ""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def subscribe(self, channel: str, handler: Handler) -> Callable[[], None]:
+        """Deliver the channel's events to `handler`; returns an unsubscribe function."""
+        handlers = self._handlers.setdefault(channel, [])
+        handlers.append(handler)
+        if len(handlers) == 1:
+            self._watch(channel)
+
+        def unsubscribe() -> None:
+            handlers = self._handlers.get(channel)
+            if not handlers or handler not in handlers:
+                return
+            handlers.remove(handler)
+            if not handlers:
+                del self._handlers[channel]
+                self._unwatch(channel)
+
+        return unsubscribe
+
+    async def publish(self, channel: str, event: Event) -> None:
+        raise NotImplementedError
+
+    async def _dispatch(self, channel: str, event: Event) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                await handler(event)
+                self.delivered += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Event handler failed on {channel}: {e}")
+
+    def _watch(self, channel: str) -> None:
+        """First local subscriber for a channel."""
+
+    def _unwatch(self, channel: str) -> None:
+        """Last local subscriber for a channel left."""
+
+    def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "channels": len(self._handlers),
+            "subscriptions": sum(len(handlers) for handlers in self._handlers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+class InProcessEventBus(EventBus):
+    """Single-process bus: publishing calls the local handlers directly."""
+
+    backend = "memory"
+
+    async def publish(self, channel: str, event: Event) -> None:
+        self.published += 1
+        await self._dispatch(channel, event)
+
+
+class SocketEventBus(EventBus):
+    """
+    Client of a SocketEventBroker, shared by every node.
+
+    Speaks newline-delimited JSON over TCP. The node subscribes at the broker
+    once per channel with local subscribers and fans events out locally.
+    Events published here reach local subscribers directly, without the
+    round trip (the broker's echo is recognised by its origin and skipped),
+    so they still arrive while the broker is down. Each channel's events
+    are handled by a task of their own, in order, so a slow subscriber only
+    holds up its own channel.
+
+    The connection is re-established (and subscriptions replayed) if it
+    drops; events published while disconnected don't reach other nodes and
+    are counted as dropped, like frames sent to a closed WebSocket.
+    """
+
+    backend = "socket"
+
+    def __init__(self, host: str, port: int, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._write_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._origin = uuid.uuid4().hex
+        self._pending: Dict[str, Deque[Event]] = {}
+        self._drainers: Set[asyncio.Task] = set()
+        self.connects = 0
+
+    def _send_nowait(self, message: Event) -> bool:
+        if self._writer is None or self._writer.is_closing():
+            return False
+        self._writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        return True
+
+    def _watch(self, channel: str) -> None:
+        self._send_nowait({"op": "sub", "channel": channel})
+
+    def _unwatch(self, channel: str) -> None:
+        self._send_nowait({"op": "unsub", "channel": channel})
+
+    async def publish(self, channel: str, event: Event) -> None:
+        self.published += 1
+        if channel in self._handlers:
+            self._deliver(channel, event)
+        message = {"op": "pub", "channel": channel, "event": event, "origin": self._origin}
+        async with self._write_lock:
+            if not self._send_nowait(message):
+                self.dropped += 1
+                return
+            try:
+                await self._writer.drain()
+            except ConnectionError:
+                self.dropped += 1
+
+    def _deliver(self, channel: str, event: Event) -> None:
+        """Queue an event for the channel's handlers without waiting for them."""
+        pending = self._pending.get(channel)
+        if pending is not None:
+            pending.append(event)
+            return
+        pending = self._pending[channel] = deque([event])
+        task = asyncio.create_task(self._drain(channel, pending))
+        self._drainers.add(task)
+        task.add_done_callback(self._drainers.discard)
+
+    async def _drain(self, channel: str, pending: Deque[Event]) -> None:
+        try:
+            while pending:
+                await self._dispatch(channel, pending.popleft())
+        finally:
+            if self._pending.get(channel) is pending:
+                del self._pending[channel]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                print(f"Event broker {self.host}:{self.port} unreachable: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            self.connects += 1
+            for channel in self._handlers:
+                self._send_nowait({"op": "sub", "channel": channel})
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    if message.get("op") == "event" and message.get("origin") != self._origin:
+                        self._deliver(message["channel"], message["event"])
+            except (ConnectionError, ValueError) as e:
+                print(f"Event broker connection lost: {e}")
+            finally:
+                writer, self._writer = self._writer, None
+                writer.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._drainers):
+            task.cancel()
+        await asyncio.gather(*self._drainers, return_exceptions=True)
+        self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "broker": f"{self.host}:{self.port}",
+            "connected": self._writer is not None,
+            "connects": self.connects,
+        }
+
+
+class SocketEventBroker:
+    """
+    Minimal TCP broker for SocketEventBus clients.
+
+    Ops (one JSON object per line): {"op": "sub"|"unsub", "channel"} and
+    {"op": "pub", "channel", "event", "origin"}; subscribers receive
+    {"op": "event", "channel", "event", "origin"}. Enough for tests and small
+    deployments; nothing is persisted.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 7700):
+        self.host = host
+        self.port = port
+        self._subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.published = 0
+
+    async def _deliver(self, writer: asyncio.StreamWriter, line: bytes) -> None:
+        try:
+            writer.write(line)
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channels: Set[str] = set()
+        self._connections.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    op, channel = message["op"], message["channel"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+                if op == "sub":
+                    channels.add(channel)
+                    self._subscribers.setdefault(channel, set()).add(writer)
+                elif op == "unsub":
+                    channels.discard(channel)
+                    self._subscribers.get(channel, set()).discard(writer)
+                elif op == "pub":
+                    self.published += 1
+                    out = json.dumps(
+                        {
+                            "op": "event",
+                            "channel": channel,
+                            "event": message.get("event"),
+                            "origin": message.get("origin"),
+                        },
+                        separators=(",", ":"),
+                    ).encode() + b"\n"
+                    subscribers = list(self._subscribers.get(channel, ()))
+                    await asyncio.gather(*(self._deliver(sub, out) for sub in subscribers))
+        except ConnectionError:
+            pass
+        finally:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(writer)
+                    if not subscribers:
+                        del self._subscribers[channel]
+            self._connections.discard(writer)
+            writer.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"Event broker listening on {self.host}:{self.port}")
+        await self._server.serve_forever()
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split "host:port"; the host defaults to localhost."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def create_event_bus() -> EventBus:
+    """Build the event bus selected by settings."""
+    if settings.event_bus == "socket":
+        host, port = parse_address(settings.event_bus_address)
+        return SocketEventBus(host, port)
+    return InProcessEventBus()
+
+
+# Singleton instance
+event_bus = create_event_bus()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the session event broker.")
+    parser.add_argument("--address", default=settings.event_bus_address)
+    args = parser.parse_args()
+    asyncio.run(SocketEventBroker(*parse_address(args.address)).serve_forever())
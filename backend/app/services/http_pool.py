@@ -0,0 +1,90 @@
+"""Shared, connection-pooled HTTP client for OpenAI-bound services."""
+
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPPool:
+    """
+    Owns the single `httpx.AsyncClient` used for every upstream call.
+
+    Reusing one pooled client keeps TCP/TLS connections alive between calls
+    (and multiplexes them over HTTP/2 when `h2` is installed) instead of
+    paying a fresh handshake per request. It is opened and closed by the
+    FastAPI lifespan hook; `client` also opens it lazily for scripts.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self.start()
+        return self._client
+
+    def start(self) -> httpx.AsyncClient:
+        """Create the pooled client if it isn't already open."""
+        if self._client is not None and not self._client.is_closed:
+            return self._client
+
+        http2 = settings.http2_enabled and HTTP2_AVAILABLE
+        if settings.http2_enabled and not HTTP2_AVAILABLE:
+            print("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1")
+
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.http_pool_max_connections,
+                max_keepalive_connections=settings.http_pool_max_keepalive,
+                keepalive_expiry=settings.http_pool_keepalive_expiry,
+            ),
+            timeout=self.timeout(settings.openai_default_timeout),
+        )
+        return self._client
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def timeout(seconds: float) -> httpx.Timeout:
+        """Per-endpoint timeout sharing the pool-wide connect timeout."""
+        return httpx.Timeout(seconds, connect=settings.openai_connect_timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool statistics (open, idle and waiting requests)."""
+        stats = {"open": 0, "idle": 0, "active_requests": 0, "waiting": 0}
+        stats["http2"] = settings.http2_enabled and HTTP2_AVAILABLE
+
+        if self._client is None or self._client.is_closed:
+            return stats
+
+        # httpx doesn't expose pool state publicly; read it from httpcore
+        pool = getattr(self._client._transport, "_pool", None)
+        if pool is None:
+            return stats
+
+        connections = list(pool.connections)
+        queued = [request.is_queued() for request in list(pool._requests)]
+        stats["open"] = len(connections)
+        stats["idle"] = sum(1 for conn in connections if conn.is_idle())
+        stats["active_requests"] = queued.count(False)
+        stats["waiting"] = queued.count(True)
+        return stats
+
+
+# Singleton instance
+http_pool = HTTPPool()
@@ -1,87 +1,215 @@
 """Interview orchestration and state management."""
 
+import asyncio
 import time
-from typing import Optional
-from app.models import InterviewSession, InterviewPhase, CodeReview
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.models import (
+    InterviewSession,
+    InterviewPhase,
+    CodeReview,
+    ComplexityEstimate,
+    TestRunResult,
+)
 from app.services.session_manager import session_manager
-from app.services.code_reviewer import code_reviewer
+from app.services.code_buffer import code_checksum
+from app.services.code_history import code_history
+from app.services.code_executor import code_executor, solution_function_name
+from app.services.complexity_estimator import complexity_estimator
+from app.services.static_analyzer import static_analyzer, SYNTAX_ERROR, UNCHANGED
+from app.services.review_triggers import TriggerState
+from app.services.upstream_scheduler import UpstreamOverloaded
+from app.services.upstream_resilience import UpstreamError
+from app.services.code_reviewer import code_reviewer, ReviewDeltaHandler
+from app.services.job_queue import job_queue
 from app.services.openai_client import openai_client
 from app.config import settings
 from data.problems import get_problem
 
+EVALUATE_INTERVIEW = "evaluate_interview"
+
 
 class InterviewOrchestrator:
     """Orchestrate interview flow and state transitions."""
 
-    def __init__(self):
-        self.review_threshold = settings.code_review_line_threshold
+    async def apply_code_update(self, session_id: str, code: str, line_count: int) -> None:
+        """
+        Apply a code update from the frontend.
 
-    async def handle_code_update(
-        self, session_id: str, code: str, line_count: int
-    ) -> Optional[CodeReview]:
+        Cheap, and never waits on GPT (or, for a resident session, on anything).
+        Whether a review is due is decided by the session's review trigger, not here.
         """
-        Handle code update from frontend.
-        Trigger review if line count crosses threshold.
+        session = await session_manager.get_session(session_id)
+        if not session:
+            return
+
+        session.code = code
+        session.line_count = line_count
+        session_manager.save_code(session)
+        code_history.record(session_id, code, time.time())
+
+    def new_trigger_state(self, session: InterviewSession) -> TriggerState:
+        """Review trigger state for a (re)connecting session."""
+        reviews = [review for review in session.code_reviews if not review.get("is_final")]
+        if not reviews:
+            return TriggerState()
+        # The code as of the last review isn't kept; treat the current code as reviewed
+        return TriggerState(
+            reviewed_code=session.code,
+            last_review_time=reviews[-1].get("timestamp", 0.0),
+            reviews=len(reviews),
+        )
+
+    async def claim_review(self, session_id: str, line_count: int) -> None:
+        """Record that an incremental review was triggered at this line count."""
+        session = await session_manager.get_session(session_id)
+        if session:
+            session.last_review_line = line_count
+            session_manager.save_session(session)
+
+    async def run_tests(self, session_id: str, code: str) -> Optional[TestRunResult]:
+        """
+        Run the code against the problem's examples in the sandbox.
+        The last run is kept on the session and reused for identical code.
 
         Returns:
-            CodeReview if review was triggered, None otherwise
+            TestRunResult, or None if the sandbox is disabled or the session is gone
         """
-        session = session_manager.get_session(session_id)
+        if not settings.sandbox_enabled:
+            return None
+
+        session = await session_manager.get_session(session_id)
         if not session:
             return None
 
-        # Update session with new code
-        session.code = code
-        session.line_count = line_count
+        checksum = code_checksum(code)
+        if session.test_results and session.test_results.get("checksum") == checksum:
+            return TestRunResult(**session.test_results)
+
+        result = await code_executor.run_tests(code, get_problem(session.problem_id))
+        session.test_results = {
+            **result.model_dump(),
+            "checksum": checksum,
+            "timestamp": time.time(),
+        }
+        session_manager.save_session(session)
+        return result
+
+    async def estimate_complexity(
+        self, code: str, problem: Dict[str, Any]
+    ) -> Optional[ComplexityEstimate]:
+        """Time the code at increasing input sizes, if enabled."""
+        if not (settings.sandbox_enabled and settings.complexity_estimation_enabled):
+            return None
+        return await complexity_estimator.estimate(code, problem)
+
+    async def run_incremental_review(
+        self,
+        session_id: str,
+        code: str,
+        line_count: int,
+        on_delta: Optional[ReviewDeltaHandler] = None,
+        on_decision: Optional[Callable[[bool], Awaitable[None]]] = None,
+    ) -> Optional[CodeReview]:
+        """
+        Review a code snapshot and inject the result into the Realtime conversation.
+        If `on_delta` is given, partial review sections are passed to it as they stream in.
 
-        # Check if we should trigger a review
-        lines_since_review = line_count - session.last_review_line
+        The code is analyzed locally first: syntax errors are answered without
+        GPT, and code that is semantically unchanged since the last review
+        isn't reviewed again. `on_decision` is told which way that went
+        (True if the review goes to GPT) before the review starts.
 
-        if lines_since_review >= self.review_threshold:
-            # Trigger incremental review
-            problem = get_problem(session.problem_id)
-            review = await code_reviewer.review_code(
-                code=code, problem=problem, is_final=False
-            )
+        Returns:
+            CodeReview for the snapshot, or None if the session is gone or
+            nothing meaningful changed
+        """
+        session = await session_manager.get_session(session_id)
+        if not session:
+            return None
 
-            # Store review
-            session.code_reviews.append(
-                {
-                    "line_count": line_count,
-                    "feedback": review.feedback,
-                    "bugs": review.bugs,
-                    "suggestions": review.suggestions,
-                    "timestamp": time.time(),
-                }
-            )
-            session.last_review_line = line_count
+        problem = get_problem(session.problem_id)
+        analysis = static_analyzer.analyze(code, solution_function_name(problem))
+        decision = static_analyzer.decide(analysis, session.last_review_fingerprint)
 
-            # Inject review into Realtime conversation
-            if session.realtime_session_id:
-                context = self._format_review_for_llm(review)
-                await openai_client.inject_context_to_session(
-                    session.realtime_session_id, context
+        if on_decision:
+            await on_decision(decision not in (UNCHANGED, SYNTAX_ERROR))
+        if decision == UNCHANGED:
+            return None
+        if decision == SYNTAX_ERROR:
+            review = static_analyzer.syntax_error_review(analysis, line_count)
+        else:
+            test_results = await self.run_tests(session_id, code)
+            try:
+                review = await code_reviewer.review_code(
+                    code=code,
+                    problem=problem,
+                    is_final=False,
+                    on_delta=on_delta,
+                    test_results=test_results,
+                    analysis=analysis,
+                    previous_code=session.last_reviewed_code,
+                    previous_reviews=session.code_reviews,
                 )
+            except (UpstreamOverloaded, UpstreamError) as e:
+                # Shed, or upstream is failing; the next trigger reviews newer code
+                print(f"Incremental review skipped for session {session_id}: {e}")
+                return None
+        session.last_review_fingerprint = analysis.fingerprint
+        session.last_reviewed_code = code
+
+        # Store review
+        session.code_reviews.append(
+            {
+                "line_count": line_count,
+                "feedback": review.feedback,
+                "bugs": review.bugs,
+                "suggestions": review.suggestions,
+                "timestamp": time.time(),
+            }
+        )
+        session_manager.save_session(session)
 
-            return review
+        # Inject review into Realtime conversation
+        if session.realtime_session_id:
+            context = self._format_review_for_llm(review)
+            await openai_client.inject_context_to_session(
+                session.realtime_session_id, context
+            )
 
-        return None
+        return review
 
-    async def handle_code_completion(self, session_id: str) -> Optional[CodeReview]:
+    async def handle_code_completion(
+        self, session_id: str, on_delta: Optional[ReviewDeltaHandler] = None
+    ) -> Optional[CodeReview]:
         """
         Handle when user marks code as complete.
-        Trigger final comprehensive review.
+        Trigger final comprehensive review, streaming partial sections to
+        `on_delta` if given.
         """
-        session = session_manager.get_session(session_id)
+        session = await session_manager.get_session(session_id)
         if not session:
             return None
 
         problem = get_problem(session.problem_id)
 
-        # Final comprehensive review
+        # Final comprehensive review, grounded in actual test results and timings
+        analysis = static_analyzer.analyze(session.code, solution_function_name(problem))
+        test_results, complexity = await asyncio.gather(
+            self.run_tests(session_id, session.code),
+            self.estimate_complexity(session.code, problem),
+        )
         final_review = await code_reviewer.review_code(
-            code=session.code, problem=problem, is_final=True
+            code=session.code,
+            problem=problem,
+            is_final=True,
+            on_delta=on_delta,
+            test_results=test_results,
+            complexity=complexity,
+            analysis=analysis,
+            previous_code=session.last_reviewed_code,
+            previous_reviews=session.code_reviews,
         )
+        self._apply_complexity(final_review, complexity, test_results)
 
         # Store final review
         session.code_reviews.append(
@@ -93,6 +221,11 @@ class InterviewOrchestrator:
                 "time_complexity": final_review.time_complexity,
                 "space_complexity": final_review.space_complexity,
                 "is_optimal": final_review.is_optimal,
+                "complexity_estimate": (
+                    final_review.complexity_estimate.model_dump()
+                    if final_review.complexity_estimate
+                    else None
+                ),
                 "is_final": True,
                 "timestamp": time.time(),
             }
@@ -107,9 +240,33 @@ class InterviewOrchestrator:
 
         # Update phase
         session.current_phase = InterviewPhase.EVALUATION
+        session_manager.save_session(session)
+        await self.schedule_evaluation(session_id)
 
         return final_review
 
+    def _apply_complexity(
+        self,
+        review: CodeReview,
+        complexity: Optional[ComplexityEstimate],
+        test_results: Optional[TestRunResult],
+    ) -> None:
+        """
+        Attach the measured complexity to the review. For code that passes its
+        tests, the measurement replaces GPT's time complexity and optimality verdict.
+        """
+        review.complexity_estimate = complexity
+        if not complexity or not complexity.time_complexity:
+            return
+
+        correct = test_results is None or (
+            not test_results.error and test_results.passed == test_results.total
+        )
+        if correct:
+            review.time_complexity = complexity.time_complexity
+            if complexity.is_optimal is not None:
+                review.is_optimal = complexity.is_optimal
+
     def _format_review_for_llm(self, review: CodeReview) -> str:
         """Format incremental review for injection into Realtime conversation."""
         context = f"[CODE REVIEW UPDATE - Line {review.line_count}]\n\n"
@@ -142,6 +299,12 @@ class InterviewOrchestrator:
             context += "\n"
 
         context += f"Time Complexity: {review.time_complexity}\n"
+        estimate = review.complexity_estimate
+        if estimate and estimate.time_complexity and estimate.slowdown is not None:
+            context += (
+                f"(Measured by timing: {estimate.time_complexity}, "
+                f"{estimate.slowdown}x the optimal solution's run time)\n"
+            )
         context += f"Space Complexity: {review.space_complexity}\n"
         context += f"Is Optimal: {'Yes' if review.is_optimal else 'No'}\n\n"
 
@@ -159,25 +322,118 @@ class InterviewOrchestrator:
 
         return context
 
-    def get_elapsed_time(self, session_id: str) -> Optional[float]:
+    async def handle_wrap_up(self, session_id: str, remaining: float) -> None:
+        """Tell the interviewer that time is nearly up."""
+        session = await session_manager.get_session(session_id)
+        if not session or session.current_phase in (
+            InterviewPhase.EVALUATION,
+            InterviewPhase.COMPLETE,
+        ):
+            return
+
+        if session.realtime_session_id:
+            minutes = max(1, round(remaining / 60))
+            context = (
+                f"[TIME CHECK - About {minutes} minute{'s' if minutes != 1 else ''} left]\n\n"
+                "[Let the candidate know time is nearly up. Help them finish or "
+                "summarize their approach, then move toward evaluation.]"
+            )
+            await openai_client.inject_context_to_session(
+                session.realtime_session_id, context
+            )
+
+    async def handle_time_expired(self, session_id: str) -> Optional[str]:
+        """
+        End an interview whose time ran out.
+
+        Returns:
+            The new phase, or None if the session is gone or already complete
+        """
+        session = await session_manager.get_session(session_id)
+        if not session or session.current_phase == InterviewPhase.COMPLETE:
+            return None
+
+        session.current_phase = InterviewPhase.COMPLETE
+        session.is_active = False
+        session_manager.save_session(session)
+        await self.schedule_evaluation(session_id)
+        return InterviewPhase.COMPLETE.value
+
+    async def schedule_evaluation(self, session_id: str) -> None:
+        """Queue the post-interview evaluation (at most one per session)."""
+        if settings.evaluation_jobs_enabled:
+            # In a thread: the queue's lock may be held through a worker's transaction
+            await asyncio.to_thread(
+                job_queue.enqueue,
+                EVALUATE_INTERVIEW,
+                {"session_id": session_id},
+                session_id=session_id,
+            )
+
+    async def _finished_session(
+        self, session_id: str
+    ) -> Tuple[Optional[InterviewSession], bool]:
+        """The session, resident or archived, and whether it is archived."""
+        session = await session_manager.get_session(session_id)
+        if session is not None:
+            return session, False
+        return session_manager.get_archived_session(session_id), True
+
+    async def evaluate_interview(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Background job: rate a finished interview with GPT and store the
+        ratings and notes on the session, which re-materializes its results.
+        """
+        session_id = payload["session_id"]
+        session, _ = await self._finished_session(session_id)
+        if session is None:
+            return {"skipped": "session not found"}
+
+        ratings, notes = await code_reviewer.evaluate_interview(
+            code=session.code,
+            problem=get_problem(session.problem_id),
+            reviews=session.code_reviews,
+            test_results=TestRunResult(**session.test_results) if session.test_results else None,
+        )
+
+        # The session may have been archived while GPT was busy
+        session, archived = await self._finished_session(session_id)
+        if session is None:
+            return {"skipped": "session not found"}
+        session.final_ratings = ratings.model_dump()
+        for field, items in notes.model_dump().items():
+            existing = session.llm_notes.setdefault(field, [])
+            existing.extend(item for item in items if item not in existing)
+        if archived:
+            session_manager.save_archived_session(session)
+        else:
+            session_manager.save_session(session)
+        return {"final_ratings": session.final_ratings}
+
+    async def get_elapsed_time(self, session_id: str) -> Optional[float]:
         """Get elapsed time in seconds for a session."""
-        session = session_manager.get_session(session_id)
+        session = await session_manager.get_session(session_id)
         if not session:
             return None
         return time.time() - session.start_time
 
-    def get_remaining_time(self, session_id: str) -> Optional[float]:
+    async def get_remaining_time(self, session_id: str) -> Optional[float]:
         """Get remaining time in seconds for a session."""
-        elapsed = self.get_elapsed_time(session_id)
+        elapsed = await self.get_elapsed_time(session_id)
         if elapsed is None:
             return None
         return max(0, settings.interview_duration_seconds - elapsed)
 
-    def is_time_expired(self, session_id: str) -> bool:
+    async def is_time_expired(self, session_id: str) -> bool:
         """Check if interview time has expired."""
-        remaining = self.get_remaining_time(session_id)
+        remaining = await self.get_remaining_time(session_id)
         return remaining is not None and remaining <= 0
 
 
 # Singleton instance
 interview_orchestrator = InterviewOrchestrator()
+job_queue.register(
+    EVALUATE_INTERVIEW,
+    interview_orchestrator.evaluate_interview,
+    concurrency=settings.evaluation_concurrency,
+)
@@ -0,0 +1,164 @@
+"""Server-side interview clock: pushes remaining time and fires phase deadlines."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional, Set
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models.messages import DeadlineMessage, PhaseUpdatedMessage, TimeUpdateMessage
+from app.services.event_bus import event_bus, session_channel
+from app.services.interview_orchestrator import interview_orchestrator
+from app.services.session_affinity import session_affinity
+from app.services.timing_wheel import TimingWheel
+
+# Deadline events
+WRAP_UP = "wrap_up"
+EXPIRED = "expired"
+
+
+class InterviewTimer:
+    """
+    One clock task for every interview in this process.
+
+    Each tracked session's deadlines (the wrap-up warning and the end of the
+    interview) sit on a timing wheel, so firing them costs nothing per
+    request and nothing per idle session. Every `push_interval` seconds a
+    `time_update` is published on each session's event-bus channel, so
+    connected clients no longer need to poll with `ping`, plus a `deadline`
+    message when one fires. Deadlines and pushes run as their own tasks, so a
+    slow wrap-up call for one session doesn't hold up the clock for the rest.
+
+    In a cluster only the session's owner node tracks it, so deadlines fire
+    once; other nodes answer `remaining` from the stored session instead.
+    """
+
+    def __init__(
+        self,
+        duration: float = 1800,
+        wrap_up_seconds: float = 300,
+        push_interval: float = 15.0,
+        tick_seconds: float = 1.0,
+    ):
+        self.duration = duration
+        self.wrap_up_seconds = wrap_up_seconds
+        self.push_interval = push_interval
+        self._wheel = TimingWheel(tick_seconds=tick_seconds, now=time.time())
+        self._ends: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._next_push = 0.0
+
+        self.pushes = 0
+        self.deadlines_fired = 0
+        self.expired = 0
+
+    def track(self, session_id: str, start_time: float) -> None:
+        """Schedule a session's deadlines (idempotent; ignored on non-owner nodes)."""
+        if session_id in self._ends or not session_affinity.is_local(session_id):
+            return
+        end = start_time + self.duration
+        self._ends[session_id] = end
+        if self.wrap_up_seconds > 0:
+            self._wheel.schedule((session_id, WRAP_UP), end - self.wrap_up_seconds)
+        self._wheel.schedule((session_id, EXPIRED), end)
+
+    def untrack(self, session_id: str) -> None:
+        self._ends.pop(session_id, None)
+        self._wheel.cancel((session_id, WRAP_UP))
+        self._wheel.cancel((session_id, EXPIRED))
+
+    def remaining(self, session_id: str) -> Optional[float]:
+        """Seconds left, without loading the session; None if untracked."""
+        end = self._ends.get(session_id)
+        if end is None:
+            return None
+        return max(0.0, end - time.time())
+
+    async def _push(self, session_id: str, message: BaseModel) -> None:
+        try:
+            await event_bus.publish(session_channel(session_id), message.model_dump())
+            self.pushes += 1
+        except Exception as e:
+            print(f"Timer push failed for session {session_id}: {e}")
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fire(self, session_id: str, event: str) -> None:
+        try:
+            await self._handle_deadline(session_id, event)
+        except Exception as e:
+            print(f"Timer deadline {event} failed for session {session_id}: {e}")
+
+    async def _handle_deadline(self, session_id: str, event: str) -> None:
+        self.deadlines_fired += 1
+        remaining = self.remaining(session_id) or 0.0
+
+        if event == WRAP_UP:
+            await self._push(session_id, DeadlineMessage(event=WRAP_UP, remaining=remaining))
+            await interview_orchestrator.handle_wrap_up(session_id, remaining)
+            return
+
+        self.expired += 1
+        expired = await interview_orchestrator.handle_time_expired(session_id)
+        await self._push(session_id, DeadlineMessage(event=EXPIRED, remaining=0.0))
+        if expired:
+            await self._push(session_id, PhaseUpdatedMessage(phase=expired))
+        self._ends.pop(session_id, None)
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Start due deadlines and, when the cadence is due, time updates; never waits."""
+        now = now or time.time()
+        for session_id, event in self._wheel.advance(now):
+            self._spawn(self._fire(session_id, event))
+
+        if self.push_interval > 0 and now >= self._next_push and self._ends:
+            self._next_push = now + self.push_interval
+            for session_id, end in list(self._ends.items()):
+                self._spawn(
+                    self._push(session_id, TimeUpdateMessage(remaining=max(0.0, end - now)))
+                )
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._wheel.tick_seconds)
+            self.tick()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked": len(self._ends),
+            "scheduled_deadlines": len(self._wheel),
+            "pushes": self.pushes,
+            "deadlines_fired": self.deadlines_fired,
+            "in_flight": len(self._tasks),
+            "expired": self.expired,
+        }
+
+
+# Singleton instance
+interview_timer = InterviewTimer(
+    duration=settings.interview_duration_seconds,
+    wrap_up_seconds=settings.interview_wrap_up_warning_seconds,
+    push_interval=settings.time_update_interval_seconds,
+)
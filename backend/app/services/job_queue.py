@@ -0,0 +1,379 @@
+"""Durable background jobs, stored in SQLite and run by a pool of asyncio workers."""
+
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.models.messages import JobUpdateMessage
+from app.services.event_bus import event_bus, session_channel
+from app.services.metrics import job_run_seconds, job_runs
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+COLUMNS = (
+    "id, kind, key, session_id, payload, status, attempts, max_attempts, "
+    "run_at, lease_until, created_at, updated_at, error, result"
+)
+
+
+class JobQueue:
+    """
+    Post-interview work, run off the request path.
+
+    Jobs are rows in a SQLite table, so they survive restarts and can be
+    shared by every worker process on the host. `enqueue` is idempotent per
+    key (by default one job per kind and session), so repeated triggers
+    don't duplicate work. `workers` asyncio tasks claim due jobs oldest
+    first, skipping kinds already at their concurrency limit in this
+    process. A claim is a lease: a job whose worker died is claimed again
+    once `lease_seconds` have passed (or failed, if that was its last
+    attempt), and a run is cancelled if it outlives its lease. A failed
+    attempt is retried after exponential backoff with jitter, up to the
+    job's `max_attempts`. The database is opened by `start` (or on first
+    use), and workers query it from a thread, off the event loop.
+
+    Every status change is published on the session's event bus channel as
+    a job_update message, so connected clients hear when results are ready.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        workers: int = 2,
+        max_attempts: int = 5,
+        backoff_seconds: float = 5.0,
+        backoff_max_seconds: float = 300.0,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, JobHandler] = {}
+        self._limits: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._claiming: Optional[asyncio.Lock] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.deduplicated = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """The connection, opened (and the table created) on first use."""
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "kind TEXT NOT NULL, "
+            "key TEXT NOT NULL UNIQUE, "
+            "session_id TEXT, "
+            "payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "max_attempts INTEGER NOT NULL, "
+            "run_at REAL NOT NULL, "
+            "lease_until REAL, "
+            "created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL, "
+            "error TEXT, "
+            "result TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, run_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_session ON jobs (session_id)")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def register(self, kind: str, handler: JobHandler, concurrency: int = 1) -> None:
+        """Run jobs of `kind` with `handler`, at most `concurrency` at once."""
+        self._handlers[kind] = handler
+        self._limits[kind] = max(1, concurrency)
+        self._running.setdefault(kind, 0)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        key: Optional[str] = None,
+        delay: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        Queue a job, unless one with the same key already exists.
+
+        Returns:
+            The job with this key: the new one, or the existing one untouched
+        """
+        key = key or f"{kind}:{session_id or ''}"
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs "
+                "(kind, key, session_id, payload, status, max_attempts, run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    kind,
+                    key,
+                    session_id,
+                    json.dumps(payload or {}),
+                    QUEUED,
+                    self.max_attempts,
+                    now + delay,
+                    now,
+                    now,
+                ),
+            )
+            conn.commit()
+            row = conn.execute(f"SELECT {COLUMNS} FROM jobs WHERE key = ?", (key,)).fetchone()
+        if cursor.rowcount:
+            self.enqueued += 1
+            if self._wakeup:
+                self._wakeup.set()
+        else:
+            self.deduplicated += 1
+        return self._from_row(row)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT {COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def jobs_for_session(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {COLUMNS} FROM jobs WHERE session_id = ? ORDER BY id",
+                (session_id,),
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _claim(self, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        """Lease the oldest due job of one of `kinds`, if any (runs in a thread)."""
+        now = time.time()
+        marks = ", ".join("?" for _ in kinds)
+        with self._lock:
+            conn = self._db()
+            # One statement, so concurrent claimers (other processes) can't take the same job
+            row = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                "WHERE id = ("
+                "SELECT id FROM jobs WHERE kind IN (" + marks + ") AND ("
+                "(status = ? AND run_at <= ?) "
+                "OR (status = ? AND lease_until <= ? AND attempts < max_attempts)) "
+                "ORDER BY run_at, id LIMIT 1) "
+                f"RETURNING {COLUMNS}",
+                (RUNNING, now + self.lease_seconds, now, *kinds, QUEUED, now, RUNNING, now),
+            ).fetchone()
+            conn.commit()
+        return self._from_row(row) if row else None
+
+    def _fail_abandoned(self) -> List[Dict[str, Any]]:
+        """
+        Fail jobs whose worker died during their last allowed attempt (runs
+        in a thread). Returns the jobs failed.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            rows = conn.execute(
+                "UPDATE jobs SET status = ?, lease_until = NULL, updated_at = ?, error = ? "
+                "WHERE status = ? AND lease_until <= ? AND attempts >= max_attempts "
+                f"RETURNING {COLUMNS}",
+                (FAILED, now, "Lease expired on the last attempt", RUNNING, now),
+            ).fetchall()
+            conn.commit()
+        return [self._from_row(row) for row in rows]
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _finish(self, job: Dict[str, Any], **fields: Any) -> None:
+        """Settle an attempt (runs in a thread)."""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            conn = self._db()
+            # Only while still holding the lease; a job reclaimed elsewhere isn't ours to settle
+            conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND attempts = ?",
+                (*fields.values(), job["id"], job["attempts"]),
+            )
+            conn.commit()
+        job.update(fields)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        """Run a claimed job (its slot in `_running` is already taken)."""
+        kind = job["kind"]
+        started = time.monotonic()
+        await self._publish(job)
+        try:
+            result = await asyncio.wait_for(
+                self._handlers[kind](job["payload"]), self.lease_seconds
+            )
+        except asyncio.CancelledError:
+            # Shutting down: give the attempt back so the job runs again on start
+            await asyncio.to_thread(
+                self._finish, job, status=QUEUED, attempts=job["attempts"] - 1, lease_until=None
+            )
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            print(f"Job {job['id']} ({kind}) attempt {job['attempts']} failed: {error}")
+            if job["attempts"] < job["max_attempts"]:
+                self.retried += 1
+                job_runs.inc(kind, "retried")
+                await asyncio.to_thread(
+                    self._finish,
+                    job,
+                    status=QUEUED,
+                    run_at=time.time() + self._backoff(job["attempts"]),
+                    lease_until=None,
+                    error=error,
+                )
+            else:
+                self.failed += 1
+                job_runs.inc(kind, "failed")
+                await asyncio.to_thread(
+                    self._finish, job, status=FAILED, lease_until=None, error=error
+                )
+        else:
+            self.succeeded += 1
+            job_runs.inc(kind, "succeeded")
+            await asyncio.to_thread(
+                self._finish,
+                job,
+                status=SUCCEEDED,
+                lease_until=None,
+                error=None,
+                result=json.dumps(result) if result is not None else None,
+            )
+        finally:
+            self._running[kind] -= 1
+            job_run_seconds.observe(time.monotonic() - started, kind)
+            if self._wakeup:
+                self._wakeup.set()
+        await self._publish(job)
+
+    async def _publish(self, job: Dict[str, Any]) -> None:
+        if not job["session_id"]:
+            return
+        message = JobUpdateMessage(
+            job_id=job["id"],
+            kind=job["kind"],
+            status=job["status"],
+            attempts=job["attempts"],
+            error=job["error"],
+        )
+        try:
+            await event_bus.publish(session_channel(job["session_id"]), message.model_dump())
+        except Exception as e:
+            print(f"Job update push failed for session {job['session_id']}: {e}")
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            job = None
+            abandoned: List[Dict[str, Any]] = []
+            # One claim at a time, so workers don't both fill a kind's last slot
+            async with self._claiming:
+                kinds = [kind for kind, limit in self._limits.items() if self._running[kind] < limit]
+                try:
+                    abandoned = await asyncio.to_thread(self._fail_abandoned)
+                    if kinds:
+                        job = await asyncio.to_thread(self._claim, kinds)
+                except sqlite3.Error as e:
+                    print(f"Job claim failed: {e}")
+                if job is not None:
+                    self._running[job["kind"]] += 1
+            for failed in abandoned:
+                self.failed += 1
+                job_runs.inc(failed["kind"], "failed")
+                await self._publish(failed)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def start(self) -> None:
+        """Start the worker tasks."""
+        with self._lock:
+            self._db()
+        if self._tasks or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._claiming = asyncio.Lock()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running are queued again."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return {
+            "workers": len(self._tasks),
+            "jobs": {status: count for status, count in rows},
+            "running": dict(self._running),
+            "enqueued": self.enqueued,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+# Singleton instance
+job_queue = JobQueue(
+    path=settings.job_queue_path,
+    workers=settings.job_workers,
+    max_attempts=settings.job_max_attempts,
+    backoff_seconds=settings.job_retry_backoff_seconds,
+    backoff_max_seconds=settings.job_retry_backoff_max_seconds,
+    lease_seconds=settings.job_lease_seconds,
+)
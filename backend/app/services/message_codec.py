@@ -0,0 +1,177 @@
+"""Wire codecs for the session WebSocket, negotiated by subprotocol."""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, ValidationError
+
+from app.models.messages import ClientMessage, client_message_adapter
+from app.services.metrics import websocket_message_bytes, websocket_messages
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+Frame = Union[str, bytes]
+
+
+class MessageError(ValueError):
+    """A client frame that couldn't be decoded or isn't a known message."""
+
+
+class MessageCodec:
+    """Encodes payloads to WebSocket frames and back."""
+
+    name = ""
+    binary = False  # Whether frames are sent as binary rather than text
+
+    @property
+    def subprotocol(self) -> str:
+        return f"algoview.{self.name}"
+
+    def encode(self, payload: Dict[str, Any]) -> Frame:
+        raise NotImplementedError
+
+    def decode(self, frame: Frame) -> Any:
+        raise NotImplementedError
+
+
+class JSONCodec(MessageCodec):
+    """Stdlib JSON in text frames; the default when no subprotocol is offered."""
+
+    name = "json"
+
+    def encode(self, payload: Dict[str, Any]) -> Frame:
+        return json.dumps(payload, separators=(",", ":"))
+
+    def decode(self, frame: Frame) -> Any:
+        return json.loads(frame)
+
+
+class ORJSONCodec(MessageCodec):
+    """orjson in binary frames (UTF-8 JSON), skipping the str round trip."""
+
+    name = "orjson"
+    binary = True
+
+    def encode(self, payload: Dict[str, Any]) -> Frame:
+        return orjson.dumps(payload)
+
+    def decode(self, frame: Frame) -> Any:
+        return orjson.loads(frame)
+
+
+class MsgPackCodec(MessageCodec):
+    """MessagePack in binary frames."""
+
+    name = "msgpack"
+    binary = True
+
+    def encode(self, payload: Dict[str, Any]) -> Frame:
+        return msgpack.packb(payload, use_bin_type=True)
+
+    def decode(self, frame: Frame) -> Any:
+        if isinstance(frame, str):
+            raise MessageError("Expected a binary MessagePack frame")
+        return msgpack.unpackb(frame, raw=False)
+
+
+CODECS: Dict[str, MessageCodec] = {JSONCodec.name: JSONCodec()}
+if ORJSON_AVAILABLE:
+    CODECS[ORJSONCodec.name] = ORJSONCodec()
+if MSGPACK_AVAILABLE:
+    CODECS[MsgPackCodec.name] = MsgPackCodec()
+
+DEFAULT_CODEC = CODECS[JSONCodec.name]
+
+
+def negotiate_codec(offered: List[str]) -> Optional[MessageCodec]:
+    """First codec the client offered (in its order of preference) that we support."""
+    by_subprotocol = {codec.subprotocol: codec for codec in CODECS.values()}
+    for subprotocol in offered:
+        codec = by_subprotocol.get(subprotocol.strip())
+        if codec is not None:
+            return codec
+    return None
+
+
+def encode_message(codec: MessageCodec, message: BaseModel) -> Frame:
+    return codec.encode(message.model_dump())
+
+
+def decode_message(codec: MessageCodec, frame: Frame) -> ClientMessage:
+    """Decode and validate a client frame."""
+    try:
+        payload = codec.decode(frame)
+    except MessageError:
+        raise
+    except Exception as e:
+        raise MessageError(f"Undecodable {codec.name} frame: {e}") from e
+
+    try:
+        return client_message_adapter.validate_python(payload)
+    except ValidationError as e:
+        error = e.errors()[0]
+        if error["type"] == "union_tag_invalid":
+            raise MessageError(f"Unknown message type: {error['ctx']['tag']}") from e
+        if error["type"] == "union_tag_not_found":
+            raise MessageError("Message has no type") from e
+        location = ".".join(str(part) for part in error["loc"][1:])
+        raise MessageError(f"Invalid {error['loc'][0]} message: {location} {error['msg']}") from e
+
+
+class MessageChannel:
+    """
+    A WebSocket speaking typed messages through one codec.
+
+    Sends are serialized, since direct replies and event-bus deliveries come
+    from different tasks.
+    """
+
+    def __init__(self, websocket: WebSocket, codec: MessageCodec = DEFAULT_CODEC):
+        self.websocket = websocket
+        self.codec = codec
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: BaseModel) -> None:
+        await self.send_payload(message.model_dump())
+
+    async def send_payload(self, payload: Dict[str, Any]) -> None:
+        """Send an already-dumped message, e.g. one delivered by the event bus."""
+        frame = self.codec.encode(payload)
+        websocket_messages.inc("out", payload.get("type", ""))
+        websocket_message_bytes.observe(len(frame), "out")
+        async with self._send_lock:
+            if self.codec.binary:
+                await self.websocket.send_bytes(frame)
+            else:
+                await self.websocket.send_text(frame)
+
+    async def receive(self) -> ClientMessage:
+        """Next client message; raises MessageError for bad frames."""
+        event = await self.websocket.receive()
+        if event["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(event.get("code", 1000))
+        frame = event.get("bytes")
+        if frame is None:
+            frame = event.get("text", "")
+        websocket_message_bytes.observe(len(frame), "in")
+        try:
+            message = decode_message(self.codec, frame)
+        except MessageError:
+            websocket_messages.inc("in", "invalid")
+            raise
+        websocket_messages.inc("in", message.type)
+        return message
@@ -0,0 +1,302 @@
+"""In-process metrics, rendered at /metrics in the Prometheus text format."""
+
+import asyncio
+import bisect
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """A named metric family with optional labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Sequence[str], float]]:
+        """(name suffix, label names, label values, value) for each sample."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """Monotonic count, e.g. `messages.inc("in", "ping")`."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield "", self.labelnames, labels, value
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Bucketed distribution of observations.
+
+    Each label set keeps plain per-bucket counts plus a sum; they're made
+    cumulative only when rendered, so an observation is one bisect and two
+    additions.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", names, labels + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, labels, self._sums[labels]
+            yield "_count", self.labelnames, labels, cumulative
+
+
+class CallbackMetric(Metric):
+    """Values read at scrape time from a function returning {label values: value}."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Labels, float]],
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def samples(self):
+        try:
+            values = self.collect()
+        except Exception as e:
+            print(f"Metric {self.name} collection failed: {e}")
+            return
+        for labels, value in sorted(values.items()):
+            yield "", self.labelnames, labels, value
+
+
+class MetricsRegistry:
+    """
+    All metrics of this process.
+
+    Recording is a dict update on the event loop thread, with no locks and
+    no I/O; everything is formatted only when /metrics is scraped. Counters
+    kept by services for /stats are exposed through callbacks rather than
+    counted twice.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Labels, float]],
+        kind: str = "gauge",
+    ) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, labelnames, collect, kind))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag: how late a periodic sleep wakes up."""
+
+    def __init__(self, histogram: Histogram, interval: float = 0.5):
+        self.histogram = histogram
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.histogram.observe(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+# Hot-path metrics, recorded where the work happens
+openai_request_seconds = metrics.histogram(
+    "algoview_openai_request_seconds",
+    "OpenAI call latency, by call type.",
+    ("call",),
+)
+openai_errors = metrics.counter(
+    "algoview_openai_errors_total",
+    "Failed OpenAI calls, by call type.",
+    ("call",),
+)
+openai_retries = metrics.counter(
+    "algoview_openai_retries_total",
+    "Retried OpenAI attempts, by call type and reason.",
+    ("call", "reason"),
+)
+openai_hedges = metrics.counter(
+    "algoview_openai_hedges_total",
+    "Hedged duplicate OpenAI requests, by call type and outcome (sent or won).",
+    ("call", "outcome"),
+)
+review_triggers = metrics.counter(
+    "algoview_review_triggers_total",
+    "Reviews started, by kind (incremental or final).",
+    ("kind",),
+)
+websocket_connections = metrics.gauge(
+    "algoview_websocket_connections",
+    "Open session WebSockets.",
+)
+websocket_messages = metrics.counter(
+    "algoview_websocket_messages_total",
+    "WebSocket messages, by direction (in or out) and message type.",
+    ("direction", "type"),
+)
+websocket_message_bytes = metrics.histogram(
+    "algoview_websocket_message_bytes",
+    "Encoded WebSocket frame sizes, by direction.",
+    ("direction",),
+    buckets=SIZE_BUCKETS,
+)
+event_loop_lag_seconds = metrics.histogram(
+    "algoview_event_loop_lag_seconds",
+    "How late the event loop ran a periodic probe.",
+    buckets=LAG_BUCKETS,
+)
+job_runs = metrics.counter(
+    "algoview_job_runs_total",
+    "Background job attempts, by kind and outcome (succeeded, retried or failed).",
+    ("kind", "outcome"),
+)
+job_run_seconds = metrics.histogram(
+    "algoview_job_run_seconds",
+    "Background job attempt duration, by kind.",
+    ("kind",),
+)
+
+loop_lag_monitor = LoopLagMonitor(
+    event_loop_lag_seconds, interval=settings.metrics_loop_lag_interval_seconds
+)
@@ -1,8 +1,18 @@
 """OpenAI API client for Realtime API and GPT-4."""
 
+import time
 import httpx
 from typing import Dict, Any
 from app.config import settings
+from app.services.http_pool import http_pool
+from app.services.metrics import openai_errors, openai_request_seconds
+from app.services.upstream_resilience import upstream_resilience
+from app.services.upstream_scheduler import (
+    Priority,
+    UpstreamOverloaded,
+    estimate_tokens,
+    upstream_scheduler,
+)
 
 
 INTERVIEWER_SYSTEM_PROMPT = """You are an expert technical interviewer conducting a coding interview.
@@ -53,12 +63,20 @@ class OpenAIClient:
 
     def __init__(self):
         self.api_key = settings.openai_api_key
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = settings.openai_base_url.rstrip("/")
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
+    async def _post(self, url: str, payload: Dict[str, Any], timeout: float) -> httpx.Response:
+        """One POST attempt; error statuses raise so they can be retried."""
+        response = await http_pool.client.post(
+            url, json=payload, headers=self.headers, timeout=http_pool.timeout(timeout)
+        )
+        response.raise_for_status()
+        return response
+
     async def create_ephemeral_key(self) -> Dict[str, Any]:
         """
         Create ephemeral API key for Realtime session.
@@ -69,26 +87,36 @@ class OpenAIClient:
                 "type": "realtime",
                 "model": settings.realtime_model,
                 "instructions": INTERVIEWER_SYSTEM_PROMPT,
-            }
+            },
+            "expires_after": {
+                "anchor": "created_at",
+                "seconds": settings.ephemeral_key_ttl_seconds,
+            },
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/realtime/client_secrets",
-                    json=session_config,
-                    headers=self.headers,
-                    timeout=30.0,
+        try:
+            async with upstream_scheduler.slot(Priority.EPHEMERAL_KEY) as grant:
+                started = time.monotonic()
+                response = await upstream_resilience.call(
+                    "ephemeral_key",
+                    lambda: self._post(
+                        f"{self.base_url}/realtime/client_secrets",
+                        session_config,
+                        settings.openai_ephemeral_key_timeout,
+                    ),
+                    grant=grant,
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                error_detail = e.response.text
-                print(f"OpenAI API error: {e.response.status_code} - {error_detail}")
-                raise Exception(f"OpenAI API error: {e.response.status_code} - {error_detail}")
-            except Exception as e:
-                print(f"Failed to create ephemeral key: {e}")
-                raise
+                openai_request_seconds.observe(time.monotonic() - started, "ephemeral_key")
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            openai_errors.inc("ephemeral_key")
+            error_detail = e.response.text
+            print(f"OpenAI API error: {e.response.status_code} - {error_detail}")
+            raise Exception(f"OpenAI API error: {e.response.status_code} - {error_detail}")
+        except Exception as e:
+            openai_errors.inc("ephemeral_key")
+            print(f"Failed to create ephemeral key: {e}")
+            raise
 
     async def inject_context_to_session(
         self, session_id: str, content: str
@@ -114,20 +142,30 @@ class OpenAIClient:
             },
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/realtime/sessions/{session_id}/items",
-                    json=item_data,
-                    headers=self.headers,
-                    timeout=10.0,
+        try:
+            async with upstream_scheduler.slot(
+                Priority.CONTEXT_INJECTION, tokens=estimate_tokens(content)
+            ) as grant:
+                started = time.monotonic()
+                response = await upstream_resilience.call(
+                    "context_injection",
+                    lambda: self._post(
+                        f"{self.base_url}/realtime/sessions/{session_id}/items",
+                        item_data,
+                        settings.openai_inject_timeout,
+                    ),
+                    grant=grant,
                 )
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Failed to inject context: {e}")
-                # Non-critical error - the interview can continue
-                return {"error": str(e)}
+                openai_request_seconds.observe(time.monotonic() - started, "context_injection")
+            return response.json()
+        except UpstreamOverloaded as e:
+            print(f"Skipped context injection: {e}")
+            return {"error": str(e)}
+        except Exception as e:
+            openai_errors.inc("context_injection")
+            print(f"Failed to inject context: {e}")
+            # Non-critical error - the interview can continue
+            return {"error": str(e)}
 
 
 # Singleton instance
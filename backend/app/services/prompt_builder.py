@@ -0,0 +1,409 @@
+"""Token-budgeted review prompts with stable per-problem prefixes."""
+
+import difflib
+from typing import Any, Dict, List, Optional, Set
+
+from app.config import settings
+
+try:
+    import tiktoken
+
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+SYSTEM_PROMPT = "You are an expert code reviewer for technical interviews. Provide constructive, specific feedback."
+
+INCREMENTAL = "incremental"
+FINAL = "final"
+EVALUATION = "evaluation"
+
+# Unchanged lines always shown around each changed line when windowing
+CONTEXT_LINES = 3
+
+# Prompt size buckets (tokens) for the latency breakdown in stats
+SIZE_BUCKETS = (500, 1000, 2000, 4000)
+
+INCREMENTAL_TEMPLATE = """You are reviewing in-progress code for the following problem:
+
+**Problem**: {title}
+{description}
+
+Provide a BRIEF review (2-3 sentences max) focusing on:
+1. Any obvious bugs or syntax errors
+2. If they're on the right track
+3. One quick suggestion if needed
+
+Be encouraging! This is work in progress. Format your response as:
+
+FEEDBACK: [your brief feedback]
+BUGS: [list any bugs, one per line, or "None"]
+SUGGESTIONS: [one suggestion, or "None"]
+"""
+
+FINAL_TEMPLATE = """You are reviewing the FINAL solution for the following problem:
+
+**Problem**: {title}
+{description}
+
+**Optimal Solution** (for reference):
+```python
+{optimal_solution}
+```
+Time: {time_complexity}, Space: {space_complexity}
+
+Provide a comprehensive review:
+1. Does the solution work correctly?
+2. Any bugs or edge cases missed?
+3. Time and space complexity analysis
+4. Is this optimal? If not, what's better?
+5. Code quality feedback
+
+Format your response as:
+
+FEEDBACK: [detailed feedback paragraph]
+BUGS: [list bugs, one per line, or "None"]
+SUGGESTIONS: [list suggestions, one per line, or "None"]
+TIME_COMPLEXITY: [e.g., O(n)]
+SPACE_COMPLEXITY: [e.g., O(1)]
+IS_OPTIMAL: [Yes or No]
+"""
+
+EVALUATION_TEMPLATE = """You are evaluating a finished technical interview for the following problem:
+
+**Problem**: {title}
+{description}
+
+Rate the candidate from 1 (poor) to 5 (excellent) on communication, problem
+solving, code quality, technical skills and optimization, and take brief
+notes. The voice conversation isn't available: judge communication and soft
+skills from how clearly the code is written and how it evolved across the
+reviews, and keep those notes short.
+
+Respond with a JSON object with exactly these keys:
+"communication", "problem_solving", "code_quality", "technical_skills",
+"optimization" (integers 1-5), "overall_feedback" (one paragraph),
+"would_hire" (true or false), and "notes": an object with the lists
+"clarifying_questions", "technical_skills", "soft_skills" and "concerns"
+(short strings).
+"""
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when installed, else about 4 characters per token."""
+
+    def __init__(self, model: str):
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+
+def changed_lines(previous: str, code: str) -> List[int]:
+    """Indexes of lines in `code` that were added or rewritten since `previous`."""
+    matcher = difflib.SequenceMatcher(
+        None, previous.splitlines(), code.splitlines(), autojunk=False
+    )
+    changed: List[int] = []
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        # Pure deletions have no lines of their own; point at where they were
+        changed.extend(range(j1, j2) if j2 > j1 else [j1])
+    return changed
+
+
+def _omitted_marker(count: int) -> str:
+    return f"# ... {count} line{'s' if count != 1 else ''} omitted ..."
+
+
+def window_code(
+    code: str, previous: str, budget: int, counter: TokenCounter
+) -> Optional[str]:
+    """
+    Fit code into `budget` tokens, keeping def/class headers and the lines
+    nearest to what changed since `previous` (the end of the code if nothing
+    is known). Omitted stretches are replaced by a marker comment.
+
+    Returns:
+        The windowed code, or None if the code already fits
+    """
+    if counter.count(code) <= budget:
+        return None
+
+    lines = code.splitlines()
+    if not lines:
+        return None
+    last = len(lines) - 1
+    focus = [min(index, last) for index in changed_lines(previous, code)] if previous else []
+    if not focus:
+        focus = [last]
+
+    costs = [counter.count(line + "\n") for line in lines]
+    marker_cost = counter.count("# ... 000 lines omitted ...\n")
+    kept: Set[int] = set()
+    used = marker_cost  # A trailing or leading marker is almost always needed
+
+    def keep(index: int) -> bool:
+        nonlocal used
+        if index in kept:
+            return True
+        # A line with no kept neighbour opens a new island, and with it a marker
+        cost = costs[index]
+        if index - 1 not in kept and index + 1 not in kept:
+            cost += marker_cost
+        if used + cost > budget:
+            return False
+        kept.add(index)
+        used += cost
+        return True
+
+    def by_distance(start: int, stop: int) -> List[int]:
+        ring = []
+        for radius in range(start, stop):
+            for index in focus:
+                ring.extend(i for i in (index - radius, index + radius) if 0 <= i <= last)
+        return ring
+
+    headers = [
+        index
+        for index, line in enumerate(lines)
+        if line.lstrip().startswith(("def ", "async def ", "class "))
+    ]
+
+    # Changed lines (latest edits first) and their immediate context, then
+    # def/class headers for structure; these skip lines that don't fit
+    for index in sorted(set(focus), reverse=True) + by_distance(1, CONTEXT_LINES + 1) + headers:
+        keep(index)
+    # Then widen the windows until the budget runs out
+    for index in by_distance(CONTEXT_LINES + 1, len(lines)):
+        if not keep(index):
+            break
+
+    windowed: List[str] = []
+    omitted = 0
+    for index, line in enumerate(lines):
+        if index in kept:
+            if omitted:
+                windowed.append(_omitted_marker(omitted))
+                omitted = 0
+            windowed.append(line)
+        else:
+            omitted += 1
+    if omitted:
+        windowed.append(_omitted_marker(omitted))
+    return "\n".join(windowed)
+
+
+def summarize_reviews(reviews: List[Dict[str, Any]], limit: int) -> str:
+    """One line per recent incremental review: its first sentence and bug count."""
+    if limit <= 0:
+        return ""
+    lines = []
+    for review in [r for r in reviews if not r.get("is_final")][-limit:]:
+        feedback = (review.get("feedback") or "").strip()
+        first_sentence = feedback.split(". ")[0].rstrip(".")
+        if len(first_sentence) > 160:
+            first_sentence = first_sentence[:157] + "..."
+        bugs = len(review.get("bugs") or [])
+        line = f"- At {review.get('line_count', '?')} lines: {first_sentence}."
+        if bugs:
+            line += f" ({bugs} bug{'s' if bugs != 1 else ''} flagged)"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class Prompt:
+    """A built review prompt and its size."""
+
+    def __init__(self, kind: str, messages: List[Dict[str, str]], tokens: int, windowed: bool):
+        self.kind = kind
+        self.messages = messages
+        self.tokens = tokens
+        self.windowed = windowed
+
+
+class PromptBuilder:
+    """
+    Build review prompts within a token budget.
+
+    Each problem's system message, problem statement and instructions are
+    rendered once and reused verbatim, so every prompt for a problem starts
+    with the same prefix and upstream prompt caching can hit. Only the tail
+    varies: the candidate's code (windowed around recent changes when it
+    exceeds the code budget), compact summaries of earlier reviews, and the
+    test, complexity and analysis sections.
+    """
+
+    def __init__(self, code_token_budget: int = 2000, previous_reviews: int = 3):
+        self.code_token_budget = code_token_budget
+        self.previous_reviews = previous_reviews
+        self.counter = TokenCounter(settings.gpt4_model)
+        self._prefixes: Dict[str, str] = {}
+        self._prefix_tokens: Dict[str, int] = {}
+
+        self._calls = {INCREMENTAL: 0, FINAL: 0, EVALUATION: 0}
+        self._tokens_total = {INCREMENTAL: 0, FINAL: 0, EVALUATION: 0}
+        self._tokens_max = {INCREMENTAL: 0, FINAL: 0, EVALUATION: 0}
+        self._windowed = {INCREMENTAL: 0, FINAL: 0, EVALUATION: 0}
+        self._latency: Dict[str, List[float]] = {}
+
+    def _prefix(self, kind: str, problem: Dict[str, Any]) -> str:
+        """Precompiled problem-specific prefix of the user message."""
+        key = f"{kind}:{problem['id']}"
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            template = {
+                INCREMENTAL: INCREMENTAL_TEMPLATE,
+                FINAL: FINAL_TEMPLATE,
+                EVALUATION: EVALUATION_TEMPLATE,
+            }[kind]
+            prefix = template.format(**problem)
+            self._prefixes[key] = prefix
+            self._prefix_tokens[key] = self.counter.count(SYSTEM_PROMPT) + self.counter.count(
+                prefix
+            )
+        return prefix
+
+    def build(
+        self,
+        code: str,
+        problem: Dict[str, Any],
+        is_final: bool = False,
+        previous_code: str = "",
+        previous_reviews: Optional[List[Dict[str, Any]]] = None,
+        tests_summary: str = "",
+        complexity_summary: str = "",
+        analysis_summary: str = "",
+    ) -> Prompt:
+        """Build the messages for a review of `code`."""
+        kind = FINAL if is_final else INCREMENTAL
+        prefix = self._prefix(kind, problem)
+
+        windowed = window_code(code, previous_code, self.code_token_budget, self.counter)
+        if windowed is None:
+            code_heading = "**Candidate's Solution**" if is_final else "**Current Code** (in progress)"
+            shown = code
+        else:
+            code_heading = (
+                "**Candidate's Code** (long; unchanged stretches are omitted, "
+                "recent changes are shown in full)"
+            )
+            shown = windowed
+
+        sections = [f"\n{code_heading}:\n```python\n{shown}\n```\n"]
+        history = summarize_reviews(previous_reviews or [], self.previous_reviews)
+        if history:
+            sections.append(f"\n**Earlier Feedback** (already given; don't repeat it):\n{history}\n")
+        if tests_summary:
+            sections.append(
+                "\n**Test Results** (from actually running the code on the problem's examples):\n"
+                f"{tests_summary}\n"
+            )
+        if complexity_summary:
+            sections.append(
+                "\n**Measured Complexity** (from timing the code at increasing input sizes; "
+                f"prefer this over reading the code):\n{complexity_summary}\n"
+            )
+        if analysis_summary:
+            sections.append(f"\n**Static Analysis**:\n{analysis_summary}\n")
+
+        tail = "".join(sections)
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prefix + tail},
+        ]
+        tokens = self._prefix_tokens[f"{kind}:{problem['id']}"] + self.counter.count(tail)
+
+        self._calls[kind] += 1
+        self._tokens_total[kind] += tokens
+        self._tokens_max[kind] = max(self._tokens_max[kind], tokens)
+        if windowed is not None:
+            self._windowed[kind] += 1
+        return Prompt(kind, messages, tokens, windowed is not None)
+
+    def build_evaluation(
+        self,
+        code: str,
+        problem: Dict[str, Any],
+        reviews: List[Dict[str, Any]],
+        tests_summary: str = "",
+    ) -> Prompt:
+        """Build the messages for rating a finished interview."""
+        prefix = self._prefix(EVALUATION, problem)
+        sections = [f"\n**Candidate's Final Code**:\n```python\n{code}\n```\n"]
+        history = summarize_reviews(reviews, len(reviews))
+        if history:
+            sections.append(f"\n**Reviews During the Interview**:\n{history}\n")
+        final_review = next((r for r in reversed(reviews) if r.get("is_final")), None)
+        if final_review:
+            sections.append(
+                f"\n**Final Review**:\n{final_review.get('feedback', '')}\n"
+                f"Time: {final_review.get('time_complexity') or 'unknown'}, "
+                f"Space: {final_review.get('space_complexity') or 'unknown'}, "
+                f"Optimal: {'Yes' if final_review.get('is_optimal') else 'No'}\n"
+            )
+        if tests_summary:
+            sections.append(f"\n**Test Results**:\n{tests_summary}\n")
+
+        tail = "".join(sections)
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prefix + tail},
+        ]
+        tokens = self._prefix_tokens[f"{EVALUATION}:{problem['id']}"] + self.counter.count(tail)
+        self._calls[EVALUATION] += 1
+        self._tokens_total[EVALUATION] += tokens
+        self._tokens_max[EVALUATION] = max(self._tokens_max[EVALUATION], tokens)
+        return Prompt(EVALUATION, messages, tokens, False)
+
+    def record_latency(self, prompt: Prompt, seconds: float) -> None:
+        """Record how long the upstream call for `prompt` took, by prompt size."""
+        bucket = next(
+            (f"<{limit}" for limit in SIZE_BUCKETS if prompt.tokens < limit),
+            f">={SIZE_BUCKETS[-1]}",
+        )
+        samples = self._latency.setdefault(f"{prompt.kind}:{bucket}", [0, 0.0])
+        samples[0] += 1
+        samples[1] += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "exact_token_counts": self.counter.exact,
+            "code_token_budget": self.code_token_budget,
+            "cached_prefixes": len(self._prefixes),
+            "prompts": {
+                kind: {
+                    "calls": self._calls[kind],
+                    "avg_tokens": round(self._tokens_total[kind] / self._calls[kind])
+                    if self._calls[kind]
+                    else None,
+                    "max_tokens": self._tokens_max[kind],
+                    "windowed": self._windowed[kind],
+                }
+                for kind in (INCREMENTAL, FINAL, EVALUATION)
+            },
+            "latency_ms_by_size": {
+                key: {"calls": count, "avg": round(total / count * 1000, 1)}
+                for key, (count, total) in sorted(self._latency.items())
+            },
+        }
+
+
+# Singleton instance
+prompt_builder = PromptBuilder(
+    code_token_budget=settings.prompt_code_token_budget,
+    previous_reviews=settings.prompt_previous_reviews,
+)
@@ -0,0 +1,183 @@
+"""Cache of pre-serialized, pre-compressed JSON responses with strong ETags."""
+
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+if BROTLI_AVAILABLE:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=5)
+
+# Short suffixes so each encoding gets its own strong validator
+ENCODING_TAGS = {"gzip": "gz", "br": "br"}
+
+
+def _accepted_encodings(request: Request) -> set:
+    """Content codings the client accepts (those not given q=0)."""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    pass
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serialize(payload: Any) -> bytes:
+    """Compact UTF-8 JSON, as every cached body is stored."""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class CachedBody:
+    """One serialized payload and its compressed variants, built on demand."""
+
+    def __init__(self, version: str, body: bytes):
+        self.version = version
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.encoded: Dict[str, bytes] = {}
+
+    def etag(self, encoding: Optional[str]) -> str:
+        if encoding is None:
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{ENCODING_TAGS[encoding]}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether any tag in an If-None-Match header names this payload."""
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').split("-")[0] == self.digest:
+                return True
+        return False
+
+
+class ResponseCache:
+    """
+    LRU of JSON response bodies for read-heavy endpoints.
+
+    Each entry is stored with the version of the data it was built from
+    (catalog version, session revision); a lookup with a different version
+    rebuilds it. Bodies are serialized once, compressed once per encoding
+    (gzip, plus brotli when installed) above `min_compress_bytes`, and carry
+    a strong ETag, so a repeat poll with `If-None-Match` gets an empty 304.
+    """
+
+    def __init__(self, max_entries: int = 512, min_compress_bytes: int = 1024):
+        self.max_entries = max_entries
+        self.min_compress_bytes = min_compress_bytes
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.compressed = 0
+
+    def _get(self, key: str, version: str, build: Callable[[], Any]) -> CachedBody:
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = CachedBody(version, serialize(build()))
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def respond(
+        self,
+        request: Request,
+        key: str,
+        version: str,
+        build: Callable[[], Any],
+        cache_control: str = "no-cache",
+    ) -> Response:
+        """
+        Serve the payload for `key`, calling `build` only when the cached one
+        is missing or was built from a different `version`.
+        """
+        return self.send(request, self._get(key, version, build), cache_control)
+
+    def send(
+        self, request: Request, entry: CachedBody, cache_control: str = "no-cache"
+    ) -> Response:
+        """Serve a pre-serialized body, honouring If-None-Match and Accept-Encoding."""
+        encoding = None
+        if len(entry.body) >= self.min_compress_bytes:
+            accepted = _accepted_encodings(request)
+            encoding = next(
+                (name for name in ("br", "gzip") if name in ENCODERS and name in accepted),
+                None,
+            )
+
+        headers = {
+            "ETag": entry.etag(encoding),
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entry.matches(if_none_match):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        body = entry.body
+        if encoding:
+            body = entry.encoded.get(encoding)
+            if body is None:
+                body = entry.encoded[encoding] = ENCODERS[encoding](entry.body)
+                self.compressed += 1
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "compressed": self.compressed,
+            "encodings": sorted(ENCODERS),
+        }
+
+
+# Singleton instance
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    min_compress_bytes=settings.response_compression_min_bytes,
+)
@@ -0,0 +1,152 @@
+"""Materialized interview results: built once, stored as immutable bytes."""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.config import settings
+from app.models import InterviewPhase, InterviewSession
+from app.services.response_cache import CachedBody, serialize
+from app.services.session_affinity import is_session_id
+from data.problems import get_problem
+
+# Phases after which the results no longer change with the candidate's work
+FINISHED_PHASES = (InterviewPhase.EVALUATION, InterviewPhase.COMPLETE)
+
+
+def build_results(session: InterviewSession) -> Dict[str, Any]:
+    """The results report for a session, as served by /api/session/results."""
+    final_review = next(
+        (review for review in session.code_reviews if review.get("is_final")), None
+    )
+    return {
+        "session_id": session.session_id,
+        "problem": get_problem(session.problem_id),
+        "candidate_code": session.code,
+        "final_review": final_review,
+        "llm_notes": session.llm_notes,
+        "final_ratings": session.final_ratings,
+    }
+
+
+class ResultsStore:
+    """
+    Results documents of finished interviews.
+
+    A session's report is rendered and serialized when it reaches EVALUATION
+    or COMPLETE, and re-rendered only if it is saved again with different
+    content, which bumps the document's `version`. Reads are a dict lookup
+    returning the stored bytes (with their ETag and compressed variants);
+    the in-memory tier keeps `max_entries` documents, least recently used
+    dropped first. If `directory` is set each document is also written there,
+    so reports survive eviction and restarts, and exports can stream them
+    straight from disk.
+    """
+
+    def __init__(self, max_entries: int = 10000, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._documents: "OrderedDict[str, CachedBody]" = OrderedDict()
+
+        self.materialized = 0
+        self.unchanged = 0
+        self.hits = 0
+        self.disk_reads = 0
+        self.misses = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.json")
+
+    def _remember(self, session_id: str, document: CachedBody) -> None:
+        self._documents[session_id] = document
+        self._documents.move_to_end(session_id)
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+
+    def materialize(self, session: InterviewSession) -> CachedBody:
+        """Render and store the session's report, unless it's unchanged."""
+        report = build_results(session)
+        current = self._load(session.session_id)
+        if current is not None:
+            previous = json.loads(current.body)
+            previous.pop("version")
+            previous.pop("materialized_at")
+            if serialize(previous) == serialize(report):
+                self.unchanged += 1
+                return current
+
+        version = int(current.version) + 1 if current is not None else 1
+        body = serialize({**report, "version": version, "materialized_at": time.time()})
+        document = CachedBody(str(version), body)
+        self._remember(session.session_id, document)
+        self.materialized += 1
+
+        if self.directory:
+            tmp_path = self._path(session.session_id) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, self._path(session.session_id))
+        return document
+
+    def _load(self, session_id: str) -> Optional[CachedBody]:
+        document = self._documents.get(session_id)
+        if document is not None:
+            self._documents.move_to_end(session_id)
+            return document
+
+        # Ids come from requests; only well-formed ones may name a file
+        if self.directory and is_session_id(session_id) and os.path.exists(self._path(session_id)):
+            with open(self._path(session_id), "rb") as f:
+                body = f.read()
+            document = CachedBody(str(json.loads(body)["version"]), body)
+            self._remember(session_id, document)
+            self.disk_reads += 1
+            return document
+        return None
+
+    def get(self, session_id: str) -> Optional[CachedBody]:
+        """The stored report, or None if the session hasn't finished."""
+        document = self._load(session_id)
+        if document is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return document
+
+    def export(self, session_ids: Iterable[str]) -> Iterator[bytes]:
+        """The given sessions' stored reports as newline-delimited JSON, without re-rendering."""
+        for session_id in session_ids:
+            document = self._documents.get(session_id)
+            if document is not None:
+                yield document.body + b"\n"
+            elif (
+                self.directory
+                and is_session_id(session_id)
+                and os.path.exists(self._path(session_id))
+            ):
+                # Read straight from disk; a bulk export shouldn't churn the LRU
+                with open(self._path(session_id), "rb") as f:
+                    yield f.read() + b"\n"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._documents),
+            "max_entries": self.max_entries,
+            "materialized": self.materialized,
+            "unchanged": self.unchanged,
+            "hits": self.hits,
+            "disk_reads": self.disk_reads,
+            "misses": self.misses,
+        }
+
+
+# Singleton instance
+results_store = ResultsStore(
+    max_entries=settings.results_store_max_entries,
+    directory=settings.results_store_dir or None,
+)
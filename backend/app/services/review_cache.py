@@ -0,0 +1,124 @@
+"""Cross-session cache of code reviews keyed on normalized code fingerprints."""
+
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.models import CodeReview
+from app.services.code_fingerprint import fingerprint
+
+
+class ReviewCache:
+    """
+    LRU + TTL cache of reviews, shared by every session.
+
+    Keys are (problem_id, is_final, fingerprint), so candidates whose code only
+    differs in names, comments or formatting share one GPT review. An optional
+    SQLite file acts as a second tier that survives restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reviews ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, review TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(problem_id: str, is_final: bool, code: str, variant: str = "") -> str:
+        key = f"{problem_id}:{int(is_final)}:{fingerprint(code)}"
+        return f"{key}:{variant}" if variant else key
+
+    def get(self, key: str) -> Optional[CodeReview]:
+        """Look up a review, refreshing its LRU position on a hit."""
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, review = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return CodeReview(**review)
+            del self._entries[key]
+
+        if self._db:
+            row = self._db.execute(
+                "SELECT expires_at, review FROM reviews WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] > now:
+                review = json.loads(row[1])
+                self._remember(key, row[0], review)
+                self.disk_hits += 1
+                return CodeReview(**review)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, review: CodeReview) -> None:
+        """Store a review in memory and, if configured, on disk."""
+        expires_at = time.time() + self.ttl_seconds
+        data = review.model_dump()
+        self._remember(key, expires_at, data)
+
+        if self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reviews (key, expires_at, review) VALUES (?, ?, ?)",
+                (key, expires_at, json.dumps(data)),
+            )
+            self._db.execute("DELETE FROM reviews WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+
+    def _remember(self, key: str, expires_at: float, review: Dict[str, Any]) -> None:
+        self._entries[key] = (expires_at, review)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self._db:
+            self._db.execute("DELETE FROM reviews")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+# Singleton instance
+review_cache = ReviewCache(
+    max_entries=settings.review_cache_max_entries,
+    ttl_seconds=settings.review_cache_ttl_seconds,
+    path=settings.review_cache_path or None,
+)
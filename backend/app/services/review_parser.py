@@ -0,0 +1,146 @@
+"""Incremental parser for sectioned GPT-4 review responses."""
+
+from typing import Any, Dict, List, Optional
+
+from app.models import CodeReview
+
+
+# Section headers the review prompts ask GPT-4 to use
+SECTION_HEADERS = {
+    "FEEDBACK:": "feedback",
+    "BUGS:": "bugs",
+    "SUGGESTIONS:": "suggestions",
+    "TIME_COMPLEXITY:": "time_complexity",
+    "SPACE_COMPLEXITY:": "space_complexity",
+    "IS_OPTIMAL:": "is_optimal",
+}
+
+
+class ReviewStreamParser:
+    """
+    Parse a review response as it streams in.
+
+    `feed` takes raw text chunks and returns the deltas they produced:
+    {"section": "feedback", "text": ...} appends to the feedback paragraph
+    (streamed mid-line, as tokens arrive), {"section": "bugs" | "suggestions",
+    "text": ...} is one complete list item, and the complexity/optimality
+    sections carry their full value. `flush` handles the final unterminated
+    line and `close` returns the finished CodeReview.
+    """
+
+    def __init__(self, is_final: bool = False):
+        self.is_final = is_final
+        self.feedback = ""
+        self.bugs: List[str] = []
+        self.suggestions: List[str] = []
+        self.time_complexity: Optional[str] = None
+        self.space_complexity: Optional[str] = None
+        self.is_optimal: Optional[bool] = None
+
+        self._section: Optional[str] = None
+        self._pending = ""  # Incomplete current line
+        self._streamed = ""  # Feedback text of the current line already sent
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of response text and return the resulting deltas."""
+        deltas: List[Dict[str, Any]] = []
+        self._pending += chunk
+
+        while "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            deltas.extend(self._finish_line(line))
+
+        # Stream feedback text before its line is complete
+        partial = self._feedback_text(self._pending.strip(), partial=True)
+        if partial is not None and partial.startswith(self._streamed):
+            new_text = partial[len(self._streamed):]
+            if new_text:
+                deltas.append({"section": "feedback", "text": new_text})
+                self._streamed = partial
+
+        return deltas
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Finish the last (unterminated) line and return its deltas."""
+        line, self._pending = self._pending, ""
+        return self._finish_line(line) if line else []
+
+    def close(self, line_count: int) -> CodeReview:
+        """Flush the last line and build the review."""
+        self.flush()
+
+        return CodeReview(
+            line_count=line_count,
+            feedback=self.feedback,
+            bugs=self.bugs,
+            suggestions=self.suggestions,
+            is_final=self.is_final,
+            time_complexity=self.time_complexity,
+            space_complexity=self.space_complexity,
+            is_optimal=self.is_optimal,
+        )
+
+    def _feedback_text(self, line: str, partial: bool) -> Optional[str]:
+        """Text this line adds to the feedback paragraph, if any."""
+        if not line:
+            return None
+        if line.startswith("FEEDBACK:"):
+            return line.replace("FEEDBACK:", "").strip()
+        if partial and any(
+            header.startswith(line) or line.startswith(header)
+            for header in SECTION_HEADERS
+        ):
+            # Might still turn out to be a section header
+            return None
+        if self._section == "feedback" and not any(
+            line.startswith(header) for header in SECTION_HEADERS
+        ):
+            return " " + line
+        return None
+
+    def _finish_line(self, raw_line: str) -> List[Dict[str, Any]]:
+        deltas: List[Dict[str, Any]] = []
+        line = raw_line.strip()
+
+        feedback_text = self._feedback_text(line, partial=False)
+        if feedback_text is not None and feedback_text.startswith(self._streamed):
+            remainder = feedback_text[len(self._streamed):]
+            if remainder:
+                deltas.append({"section": "feedback", "text": remainder})
+        self._streamed = ""
+
+        if line.startswith("FEEDBACK:"):
+            self._section = "feedback"
+            self.feedback = line.replace("FEEDBACK:", "").strip()
+        elif line.startswith("BUGS:"):
+            self._section = "bugs"
+            bug_text = line.replace("BUGS:", "").strip()
+            if bug_text and bug_text.lower() != "none":
+                self.bugs.append(bug_text)
+                deltas.append({"section": "bugs", "text": bug_text})
+        elif line.startswith("SUGGESTIONS:"):
+            self._section = "suggestions"
+            sug_text = line.replace("SUGGESTIONS:", "").strip()
+            if sug_text and sug_text.lower() != "none":
+                self.suggestions.append(sug_text)
+                deltas.append({"section": "suggestions", "text": sug_text})
+        elif line.startswith("TIME_COMPLEXITY:"):
+            self.time_complexity = line.replace("TIME_COMPLEXITY:", "").strip()
+            deltas.append({"section": "time_complexity", "text": self.time_complexity})
+        elif line.startswith("SPACE_COMPLEXITY:"):
+            self.space_complexity = line.replace("SPACE_COMPLEXITY:", "").strip()
+            deltas.append({"section": "space_complexity", "text": self.space_complexity})
+        elif line.startswith("IS_OPTIMAL:"):
+            optimal_text = line.replace("IS_OPTIMAL:", "").strip().lower()
+            self.is_optimal = "yes" in optimal_text
+            deltas.append({"section": "is_optimal", "text": "Yes" if self.is_optimal else "No"})
+        elif line and self._section == "feedback":
+            self.feedback += " " + line
+        elif line and self._section == "bugs" and line.lower() != "none":
+            self.bugs.append(line)
+            deltas.append({"section": "bugs", "text": line})
+        elif line and self._section == "suggestions" and line.lower() != "none":
+            self.suggestions.append(line)
+            deltas.append({"section": "suggestions", "text": line})
+
+        return deltas
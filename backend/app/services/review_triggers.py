@@ -0,0 +1,214 @@
+"""Policies deciding when an incremental code review is due."""
+
+import ast
+import copy
+import difflib
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+
+def _significant_lines(code: str) -> List[str]:
+    """Lines with content, stripped of indentation and trailing whitespace."""
+    return [line.strip() for line in code.splitlines() if line.strip()]
+
+
+BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+def _statement_dump(node: ast.stmt) -> str:
+    """Dump of one statement without its nested blocks, so changes count once."""
+    shallow = copy.copy(node)
+    for field in BLOCK_FIELDS:
+        if hasattr(shallow, field):
+            setattr(shallow, field, [])
+    return ast.dump(shallow, annotate_fields=False)
+
+
+def _changed_items(before: List[str], after: List[str]) -> int:
+    """Number of items inserted, deleted or replaced between two sequences."""
+    changed = 0
+    matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            changed += max(i2 - i1, j2 - j1)
+    return changed
+
+
+class TriggerPolicy(ABC):
+    """Scores how much the code changed since it was last reviewed."""
+
+    name: str = ""
+
+    @abstractmethod
+    def score(self, reviewed: str, code: str) -> float:
+        """Size of the change from `reviewed` to `code`; compared against the threshold."""
+
+
+class LineCountPolicy(TriggerPolicy):
+    """Growth in non-blank lines (the original trigger, minus blank lines)."""
+
+    name = "lines"
+
+    def score(self, reviewed: str, code: str) -> float:
+        return len(_significant_lines(code)) - len(_significant_lines(reviewed))
+
+
+class EditDistancePolicy(TriggerPolicy):
+    """Non-blank lines added, removed or rewritten, so rewrites count too."""
+
+    name = "edit_distance"
+
+    def score(self, reviewed: str, code: str) -> float:
+        return _changed_items(_significant_lines(reviewed), _significant_lines(code))
+
+
+class ASTDiffPolicy(TriggerPolicy):
+    """
+    Statements added, removed or changed, ignoring comments and formatting.
+    Falls back to line edit distance while either version doesn't parse.
+    """
+
+    name = "ast"
+
+    def __init__(self):
+        self._fallback = EditDistancePolicy()
+        self._statements: Dict[str, Optional[List[str]]] = {}
+
+    def _statement_dumps(self, code: str) -> Optional[List[str]]:
+        # The reviewed side is scored against every edit; keep its dump
+        if code in self._statements:
+            return self._statements[code]
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            dumps = None
+        else:
+            dumps = [
+                _statement_dump(node) for node in ast.walk(tree) if isinstance(node, ast.stmt)
+            ]
+        if len(self._statements) >= 256:
+            self._statements.clear()
+        self._statements[code] = dumps
+        return dumps
+
+    def score(self, reviewed: str, code: str) -> float:
+        before = self._statement_dumps(reviewed)
+        after = self._statement_dumps(code)
+        if before is None or after is None:
+            return self._fallback.score(reviewed, code)
+        return _changed_items(before, after)
+
+
+POLICIES = {
+    policy.name: policy
+    for policy in (LineCountPolicy, EditDistancePolicy, ASTDiffPolicy)
+}
+
+
+class TriggerState:
+    """Per-session trigger bookkeeping."""
+
+    def __init__(
+        self,
+        reviewed_code: str = "",
+        last_review_time: float = 0.0,
+        reviews: int = 0,
+    ):
+        self.reviewed_code = reviewed_code
+        self.last_review_time = last_review_time
+        self.reviews = reviews
+
+
+class ReviewTrigger:
+    """
+    Decide when an incremental review is due.
+
+    A review is due once the policy's change score since the last review
+    reaches `threshold`. It then fires after a quiet period of `debounce`
+    seconds with no further edits, no sooner than `min_interval` seconds after
+    the previous review, and at most `max_reviews` times per session.
+
+    The trigger keeps no clock of its own: callers pass `now` and schedule the
+    returned fire time, so the same logic runs live and in offline replays.
+    """
+
+    def __init__(
+        self,
+        policy: TriggerPolicy,
+        threshold: float = 5,
+        debounce: float = 1.5,
+        min_interval: float = 20.0,
+        max_reviews: int = 30,
+    ):
+        self.policy = policy
+        self.threshold = threshold
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_reviews = max_reviews
+
+    def is_due(self, state: TriggerState, code: str) -> bool:
+        """Whether the code changed enough since the last review."""
+        if state.reviews >= self.max_reviews:
+            return False
+        return self.policy.score(state.reviewed_code, code) >= self.threshold
+
+    def on_edit(self, state: TriggerState, code: str, now: float) -> Optional[float]:
+        """
+        Handle an edit.
+
+        Returns:
+            When to review if no further edits arrive, or None if no review is due
+        """
+        if not self.is_due(state, code):
+            return None
+        return max(now + self.debounce, state.last_review_time + self.min_interval)
+
+    def record(self, state: TriggerState, code: str, now: float) -> None:
+        """Count a review of `code` sent upstream (against the cap and interval)."""
+        state.reviewed_code = code
+        state.last_review_time = now
+        state.reviews += 1
+
+    def rebase(self, state: TriggerState, code: str) -> None:
+        """Measure later changes from `code` without counting a review (none was sent)."""
+        state.reviewed_code = code
+
+
+class EditRecorder:
+    """Append code edits to a JSONL file, for replaying against trigger policies offline."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, code: str, now: float) -> None:
+        line = json.dumps({"session_id": session_id, "t": now, "code": code})
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def create_review_trigger() -> ReviewTrigger:
+    """Build the review trigger configured in settings."""
+    policy = POLICIES.get(settings.review_trigger_policy)
+    if policy is None:
+        raise ValueError(f"Unknown review trigger policy: {settings.review_trigger_policy}")
+    return ReviewTrigger(
+        policy(),
+        threshold=settings.code_review_line_threshold,
+        debounce=settings.review_debounce_ms / 1000,
+        min_interval=settings.review_min_interval_seconds,
+        max_reviews=settings.review_max_per_session,
+    )
+
+
+# Singleton instances
+review_trigger = create_review_trigger()
+edit_recorder = (
+    EditRecorder(settings.review_trigger_record_path)
+    if settings.review_trigger_record_path
+    else None
+)
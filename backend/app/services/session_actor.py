@@ -0,0 +1,341 @@
+"""Per-session actor that keeps slow upstream calls off the WebSocket loop."""
+
+import asyncio
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models import InterviewSession
+from app.models.messages import (
+    ClientMessage,
+    CodeAckMessage,
+    CodeCompleteMessage,
+    CodeDeltaMessage,
+    CodeSnapshotMessage,
+    CodeUpdateMessage,
+    ErrorMessage,
+    FinalReviewMessage,
+    FinalReviewPayload,
+    PhaseTransitionMessage,
+    PhaseUpdatedMessage,
+    PingMessage,
+    PongMessage,
+    ResyncRequiredMessage,
+    ReviewDeltaMessage,
+    ReviewPayload,
+    ReviewTriggeredMessage,
+    TestResultsMessage,
+)
+from app.services.code_buffer import CodeBuffer, CodeSyncError, code_checksum
+from app.services.event_bus import event_bus, session_channel
+from app.services.metrics import review_triggers
+from app.services.session_manager import session_manager
+from app.services.interview_orchestrator import interview_orchestrator
+from app.services.interview_timer import interview_timer
+from app.services.review_triggers import review_trigger, edit_recorder
+
+
+SendFunc = Callable[[BaseModel], Awaitable[None]]
+
+# Final reviews still running after their connection closed (held so they finish)
+_detached_reviews: Set[asyncio.Task] = set()
+
+
+class SessionActor:
+    """
+    Mailbox for a single session's WebSocket messages.
+
+    Messages are handled one at a time, in arrival order, by a dedicated task.
+    Code updates are applied as soon as they are dequeued; reviews run as
+    background tasks and push their results through `send` when ready. A newer
+    incremental review cancels one still in flight, so only the latest code
+    snapshot is ever reviewed.
+
+    Incremental reviews are scheduled by the review trigger: once enough has
+    changed, a timer fires after the debounce period, and every further edit
+    restarts it.
+
+    Session events (reviews, phase changes) are published on the event bus
+    with `send`, reaching every client connected to the session on any node;
+    answers meant only for this connection (acks, resyncs, test results,
+    pongs, errors) go out through `reply`. The interview timer publishes
+    remaining time and deadlines on the same channel.
+
+    Edits that change the code are also run against the
+    problem's examples in the sandbox. Runs aren't cancelled (that would cost
+    a worker); edits arriving during a run coalesce into one follow-up run.
+    """
+
+    def __init__(self, session: InterviewSession, reply: SendFunc):
+        self.session_id = session_id = session.session_id
+        self.buffer = CodeBuffer(session.code)
+        self._channel = session_channel(session_id)
+        self._reply = reply
+        self._mailbox: asyncio.Queue = asyncio.Queue()
+        self._runner: Optional[asyncio.Task] = None
+        self._review_task: Optional[asyncio.Task] = None
+        self._final_review_task: Optional[asyncio.Task] = None
+        self._review_ids = itertools.count(1)
+        self._trigger_state = interview_orchestrator.new_trigger_state(session)
+        self._debounce_task: Optional[asyncio.Task] = None
+        self._test_task: Optional[asyncio.Task] = None
+        self._pending_tests: Optional[Tuple[str, int]] = None
+        self._tested_checksum: Optional[int] = None
+
+    def start(self) -> None:
+        """Start processing the mailbox."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    def post(self, message: ClientMessage) -> None:
+        """Queue a client message without waiting for it to be handled."""
+        self._mailbox.put_nowait(message)
+
+    async def stop(self) -> None:
+        """
+        Stop the mailbox and cancel in-flight incremental work. A final review
+        is left to finish (and move the session to evaluation) without the
+        connection; its results reach any client that reconnects.
+        """
+        final_review = self._final_review_task
+        if final_review and not final_review.done():
+            _detached_reviews.add(final_review)
+            final_review.add_done_callback(_detached_reviews.discard)
+
+        tasks = [
+            self._runner,
+            self._review_task,
+            self._test_task,
+            self._debounce_task,
+        ]
+        for task in tasks:
+            if task and not task.done():
+                task.cancel()
+        for task in tasks:
+            if task:
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._runner = None
+
+    async def send(self, message: BaseModel) -> None:
+        """Publish a session event to every connected client."""
+        await event_bus.publish(self._channel, message.model_dump())
+
+    async def reply(self, message: BaseModel) -> None:
+        """Send a message to this connection only."""
+        await self._reply(message)
+
+    async def _run(self) -> None:
+        while True:
+            message = await self._mailbox.get()
+            try:
+                await self._dispatch(message)
+            except Exception as e:
+                print(f"Session actor error for session {self.session_id}: {e}")
+                await self.reply(ErrorMessage(message=str(e)))
+
+    async def _dispatch(self, message: ClientMessage) -> None:
+        if isinstance(message, CodeDeltaMessage):
+            try:
+                revision = self.buffer.apply(
+                    message.base_revision, message.ops, message.checksum
+                )
+            except CodeSyncError as e:
+                await self.reply(
+                    ResyncRequiredMessage(revision=self.buffer.revision, reason=str(e))
+                )
+                return
+
+            await self.reply(CodeAckMessage(revision=revision))
+            await self._apply_buffer()
+
+        elif isinstance(message, CodeSnapshotMessage):
+            self.buffer.reset(message.code, message.revision)
+            await self.reply(CodeAckMessage(revision=self.buffer.revision))
+            await self._apply_buffer()
+
+        elif isinstance(message, CodeUpdateMessage):
+            # Legacy full-buffer update
+            self.buffer.reset(message.code, self.buffer.revision + 1)
+            await self._apply_buffer()
+
+        elif isinstance(message, CodeCompleteMessage):
+            self._start_final_review()
+
+        elif isinstance(message, PhaseTransitionMessage):
+            session = await session_manager.get_session(self.session_id)
+            if session:
+                session.current_phase = message.phase
+                session_manager.save_session(session)
+
+            await self.send(PhaseUpdatedMessage(phase=message.phase.value))
+
+        elif isinstance(message, PingMessage):
+            remaining = interview_timer.remaining(self.session_id)
+            if remaining is None:
+                remaining = await interview_orchestrator.get_remaining_time(self.session_id)
+            await self.reply(PongMessage(remaining_time=remaining))
+
+    async def _apply_buffer(self) -> None:
+        """Push the buffer into the session and schedule a review if one is due."""
+        code = self.buffer.text
+        now = time.time()
+        await interview_orchestrator.apply_code_update(
+            self.session_id, code, self.buffer.line_count
+        )
+        if edit_recorder:
+            edit_recorder.record(self.session_id, code, now)
+
+        self._schedule_review(review_trigger.on_edit(self._trigger_state, code, now))
+        self._schedule_tests(code)
+
+    def _schedule_review(self, fire_at: Optional[float]) -> None:
+        """(Re)start the debounce timer; each edit pushes the review back."""
+        if self._debounce_task and not self._debounce_task.done():
+            self._debounce_task.cancel()
+        if fire_at is not None:
+            self._debounce_task = asyncio.create_task(self._review_when_quiet(fire_at))
+
+    async def _review_when_quiet(self, fire_at: float) -> None:
+        await asyncio.sleep(max(0.0, fire_at - time.time()))
+
+        code = self.buffer.text
+        if not review_trigger.is_due(self._trigger_state, code):
+            return
+        self._start_incremental_review(code, self.buffer.line_count)
+
+    def _schedule_tests(self, code: str) -> None:
+        """Run the examples against the code if it changed since the last run."""
+        if not settings.sandbox_enabled:
+            return
+
+        checksum = code_checksum(code)
+        if checksum == self._tested_checksum:
+            return
+        self._tested_checksum = checksum
+
+        self._pending_tests = (code, self.buffer.revision)
+        if self._test_task is None or self._test_task.done():
+            self._test_task = asyncio.create_task(self._guard(self._run_pending_tests()))
+
+    async def _run_pending_tests(self) -> None:
+        while self._pending_tests is not None:
+            code, revision = self._pending_tests
+            self._pending_tests = None
+
+            result = await interview_orchestrator.run_tests(self.session_id, code)
+            if result is None or self._pending_tests is not None:
+                continue  # Stale; a newer edit is queued
+
+            await self.reply(TestResultsMessage(revision=revision, **dict(result)))
+
+    def _start_incremental_review(self, code: str, line_count: int) -> None:
+        """Review the given snapshot, superseding any incremental review in flight."""
+        if self._review_task and not self._review_task.done():
+            self._review_task.cancel()
+
+        review_triggers.inc("incremental")
+        self._review_task = asyncio.create_task(
+            self._guard(self._incremental_review(code, line_count))
+        )
+
+    def _start_final_review(self) -> None:
+        """Run the final review; pending incremental reviews are now obsolete."""
+        self._schedule_review(None)
+        if self._review_task and not self._review_task.done():
+            self._review_task.cancel()
+        if self._final_review_task and not self._final_review_task.done():
+            return
+
+        review_triggers.inc("final")
+        self._final_review_task = asyncio.create_task(
+            self._guard(self._final_review())
+        )
+
+    def _delta_sender(self, is_final: bool) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+        """Forward streamed review sections to the client, tagged with a review id."""
+        review_id = next(self._review_ids)
+
+        async def send_delta(delta: Dict[str, Any]) -> None:
+            await self.send(
+                ReviewDeltaMessage(
+                    review_id=review_id,
+                    is_final=is_final,
+                    section=delta["section"],
+                    text=delta["text"],
+                )
+            )
+
+        return send_delta
+
+    def _claim_review(self, code: str, line_count: int) -> Callable[[bool], Awaitable[None]]:
+        """Count the review against the trigger's cap and interval only if it goes upstream."""
+
+        async def claim(upstream: bool) -> None:
+            if not upstream:
+                review_trigger.rebase(self._trigger_state, code)
+                return
+            review_trigger.record(self._trigger_state, code, time.time())
+            await interview_orchestrator.claim_review(self.session_id, line_count)
+
+        return claim
+
+    async def _incremental_review(self, code: str, line_count: int) -> None:
+        review = await interview_orchestrator.run_incremental_review(
+            self.session_id,
+            code,
+            line_count,
+            on_delta=self._delta_sender(False),
+            on_decision=self._claim_review(code, line_count),
+        )
+        if not review:
+            return
+
+        await self.send(
+            ReviewTriggeredMessage(
+                line_count=line_count,
+                review=ReviewPayload(
+                    feedback=review.feedback,
+                    bugs=review.bugs,
+                    suggestions=review.suggestions,
+                ),
+            )
+        )
+
+    async def _final_review(self) -> None:
+        final_review = await interview_orchestrator.handle_code_completion(
+            self.session_id, on_delta=self._delta_sender(True)
+        )
+        if not final_review:
+            return
+
+        await self.send(
+            FinalReviewMessage(
+                review=FinalReviewPayload(
+                    feedback=final_review.feedback,
+                    bugs=final_review.bugs,
+                    suggestions=final_review.suggestions,
+                    time_complexity=final_review.time_complexity,
+                    space_complexity=final_review.space_complexity,
+                    is_optimal=final_review.is_optimal,
+                    complexity_estimate=final_review.complexity_estimate,
+                )
+            )
+        )
+
+        # Update phase
+        await self.send(PhaseUpdatedMessage(phase="evaluation"))
+
+    async def _guard(self, coro: Awaitable[None]) -> None:
+        """Run a background task, logging failures instead of losing them."""
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Background task failed for session {self.session_id}: {e}")
@@ -0,0 +1,105 @@
+"""Consistent-hash routing of sessions to the node (or worker) that owns them."""
+
+import bisect
+import hashlib
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+
+def is_session_id(value: str) -> bool:
+    """Whether `value` has the format of a minted session id (safe in file names)."""
+    try:
+        return str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes.
+
+    Adding or removing a node only moves the keys on its arcs, about 1/N of
+    all sessions, instead of reshuffling everything.
+    """
+
+    def __init__(self, nodes: List[str], vnodes: int = 128):
+        self.nodes = sorted(set(nodes))
+        self._points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(vnodes)
+        )
+        self._hashes = [point for point, _ in self._points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._points)
+        return self._points[index][1]
+
+
+def parse_cluster_nodes(spec: str) -> Dict[str, str]:
+    """Parse "node-a=http://10.0.0.1:8000,node-b=..." into {node: base URL}."""
+    nodes: Dict[str, str] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        node, _, url = item.partition("=")
+        nodes[node.strip()] = url.strip()
+    return nodes
+
+
+class SessionAffinity:
+    """
+    Which node owns a session.
+
+    With no cluster configured every session is local. Otherwise this node
+    creates only session ids that hash to itself, so the node that created a
+    session owns it, and a load balancer or client can find the owner of any
+    session with `owner` (exposed at /api/session/route/{session_id}).
+    Connections that land on another node still work: session events travel
+    over the event bus.
+    """
+
+    def __init__(self, node_id: str = "", nodes: Optional[Dict[str, str]] = None):
+        self.nodes = dict(nodes or {})
+        self.node_id = node_id or (next(iter(self.nodes)) if self.nodes else "local")
+        if self.nodes and self.node_id not in self.nodes:
+            raise ValueError(f"NODE_ID {self.node_id!r} is not in CLUSTER_NODES")
+        self.ring = HashRing(list(self.nodes) or [self.node_id])
+
+    @property
+    def clustered(self) -> bool:
+        return len(self.ring.nodes) > 1
+
+    def owner(self, session_id: str) -> str:
+        return self.ring.owner(session_id) or self.node_id
+
+    def owner_url(self, session_id: str) -> Optional[str]:
+        return self.nodes.get(self.owner(session_id))
+
+    def is_local(self, session_id: str) -> bool:
+        return self.owner(session_id) == self.node_id
+
+    def new_session_id(self) -> str:
+        """A fresh session id owned by this node (about N tries for N nodes)."""
+        while True:
+            session_id = str(uuid.uuid4())
+            if self.is_local(session_id):
+                return session_id
+
+    def stats(self) -> Dict[str, Any]:
+        return {"node_id": self.node_id, "nodes": self.ring.nodes}
+
+
+# Singleton instance
+session_affinity = SessionAffinity(
+    node_id=settings.node_id, nodes=parse_cluster_nodes(settings.cluster_nodes)
+)
@@ -0,0 +1,89 @@
+"""Compressed archive of sessions that no longer need to be resident."""
+
+import os
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.models import InterviewSession
+from app.services.session_affinity import is_session_id
+
+
+class SessionArchive:
+    """
+    Compressed session records.
+
+    Holds finished interviews (so results stay readable after they leave
+    memory) and active sessions spilled out of the resident set. Records are
+    zlib-compressed JSON; the in-memory tier keeps at most `max_entries`
+    of them (least recently used dropped first). If `directory` is set every
+    record is also written there, so nothing is lost when it falls out of
+    memory or the process restarts.
+    """
+
+    def __init__(self, max_entries: int = 10000, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._records: "OrderedDict[str, bytes]" = OrderedDict()
+        self.evictions = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.json.z")
+
+    def put(self, session: InterviewSession) -> int:
+        """Compress and store a session. Returns the record size in bytes."""
+        record = zlib.compress(session.model_dump_json().encode("utf-8"), 6)
+        self._remember(session.session_id, record)
+
+        if self.directory:
+            tmp_path = self._path(session.session_id) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(record)
+            os.replace(tmp_path, self._path(session.session_id))
+
+        return len(record)
+
+    def get(self, session_id: str) -> Optional[InterviewSession]:
+        """Decompress an archived session, or None if it isn't archived."""
+        record = self._records.get(session_id)
+        if record is not None:
+            self._records.move_to_end(session_id)
+        elif (
+            self.directory
+            and is_session_id(session_id)
+            and os.path.exists(self._path(session_id))
+        ):
+            with open(self._path(session_id), "rb") as f:
+                record = f.read()
+            self._remember(session_id, record)
+        else:
+            return None
+
+        return InterviewSession.model_validate_json(zlib.decompress(record))
+
+    def delete(self, session_id: str) -> None:
+        self._records.pop(session_id, None)
+        if self.directory:
+            try:
+                os.remove(self._path(session_id))
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, session_id: str, record: bytes) -> None:
+        self._records[session_id] = record
+        self._records.move_to_end(session_id)
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "records": len(self._records),
+            "bytes": sum(len(record) for record in self._records.values()),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "persistent": bool(self.directory),
+        }
@@ -1,53 +1,309 @@
-"""In-memory session management."""
+"""Session management backed by a pluggable session store."""
 
-import uuid
-from typing import Dict, Optional
-from app.models import InterviewSession
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.models import InterviewSession, InterviewPhase
+from app.services.code_history import code_history
+from app.services.results_store import FINISHED_PHASES, results_store
+from app.services.session_affinity import session_affinity
+from app.services.session_archive import SessionArchive
+from app.services.session_store import (
+    SessionStore,
+    InMemorySessionStore,
+    SQLiteSessionStore,
+)
+from app.services.timing_wheel import TimingWheel
 
 
 class SessionManager:
-    """Manage interview sessions in memory."""
+    """
+    Manage interview sessions.
 
-    def __init__(self):
-        self._sessions: Dict[str, InterviewSession] = {}
+    Sessions handled by this process are kept as hot in-memory copies, so
+    reads in the middle of handling a session never touch the store; the
+    store provides persistence and lets other workers pick sessions up.
+    New sessions are written through before `create_session` returns, so a
+    WebSocket landing on another worker finds them. Entry points (a
+    WebSocket connecting, an HTTP request) use `load_session`, which checks
+    the hot copy against the store's version off the event loop and reloads
+    it if another worker has saved since; a save from a stale copy is
+    dropped by the store rather than overwriting newer data. New session ids
+    hash to this node (see `session_affinity`), so routing by the owner
+    keeps a live session on its creator and such conflicts rare. Callers
+    mutate sessions in place and then call `save_session` (or `save_code`
+    for code updates) to persist them.
 
-    def create_session(self, problem_id: str) -> InterviewSession:
-        """Create a new interview session."""
-        import time
+    Memory stays bounded: every session gets an expiry deadline (interview
+    duration plus a grace period, or a short retention once COMPLETE) on a
+    timing wheel, after which it is compacted into the compressed archive.
+    At most `max_resident` sessions are held in memory; the least recently
+    used are spilled to the store (or to the archive when the store isn't
+    persistent) and reloaded on access.
+
+    Every save bumps the session's revision (see `revision`), which response
+    caches use to tell whether anything they derived from it is stale.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        archive: Optional[SessionArchive] = None,
+        max_resident: int = 1000,
+    ):
+        self._sessions: "OrderedDict[str, InterviewSession]" = OrderedDict()
+        self.store = store or InMemorySessionStore()
+        self.archive = archive or SessionArchive()
+        self.max_resident = max_resident
 
-        session_id = str(uuid.uuid4())
+        self._expiry = TimingWheel(tick_seconds=1.0, now=time.time())
+        self._expiry_task: Optional[asyncio.Task] = None
+        self._revision_counter = itertools.count(1)
+        self._revisions: Dict[str, int] = {}
+        self.expired = 0
+        self.spilled = 0
+
+    async def create_session(self, problem_id: str) -> InterviewSession:
+        """Create a new interview session."""
+        session_id = session_affinity.new_session_id()
         session = InterviewSession(
             session_id=session_id,
             problem_id=problem_id,
             start_time=time.time(),
         )
-        self._sessions[session_id] = session
+        await asyncio.to_thread(self.store.create, session)
+        self._make_resident(session)
         return session
 
-    def get_session(self, session_id: str) -> Optional[InterviewSession]:
-        """Get session by ID."""
-        return self._sessions.get(session_id)
+    async def get_session(self, session_id: str) -> Optional[InterviewSession]:
+        """
+        Get session by ID, trusting the hot copy if there is one (answered
+        without yielding). A miss is read from the store in a thread.
+        """
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+        stored = await asyncio.to_thread(self.store.load, session_id)
+        return await self._adopt(session_id, stored)
 
-    def update_session(self, session_id: str, **kwargs) -> Optional[InterviewSession]:
-        """Update session fields."""
+    async def load_session(self, session_id: str) -> Optional[InterviewSession]:
+        """
+        Get session by ID at the start of handling a request, revalidating
+        the hot copy against the store. Store reads run in a thread.
+        """
         session = self._sessions.get(session_id)
+        if session is not None and self.store.persistent:
+            if not await asyncio.to_thread(self.store.is_current, session_id):
+                # Another worker saved a newer version (or removed it)
+                self._sessions.pop(session_id, None)
+                self._revisions.pop(session_id, None)
+                session = None
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+        stored = await asyncio.to_thread(self.store.load, session_id)
+        return await self._adopt(session_id, stored)
+
+    async def _adopt(
+        self, session_id: str, stored: Optional[InterviewSession]
+    ) -> Optional[InterviewSession]:
+        """Make a session resident after a cache miss."""
+        resident = self._sessions.get(session_id)
+        if resident is not None:
+            return resident  # Made resident by a concurrent load
+        # Created by another worker, spilled, or from before a restart
+        session = stored
+        if session is None:
+            session = self.archive.get(session_id)
+            if session is None or not session.is_active:
+                # Finished interviews stay archived; see get_archived_session
+                return None
+            self.archive.delete(session_id)
+            await asyncio.to_thread(self.store.create, session)
+
+        self._make_resident(session)
+        return session
+
+    def get_archived_session(self, session_id: str) -> Optional[InterviewSession]:
+        """Get a finished session from the archive without making it resident."""
+        return self.archive.get(session_id)
+
+    def save_archived_session(self, session: InterviewSession) -> None:
+        """Persist a change to a finished session that is already archived."""
+        self.archive.put(session)
+        results_store.materialize(session)
+
+    def revision(self, session_id: str) -> str:
+        """
+        Token that changes whenever the session is saved in this process.
+        Archived sessions never change, so they share the "archived" token.
+        """
+        revision = self._revisions.get(session_id)
+        return str(revision) if revision is not None else "archived"
+
+    def _touch(self, session_id: str) -> None:
+        self._revisions[session_id] = next(self._revision_counter)
+
+    def save_session(self, session: InterviewSession) -> None:
+        """Persist a session after changing it."""
+        self._touch(session.session_id)
+        self.store.save(session)
+        if session.current_phase in FINISHED_PHASES:
+            results_store.materialize(session)
+        if session.current_phase == InterviewPhase.COMPLETE:
+            self._schedule_expiry(session)
+
+    def save_code(self, session: InterviewSession) -> None:
+        """Persist a session's code and line count (keystroke path)."""
+        self._touch(session.session_id)
+        self.store.save_code(session)
+
+    async def update_session(self, session_id: str, **kwargs) -> Optional[InterviewSession]:
+        """Update session fields."""
+        session = await self.get_session(session_id)
         if session:
             for key, value in kwargs.items():
                 if hasattr(session, key):
                     setattr(session, key, value)
+            self.save_session(session)
         return session
 
-    def delete_session(self, session_id: str) -> bool:
+    async def delete_session(self, session_id: str) -> bool:
         """Delete session."""
-        if session_id in self._sessions:
-            del self._sessions[session_id]
-            return True
-        return False
+        session = await self.load_session(session_id)
+        if session is None:
+            return False
+        self._sessions.pop(session_id, None)
+        self._revisions.pop(session_id, None)
+        self._expiry.cancel(session_id)
+        await asyncio.to_thread(self.store.delete, session_id)
+        code_history.discard(session_id)
+        return True
 
     def get_all_sessions(self) -> list[InterviewSession]:
         """Get all active sessions."""
-        return list(self._sessions.values())
+        sessions = {session.session_id: session for session in self.store.load_all()}
+        sessions.update(self._sessions)
+        return list(sessions.values())
+
+    def _make_resident(self, session: InterviewSession) -> None:
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        self._schedule_expiry(session)
+        if session.session_id not in self._revisions:
+            self._touch(session.session_id)
+
+        while len(self._sessions) > self.max_resident:
+            _, spilled = self._sessions.popitem(last=False)
+            self._spill(spilled)
+
+    def _spill(self, session: InterviewSession) -> None:
+        """Drop a session from memory without losing it (its expiry stays scheduled)."""
+        self.spilled += 1
+        if self.store.persistent:
+            return
+        self.archive.put(session)
+        self.store.delete(session.session_id)
+
+    def _schedule_expiry(self, session: InterviewSession) -> None:
+        if session.current_phase == InterviewPhase.COMPLETE:
+            deadline = time.time() + settings.session_completed_retention_seconds
+        else:
+            deadline = (
+                session.start_time
+                + settings.interview_duration_seconds
+                + settings.session_expiry_grace_seconds
+            )
+        self._expiry.schedule(session.session_id, deadline)
+
+    async def expire_due_sessions(self, now: Optional[float] = None) -> int:
+        """Compact every session whose expiry deadline has passed."""
+        expired = 0
+        for session_id in self._expiry.advance(now or time.time()):
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                # Spilled out of memory since it was scheduled
+                session = await asyncio.to_thread(self.store.load, session_id)
+                session = session or self.archive.get(session_id)
+            if session is None:
+                continue
+
+            session.is_active = False
+            session.current_phase = InterviewPhase.COMPLETE
+            results_store.materialize(session)
+            self.archive.put(session)
+            await asyncio.to_thread(self.store.delete, session_id)
+            self._revisions.pop(session_id, None)
+            expired += 1
+
+        self.expired += expired
+        return expired
+
+    async def _expiry_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._expiry.tick_seconds)
+            try:
+                await self.expire_due_sessions()
+            except Exception as e:
+                print(f"Session expiry failed: {e}")
+
+    def start(self) -> None:
+        """Start the background expiry task."""
+        if self._expiry_task is None:
+            self._expiry_task = asyncio.create_task(self._expiry_loop())
+
+    async def stop(self) -> None:
+        """Stop expiring sessions and flush pending writes to the store."""
+        if self._expiry_task:
+            self._expiry_task.cancel()
+            try:
+                await self._expiry_task
+            except asyncio.CancelledError:
+                pass
+            self._expiry_task = None
+        self.store.close()
+
+    def phase_counts(self) -> Dict[str, int]:
+        """Active resident sessions by interview phase."""
+        counts: Dict[str, int] = {}
+        for session in self._sessions.values():
+            if session.is_active:
+                counts[session.current_phase] = counts.get(session.current_phase, 0) + 1
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "resident": len(self._sessions),
+            "max_resident": self.max_resident,
+            "scheduled_expiries": len(self._expiry),
+            "expired": self.expired,
+            "spilled": self.spilled,
+            "archive": self.archive.stats(),
+        }
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store selected in settings."""
+    if settings.session_store == "sqlite":
+        return SQLiteSessionStore(
+            settings.session_store_path,
+            flush_interval=settings.session_store_flush_interval_ms / 1000,
+        )
+    if settings.session_store != "memory":
+        raise ValueError(f"Unknown session store: {settings.session_store}")
+    return InMemorySessionStore()
 
 
 # Singleton instance
-session_manager = SessionManager()
+session_manager = SessionManager(
+    store=create_session_store(),
+    archive=SessionArchive(
+        max_entries=settings.session_archive_max_entries,
+        directory=settings.session_archive_dir or None,
+    ),
+    max_resident=settings.max_resident_sessions,
+)
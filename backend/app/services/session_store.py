@@ -0,0 +1,295 @@
+"""Pluggable persistence for interview sessions."""
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.models import InterviewSession
+
+
+class SessionStore(ABC):
+    """
+    Where sessions live beyond the SessionManager's in-process copies.
+
+    `create` records a new session, `save` the whole session, `save_code`
+    only its hot fields (`code` and `line_count`), which change on nearly
+    every keystroke. Stores may batch saves and apply them later; `flush`
+    forces them out. `create` is never deferred, so a session can be loaded
+    anywhere as soon as it exists.
+    """
+
+    # Whether sessions survive without the process holding them in memory
+    persistent = False
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[InterviewSession]:
+        """Load a session, or None if the store doesn't have it."""
+
+    @abstractmethod
+    def load_all(self) -> List[InterviewSession]:
+        """Load every stored session."""
+
+    def create(self, session: InterviewSession) -> None:
+        """Record a new session immediately."""
+        self.save(session)
+
+    @abstractmethod
+    def save(self, session: InterviewSession) -> None:
+        """Record the full session."""
+
+    def save_code(self, session: InterviewSession) -> None:
+        """Record the session's code and line count."""
+        self.save(session)
+
+    def is_current(self, session_id: str) -> bool:
+        """Whether this process's copy of a session is the latest stored one."""
+        return True
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remove a session."""
+
+    def flush(self) -> None:
+        """Write out anything still buffered."""
+
+    def close(self) -> None:
+        """Flush and release resources."""
+        self.flush()
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; sessions are lost on restart."""
+
+    def __init__(self):
+        self._sessions: Dict[str, InterviewSession] = {}
+
+    def load(self, session_id: str) -> Optional[InterviewSession]:
+        return self._sessions.get(session_id)
+
+    def load_all(self) -> List[InterviewSession]:
+        return list(self._sessions.values())
+
+    def save(self, session: InterviewSession) -> None:
+        self._sessions[session.session_id] = session
+
+    def save_code(self, session: InterviewSession) -> None:
+        # Same object the manager mutates; nothing to copy
+        self._sessions.setdefault(session.session_id, session)
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite (WAL mode) store shared by every worker on the host.
+
+    `create` commits before returning. Other writes are write-behind: a
+    background thread commits dirty sessions in one transaction, right away
+    for full saves and every `flush_interval` seconds for code updates.
+    Code updates only touch the `code` and `line_count` columns, so the
+    keystroke path never serializes the whole session.
+
+    Every row carries a version, bumped on each write. A write only applies
+    if the row is still at the version this process last loaded or wrote,
+    so a worker holding a stale copy can't overwrite another worker's
+    changes; the write is dropped instead and `is_current` reports the copy
+    stale until it is loaded again.
+
+    Two locks: `_lock` guards the in-memory buffers and versions and is only
+    ever held briefly, so `save`/`save_code` on the event loop never wait on
+    disk; `_db_lock` serializes use of the connection (taken before `_lock`
+    when both are needed).
+    """
+
+    persistent = True
+
+    def __init__(self, path: str, flush_interval: float = 0.2):
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, "
+            "data TEXT NOT NULL, "
+            "code TEXT NOT NULL DEFAULT '', "
+            "line_count INTEGER NOT NULL DEFAULT 0, "
+            "version INTEGER NOT NULL DEFAULT 0, "
+            "updated_at REAL NOT NULL)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")]
+        if "version" not in columns:
+            # Databases from before versioning
+            self._conn.execute(
+                "ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+            )
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._dirty_full: Dict[str, InterviewSession] = {}
+        self._dirty_code: Dict[str, Tuple[str, int]] = {}
+        self._versions: Dict[str, int] = {}
+        self._stale: Set[str] = set()
+        self.conflicts = 0
+
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="session-store-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def load(self, session_id: str) -> Optional[InterviewSession]:
+        # Anything still buffered is newer than what's on disk
+        self.flush()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT data, code, line_count, version FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            with self._lock:
+                self._stale.discard(session_id)
+                if row is None:
+                    self._versions.pop(session_id, None)
+                    return None
+                self._versions[session_id] = row[3]
+        return self._from_row(row)
+
+    def load_all(self) -> List[InterviewSession]:
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT data, code, line_count, version FROM sessions"
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    @staticmethod
+    def _from_row(row) -> InterviewSession:
+        data, code, line_count, _ = row
+        session = InterviewSession.model_validate_json(data)
+        session.code = code
+        session.line_count = line_count
+        return session
+
+    def create(self, session: InterviewSession) -> None:
+        data = session.model_dump_json(exclude={"code", "line_count"})
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO sessions "
+                    "(session_id, data, code, line_count, version, updated_at) "
+                    "VALUES (?, ?, ?, ?, 0, ?)",
+                    (
+                        session.session_id,
+                        data,
+                        session.code,
+                        session.line_count,
+                        time.time(),
+                    ),
+                )
+            with self._lock:
+                self._versions[session.session_id] = 0
+                self._stale.discard(session.session_id)
+
+    def save(self, session: InterviewSession) -> None:
+        with self._lock:
+            self._dirty_full[session.session_id] = session
+            self._dirty_code.pop(session.session_id, None)
+        self._wakeup.set()
+
+    def save_code(self, session: InterviewSession) -> None:
+        with self._lock:
+            if session.session_id not in self._dirty_full:
+                self._dirty_code[session.session_id] = (session.code, session.line_count)
+
+    def is_current(self, session_id: str) -> bool:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            with self._lock:
+                if session_id in self._stale:
+                    return False
+                return row is not None and row[0] == self._versions.get(session_id)
+
+    def delete(self, session_id: str) -> None:
+        with self._db_lock:
+            with self._lock:
+                self._dirty_full.pop(session_id, None)
+                self._dirty_code.pop(session_id, None)
+                self._versions.pop(session_id, None)
+                self._stale.discard(session_id)
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def flush(self) -> None:
+        # Hold the connection for the whole flush so writes land in order,
+        # but the buffers only long enough to take them
+        with self._db_lock:
+            with self._lock:
+                full, self._dirty_full = self._dirty_full, {}
+                code, self._dirty_code = self._dirty_code, {}
+
+            if not full and not code:
+                return
+
+            now = time.time()
+            with self._conn:
+                for session_id, session in full.items():
+                    self._write(
+                        session_id,
+                        "data = ?, code = ?, line_count = ?",
+                        (
+                            session.model_dump_json(exclude={"code", "line_count"}),
+                            session.code,
+                            session.line_count,
+                        ),
+                        now,
+                    )
+                for session_id, (code_text, line_count) in code.items():
+                    self._write(session_id, "code = ?, line_count = ?", (code_text, line_count), now)
+
+    def _write(self, session_id: str, assignments: str, values: Tuple, now: float) -> None:
+        """Apply one buffered write if the row is still at our version (`_db_lock` held)."""
+        with self._lock:
+            version = self._versions.get(session_id)
+        cursor = self._conn.execute(
+            f"UPDATE sessions SET {assignments}, version = version + 1, updated_at = ? "
+            "WHERE session_id = ? AND version = ?",
+            (*values, now, session_id, version),
+        )
+        with self._lock:
+            if cursor.rowcount:
+                self._versions[session_id] = version + 1
+                return
+            if session_id in self._stale:
+                return
+            self._stale.add(session_id)
+            self.conflicts += 1
+        print(f"Dropped write to session {session_id}: changed or removed by another worker")
+
+    def _flush_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Session store flush failed: {e}")
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self._conn.close()
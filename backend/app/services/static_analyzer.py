@@ -0,0 +1,227 @@
+"""Fast local analysis of candidate code, run before any LLM review."""
+
+import ast
+import builtins
+from typing import Any, Dict, List, Optional, Set
+
+from app.models import CodeReview, StaticAnalysis
+from app.services.code_fingerprint import fingerprint
+
+BUILTIN_NAMES = set(dir(builtins))
+
+# Builtins candidates commonly shadow by accident
+SHADOWED_BUILTINS = {
+    "list", "dict", "set", "str", "int", "sum", "min", "max", "len", "map",
+    "filter", "sorted", "input", "id", "type", "hash", "range", "iter", "next",
+}
+
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+TERMINAL_NODES = (ast.Return, ast.Raise, ast.Continue, ast.Break)
+
+# Review gate decisions
+REVIEW = "review"
+SYNTAX_ERROR = "syntax_error"
+UNCHANGED = "unchanged"
+
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+    """Every name the code binds anywhere (scopes are not distinguished)."""
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.alias):
+            names.add((node.asname or node.name).split(".")[0])
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+    return names
+
+
+def _loop_depth(node: ast.AST, depth: int = 0) -> int:
+    """Deepest nesting of loops and comprehension generators below `node`."""
+    if isinstance(node, LOOP_NODES):
+        depth += 1
+    elif isinstance(node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+        depth += len(node.generators)
+
+    deepest = depth
+    for child in ast.iter_child_nodes(node):
+        deepest = max(deepest, _loop_depth(child, depth))
+    return deepest
+
+
+def _returns_value(function: ast.AST) -> bool:
+    for node in ast.walk(function):
+        if isinstance(node, ast.Return) and node.value is not None:
+            return True
+        if isinstance(node, (ast.Yield, ast.YieldFrom)):
+            return True
+    return False
+
+
+def _finding_line(finding: str) -> float:
+    if finding.startswith("Line "):
+        return int(finding[5:].split(":", 1)[0])
+    return float("inf")
+
+
+def _lint(tree: ast.Module, function_name: Optional[str]) -> List[str]:
+    """Cheap checks for mistakes worth pointing out, as "Line N: ..." strings."""
+    findings: List[str] = []
+    bound = _bound_names(tree)
+    reported_undefined: Set[str] = set()
+    functions: Dict[str, ast.AST] = {}
+
+    for node in ast.walk(tree):
+        line = getattr(node, "lineno", None)
+
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            if (
+                node.id not in bound
+                and node.id not in BUILTIN_NAMES
+                and node.id not in reported_undefined
+            ):
+                reported_undefined.add(node.id)
+                findings.append(f"Line {line}: name '{node.id}' is never defined")
+
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions[node.name] = node
+            for default in node.args.defaults + node.args.kw_defaults:
+                if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                    findings.append(
+                        f"Line {default.lineno}: mutable default argument in '{node.name}' "
+                        "is shared between calls"
+                    )
+
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            findings.append(f"Line {line}: bare 'except:' also catches KeyboardInterrupt")
+
+        elif isinstance(node, ast.Compare):
+            for op, comparator in zip(node.ops, node.comparators):
+                if (
+                    isinstance(op, (ast.Eq, ast.NotEq))
+                    and isinstance(comparator, ast.Constant)
+                    and comparator.value is None
+                ):
+                    findings.append(f"Line {line}: compare to None with 'is'/'is not'")
+
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            if node.id in SHADOWED_BUILTINS:
+                findings.append(f"Line {line}: '{node.id}' shadows the builtin")
+        elif isinstance(node, ast.arg) and node.arg in SHADOWED_BUILTINS:
+            findings.append(f"Line {line}: parameter '{node.arg}' shadows the builtin")
+
+        for field in ("body", "orelse", "finalbody"):
+            block = getattr(node, field, None)
+            if not isinstance(block, list):
+                continue
+            for statement, following in zip(block, block[1:]):
+                if isinstance(statement, TERMINAL_NODES):
+                    findings.append(f"Line {following.lineno}: unreachable code")
+                    break
+
+    if function_name:
+        function = functions.get(function_name)
+        if function is None:
+            findings.append(f"Function '{function_name}' is not defined yet")
+        elif not _returns_value(function):
+            findings.append(f"Line {function.lineno}: '{function_name}' never returns a value")
+
+    # ast.walk is breadth-first; report in source order
+    return sorted(findings, key=_finding_line)
+
+
+class StaticAnalyzer:
+    """
+    Parse and lint candidate code in-process.
+
+    Code that doesn't parse is answered locally with the exact error
+    location, and code whose fingerprint matches the last reviewed version
+    (comment, whitespace or rename-only edits) skips the review entirely.
+    Everything else goes to GPT with the findings attached to the prompt.
+    """
+
+    def __init__(self):
+        self.analyses = 0
+        self.local_answers = 0
+        self.skipped = 0
+        self.reviews = 0
+
+    def analyze(self, code: str, function_name: Optional[str] = None) -> StaticAnalysis:
+        """Parse, lint and fingerprint the code."""
+        self.analyses += 1
+        code_fingerprint = fingerprint(code)
+
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return StaticAnalysis(
+                fingerprint=code_fingerprint,
+                syntax_error=e.msg,
+                error_line=e.lineno,
+                error_column=e.offset,
+            )
+        except ValueError as e:  # e.g. null bytes in the source
+            return StaticAnalysis(fingerprint=code_fingerprint, syntax_error=str(e))
+
+        return StaticAnalysis(
+            fingerprint=code_fingerprint,
+            findings=_lint(tree, function_name),
+            functions=[
+                node.name
+                for node in ast.walk(tree)
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ],
+            max_loop_depth=_loop_depth(tree),
+        )
+
+    def decide(
+        self, analysis: StaticAnalysis, last_review_fingerprint: Optional[str]
+    ) -> str:
+        """Whether an incremental review needs the LLM (REVIEW), or not."""
+        if analysis.syntax_error:
+            self.local_answers += 1
+            return SYNTAX_ERROR
+        if analysis.fingerprint == last_review_fingerprint:
+            self.skipped += 1
+            return UNCHANGED
+        self.reviews += 1
+        return REVIEW
+
+    def syntax_error_review(self, analysis: StaticAnalysis, line_count: int) -> CodeReview:
+        """Review for code that doesn't parse, without asking GPT."""
+        location = f"line {analysis.error_line}" if analysis.error_line else "the code"
+        if analysis.error_column:
+            location += f", column {analysis.error_column}"
+        return CodeReview(
+            line_count=line_count,
+            feedback=(
+                f"The code doesn't parse yet: {analysis.syntax_error} at {location}. "
+                "That's expected mid-edit; worth fixing before going further."
+            ),
+            bugs=[f"Syntax error at {location}: {analysis.syntax_error}"],
+        )
+
+    def format_for_prompt(self, analysis: StaticAnalysis) -> str:
+        """Summarize findings for inclusion in a review prompt."""
+        lines = [f"Maximum loop nesting depth: {analysis.max_loop_depth}"]
+        lines.extend(f"- {finding}" for finding in analysis.findings)
+        return "\n".join(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "analyses": self.analyses,
+            "local_answers": self.local_answers,
+            "skipped": self.skipped,
+            "reviews": self.reviews,
+        }
+
+
+# Singleton instance
+static_analyzer = StaticAnalyzer()
@@ -0,0 +1,59 @@
+"""Hashed timing wheel for large numbers of coarse-grained deadlines."""
+
+import math
+from typing import Dict, Hashable, List, Tuple
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel: O(1) schedule and cancel, deadlines rounded up to a tick.
+
+    Each key has at most one deadline; scheduling it again replaces the old
+    one. Deadlines further out than one revolution simply stay in their slot
+    until their tick comes round.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512, now: float = 0.0):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._current_tick = int(now / tick_seconds)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Fire `key` at the first tick at or after `deadline`."""
+        self.cancel(key)
+        tick = max(math.ceil(deadline / self.tick_seconds), self._current_tick + 1)
+        slot = tick % len(self._slots)
+        self._slots[slot][key] = tick
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel up to `now` and return the keys that fell due."""
+        target = int(now / self.tick_seconds)
+        due: List[Tuple[int, Hashable]] = []
+
+        while self._current_tick < target:
+            self._current_tick += 1
+            slot = self._slots[self._current_tick % len(self._slots)]
+            if not slot:
+                continue
+            for key, tick in list(slot.items()):
+                if tick <= self._current_tick:
+                    del slot[key]
+                    del self._slot_of[key]
+                    due.append((tick, key))
+
+        return [key for _, key in due]
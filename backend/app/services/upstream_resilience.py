@@ -0,0 +1,473 @@
+"""Adaptive timeouts, hedging, retries and circuit breaking for OpenAI calls."""
+
+import asyncio
+import email.utils
+import math
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+import openai
+
+from app.config import settings
+from app.services.metrics import openai_hedges, openai_retries
+from app.services.upstream_scheduler import Grant, UpstreamOverloaded, upstream_scheduler
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Statuses worth retrying when the call is idempotent; 429 is retried regardless
+RETRYABLE_STATUSES = (408, 409, 500, 502, 503, 504)
+
+
+class UpstreamError(Exception):
+    """An upstream call timed out or kept failing after its retries."""
+
+
+class UpstreamTimeout(UpstreamError):
+    """An attempt (and any hedge of it) outlived its adaptive timeout."""
+
+
+class CircuitOpen(UpstreamOverloaded):
+    """Raised without calling upstream while a circuit breaker is open."""
+
+
+def _status(error: BaseException) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return response.status_code if isinstance(response, httpx.Response) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After / retry-after-ms), if any."""
+    response = getattr(error, "response", None)
+    if not isinstance(response, httpx.Response):
+        return None
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_outage(error: BaseException) -> bool:
+    """Whether `error` says upstream is down or struggling (counts toward the breaker)."""
+    if isinstance(error, (UpstreamTimeout, httpx.TransportError, openai.APIConnectionError)):
+        return True
+    status = _status(error)
+    return status is not None and status >= 500
+
+
+def _retry_reason(error: BaseException, idempotent: bool) -> Optional[str]:
+    """Why `error` is worth retrying, or None if it isn't."""
+    status = _status(error)
+    if status == 429:
+        return "rate_limited"
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)) or (
+        isinstance(error, openai.APIConnectionError)
+        and not isinstance(error, openai.APITimeoutError)
+    ):
+        return "connection"  # Never reached the server, so safe to resend
+    if not idempotent:
+        return None
+    if isinstance(error, (UpstreamTimeout, httpx.TimeoutException, openai.APITimeoutError)):
+        return "timeout"
+    if status in RETRYABLE_STATUSES:
+        return "server_error"
+    if isinstance(error, (httpx.TransportError, openai.APIConnectionError)):
+        return "connection"
+    return None
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures, failing
+    calls fast for `reset_seconds`; then lets one probe through (half open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = CLOSED
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failure_threshold <= 0:
+            return
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.opens += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """The half-open probe ended, possibly without an outcome (e.g. cancelled)."""
+        self._probing = False
+
+
+class CallPolicy:
+    """Latency window, breaker and counters for one kind of upstream call."""
+
+    def __init__(
+        self,
+        name: str,
+        max_timeout: float,
+        hedge: bool = True,
+        idempotent: bool = True,
+        window: int = 200,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.hedge = hedge
+        self.idempotent = idempotent
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile of the recent latencies, in seconds."""
+        if not self.latencies:
+            return None
+        samples = sorted(self.latencies)
+        return samples[max(0, math.ceil(q / 100 * len(samples)) - 1)]
+
+
+class UpstreamResilience:
+    """
+    Wraps every OpenAI call so one slow or failing request doesn't decide
+    the latency of a review.
+
+    Each kind of call keeps a window of recent latencies. Once it holds
+    `min_samples`, an attempt times out at `timeout_multiplier` times the
+    window's p99 (within `min_timeout` and the call's configured timeout),
+    and an attempt still running at the window's p95 gets a hedged
+    duplicate; whichever answers first wins and the other is cancelled.
+    Hedges are capped at `max_hedge_ratio` of calls, so a slow upstream
+    doesn't get twice the load. Timeouts count as latency samples, so the
+    timeout grows back if upstream gets slower across the board.
+
+    Failed attempts are retried up to `max_retries` times within the call's
+    configured timeout: after the server's Retry-After if it sent one, else
+    after jittered exponential backoff. Only requests that are safe to
+    resend are retried on timeouts and 5xx (context injections only on 429
+    and connection failures). `failure_threshold` consecutive failures open
+    the call's circuit breaker, which fails calls fast with CircuitOpen
+    until a probe succeeds.
+
+    Every request sent counts against the upstream scheduler's limits: given
+    the caller's grant, each retry is charged to the request and token
+    buckets again, and a hedge needs a slot of its own that is free right
+    away (otherwise the attempt isn't hedged).
+    """
+
+    def __init__(
+        self,
+        policies: Dict[str, CallPolicy],
+        adaptive: bool = True,
+        min_samples: int = 20,
+        min_timeout: float = 2.0,
+        timeout_multiplier: float = 2.0,
+        hedge_percentile: float = 95.0,
+        max_hedge_ratio: float = 0.1,
+        max_retries: int = 2,
+        backoff_seconds: float = 0.5,
+        max_retry_after: float = 20.0,
+    ):
+        self.policies = policies
+        self.adaptive = adaptive
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge_percentile = hedge_percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_retry_after = max_retry_after
+
+    def policy(self, name: str) -> CallPolicy:
+        policy = self.policies.get(name)
+        if policy is None:
+            policy = self.policies[name] = CallPolicy(name, settings.openai_default_timeout)
+        return policy
+
+    def _warm(self, policy: CallPolicy) -> bool:
+        return self.adaptive and len(policy.latencies) >= self.min_samples
+
+    def timeout(self, policy: CallPolicy) -> float:
+        """Current per-attempt timeout for the call, in seconds."""
+        if not self._warm(policy):
+            return policy.max_timeout
+        adaptive = policy.percentile(99) * self.timeout_multiplier
+        return min(policy.max_timeout, max(self.min_timeout, adaptive))
+
+    def hedge_delay(self, policy: CallPolicy) -> Optional[float]:
+        """How long an attempt runs before it's hedged, or None to not hedge."""
+        if not (policy.hedge and self._warm(policy)) or self.max_hedge_ratio <= 0:
+            return None
+        if policy.hedged >= self.max_hedge_ratio * policy.calls:
+            return None
+        return policy.percentile(self.hedge_percentile)
+
+    async def call(
+        self,
+        name: str,
+        attempt: Callable[[], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[Any]]] = None,
+        grant: Optional[Grant] = None,
+    ) -> T:
+        """
+        Run `attempt` (a fresh request each time it's called) with the
+        policy for `name`. `discard` releases the result of a hedge that
+        finished but lost the race (e.g. closes a stream). `grant` is the
+        scheduler slot the call is made under; retries and hedges are
+        charged against the scheduler's limits through it.
+
+        Raises:
+            CircuitOpen: If the call's circuit breaker is open
+            UpstreamError: If every attempt timed out or failed retryably
+            Exception: A non-retryable error from `attempt`, unchanged
+        """
+        policy = self.policy(name)
+        if not policy.breaker.allow():
+            policy.rejected += 1
+            raise CircuitOpen(
+                f"{name} circuit open; retrying upstream in {policy.breaker.retry_in():.0f}s"
+            )
+
+        # Allowed while half open means this call is the one probe
+        probing = policy.breaker.state == HALF_OPEN
+        policy.calls += 1
+        deadline = time.monotonic() + policy.max_timeout
+        attempts = 0
+        try:
+            while True:
+                attempts += 1
+                timeout = min(self.timeout(policy), deadline - time.monotonic())
+                if grant is not None and attempts > 1:
+                    upstream_scheduler.charge(grant)
+                try:
+                    result = await self._attempt(policy, attempt, timeout, discard, grant)
+                except Exception as e:
+                    if _is_outage(e):
+                        policy.breaker.record_failure()
+                    else:
+                        # Upstream answered (even if with a 4xx or 429)
+                        policy.breaker.record_success()
+                    reason = _retry_reason(e, policy.idempotent)
+                    if reason is None:
+                        raise
+
+                    delay = retry_after(e)
+                    if delay is None:
+                        delay = random.uniform(0, self.backoff_seconds * 2 ** (attempts - 1))
+                    else:
+                        delay += random.uniform(0, self.backoff_seconds)
+                    if (
+                        attempts > self.max_retries
+                        or policy.breaker.state == OPEN
+                        or delay > self.max_retry_after
+                        or time.monotonic() + delay >= deadline
+                    ):
+                        raise UpstreamError(
+                            f"{name} failed after {attempts} attempt"
+                            f"{'s' if attempts != 1 else ''}: {str(e) or type(e).__name__}"
+                        ) from e
+
+                    policy.retries += 1
+                    openai_retries.inc(name, reason)
+                    await asyncio.sleep(delay)
+                    continue
+
+                policy.breaker.record_success()
+                return result
+        finally:
+            if probing:
+                policy.breaker.release()
+
+    async def _attempt(
+        self,
+        policy: CallPolicy,
+        attempt: Callable[[], Awaitable[T]],
+        timeout: float,
+        discard: Optional[Callable[[T], Awaitable[Any]]],
+        grant: Optional[Grant],
+    ) -> T:
+        """One attempt, hedged once if it runs past the hedge delay."""
+        started = time.monotonic()
+        deadline = started + timeout
+        hedge_at = self.hedge_delay(policy)
+        if hedge_at is not None and started + hedge_at >= deadline:
+            hedge_at = None
+        tasks: Dict["asyncio.Future[T]", float] = {asyncio.ensure_future(attempt()): started}
+        error: Optional[BaseException] = None
+
+        try:
+            while tasks:
+                wait_until = deadline if hedge_at is None else started + hedge_at
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=max(0.0, wait_until - time.monotonic()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    if hedge_at is None:
+                        policy.timeouts += 1
+                        policy.latencies.append(timeout)
+                        raise UpstreamTimeout(f"{policy.name} timed out after {timeout:.1f}s")
+                    hedge_at = None
+                    hedge_grant = None
+                    if grant is not None:
+                        hedge_grant = upstream_scheduler.try_acquire(grant.priority, grant.tokens)
+                        if hedge_grant is None:
+                            continue  # Upstream capacity is spoken for; just keep waiting
+                    policy.hedged += 1
+                    openai_hedges.inc(policy.name, "sent")
+                    hedge = asyncio.ensure_future(attempt())
+                    if hedge_grant is not None:
+                        hedge.add_done_callback(
+                            lambda _, hedge_grant=hedge_grant: upstream_scheduler.release(hedge_grant)
+                        )
+                    tasks[hedge] = time.monotonic()
+                    continue
+
+                for task in done:
+                    task_started = tasks.pop(task)
+                    if task.exception() is None:
+                        policy.latencies.append(time.monotonic() - task_started)
+                        if task_started != started:
+                            policy.hedge_wins += 1
+                            openai_hedges.inc(policy.name, "won")
+                        return task.result()
+                    error = task.exception()
+                if hedge_at is not None:
+                    break  # Failed before the hedge was due; retrying is the caller's call
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+                task.add_done_callback(lambda task: self._discard(task, discard))
+
+    @staticmethod
+    def _discard(
+        task: "asyncio.Future[Any]", discard: Optional[Callable[[Any], Awaitable[Any]]]
+    ) -> None:
+        """Release a losing attempt's result if it finished before it was cancelled."""
+        if task.cancelled() or task.exception() is not None:
+            return
+        if discard is not None:
+            asyncio.ensure_future(discard(task.result()))
+
+    def stats(self) -> Dict[str, Any]:
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            name: {
+                "samples": len(policy.latencies),
+                "p50_ms": ms(policy.percentile(50)),
+                "p95_ms": ms(policy.percentile(95)),
+                "p99_ms": ms(policy.percentile(99)),
+                "timeout_ms": ms(self.timeout(policy)),
+                "hedge_after_ms": ms(self.hedge_delay(policy)),
+                "calls": policy.calls,
+                "hedged": policy.hedged,
+                "hedge_wins": policy.hedge_wins,
+                "retries": policy.retries,
+                "timeouts": policy.timeouts,
+                "circuit": policy.breaker.state,
+                "circuit_opens": policy.breaker.opens,
+                "rejected": policy.rejected,
+            }
+            for name, policy in self.policies.items()
+        }
+
+
+def _policy(name: str, max_timeout: float, **kwargs: Any) -> CallPolicy:
+    return CallPolicy(
+        name,
+        max_timeout,
+        window=settings.upstream_latency_window,
+        failure_threshold=settings.circuit_breaker_failure_threshold,
+        reset_seconds=settings.circuit_breaker_reset_seconds,
+        **kwargs,
+    )
+
+
+# Singleton instance
+upstream_resilience = UpstreamResilience(
+    policies={
+        "final_review": _policy("final_review", settings.openai_review_timeout),
+        "incremental_review": _policy("incremental_review", settings.openai_review_timeout),
+        # Streamed reviews time the first chunk, not the whole completion
+        "final_review_stream": _policy("final_review_stream", settings.openai_review_timeout),
+        "incremental_review_stream": _policy(
+            "incremental_review_stream", settings.openai_review_timeout
+        ),
+        "evaluation": _policy("evaluation", settings.openai_review_timeout, hedge=False),
+        "ephemeral_key": _policy("ephemeral_key", settings.openai_ephemeral_key_timeout),
+        # Not idempotent: a resent injection would show up twice in the conversation
+        "context_injection": _policy(
+            "context_injection", settings.openai_inject_timeout, hedge=False, idempotent=False
+        ),
+    },
+    adaptive=settings.upstream_adaptive_timeouts,
+    min_samples=settings.upstream_latency_min_samples,
+    min_timeout=settings.upstream_min_timeout_seconds,
+    timeout_multiplier=settings.upstream_timeout_multiplier,
+    hedge_percentile=settings.upstream_hedge_percentile,
+    max_hedge_ratio=settings.upstream_max_hedge_ratio,
+    max_retries=settings.upstream_max_retries,
+    backoff_seconds=settings.upstream_retry_backoff_ms / 1000,
+    max_retry_after=settings.upstream_max_retry_after_seconds,
+)
@@ -0,0 +1,284 @@
+"""Process-wide priority scheduler and rate limiter for OpenAI calls."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+
+class Priority(IntEnum):
+    """Upstream call classes; lower values are served first."""
+
+    FINAL_REVIEW = 0
+    EPHEMERAL_KEY = 1
+    INCREMENTAL_REVIEW = 2
+    CONTEXT_INJECTION = 3
+    BACKGROUND = 4
+
+
+class UpstreamOverloaded(Exception):
+    """Raised when a call is shed instead of being sent upstream."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.unlimited = per_minute <= 0
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than the burst wait for a full bucket)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        if self.unlimited:
+            return
+        self._refill(now)
+        self.level -= amount  # May go negative; the debt delays later calls
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier take: positive refunds, negative charges more."""
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class Grant:
+    """A caller's place in the queue and, once granted, its upstream slot."""
+
+    def __init__(self, priority: Priority, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.used_tokens: Optional[int] = None
+        self._expiry: Optional[asyncio.TimerHandle] = None
+
+    def record_usage(self, tokens: int) -> None:
+        """Report the actual token usage, so the bucket reflects it instead of the estimate."""
+        self.used_tokens = tokens
+
+
+class UpstreamScheduler:
+    """
+    Single gate in front of every OpenAI call.
+
+    Calls wait in one priority queue (final review > ephemeral key >
+    incremental review > context injection > background jobs) and are
+    released while the
+    concurrency limit and the request and token buckets allow. The queue is
+    strictly ordered, so a final review waiting on the token bucket isn't
+    overtaken by cheaper incremental calls.
+
+    Low-priority calls are shed with UpstreamOverloaded when they have waited
+    longer than their class's maximum wait (their result would be stale by
+    then), or when the queue is already full.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_wait: Optional[Dict[Priority, Optional[float]]] = None,
+        max_queue_depth: int = 200,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait or {}
+        self.max_queue_depth = max_queue_depth
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+
+        self._queue: List[Tuple[int, int, Grant]] = []
+        self._sequence = itertools.count()
+        self._queued = 0
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self._granted = {priority: 0 for priority in Priority}
+        self._shed = {priority: 0 for priority in Priority}
+        self._wait_total = {priority: 0.0 for priority in Priority}
+        self._wait_max = {priority: 0.0 for priority in Priority}
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, tokens: int = 0) -> AsyncIterator[Grant]:
+        """Hold an upstream slot for the duration of a call."""
+        grant = await self.acquire(priority, tokens)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    async def acquire(self, priority: Priority, tokens: int = 0) -> Grant:
+        """Wait for a slot; raises UpstreamOverloaded if the call is shed."""
+        max_wait = self.max_wait.get(priority)
+        if max_wait is not None and self._queued >= self.max_queue_depth:
+            self._shed[priority] += 1
+            raise UpstreamOverloaded(f"Upstream queue full ({self._queued} waiting)")
+
+        loop = asyncio.get_running_loop()
+        grant = Grant(priority, tokens, loop.create_future())
+        heapq.heappush(self._queue, (priority, next(self._sequence), grant))
+        self._queued += 1
+        if max_wait is not None:
+            grant._expiry = loop.call_later(max_wait, self._expire, grant)
+        self._dispatch()
+
+        try:
+            await grant.future
+        except asyncio.CancelledError:
+            if grant.future.done() and not grant.future.cancelled():
+                # Granted just as the caller was cancelled; give the slot back
+                self.release(grant)
+            else:
+                self._queued -= 1
+            raise
+        return grant
+
+    def try_acquire(self, priority: Priority, tokens: int = 0) -> Optional[Grant]:
+        """
+        A slot right now, or None if anything is queued or a limit is
+        reached. For optional extra requests (hedges), which should never
+        wait ahead of, or instead of, real calls.
+        """
+        now = time.monotonic()
+        if (
+            self._queued
+            or self._in_flight >= self.max_concurrent
+            or self._requests.wait_time(1, now) > 0
+            or self._tokens.wait_time(tokens, now) > 0
+        ):
+            return None
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        grant = Grant(priority, tokens, future)
+        self._requests.take(1, now)
+        self._tokens.take(tokens, now)
+        self._in_flight += 1
+        self._granted[priority] += 1
+        return grant
+
+    def charge(self, grant: Grant) -> None:
+        """Charge the buckets for resending a call under an existing slot (a retry)."""
+        now = time.monotonic()
+        self._requests.take(1, now)
+        self._tokens.take(grant.tokens, now)
+
+    def release(self, grant: Grant) -> None:
+        """Return a slot, settling the token estimate against actual usage."""
+        self._in_flight -= 1
+        if grant.used_tokens is not None:
+            self._tokens.adjust(grant.tokens - grant.used_tokens)
+        self._dispatch()
+
+    def _expire(self, grant: Grant) -> None:
+        if grant.future.done():
+            return
+        self._queued -= 1
+        self._shed[grant.priority] += 1
+        waited = time.monotonic() - grant.enqueued_at
+        grant.future.set_exception(
+            UpstreamOverloaded(f"Shed {grant.priority.name} after waiting {waited:.1f}s")
+        )
+
+    def _dispatch(self) -> None:
+        """Release queued calls, highest priority first, while limits allow."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue and self._in_flight < self.max_concurrent:
+            grant = self._queue[0][2]
+            if grant.future.done():
+                heapq.heappop(self._queue)  # Shed or cancelled while queued
+                continue
+
+            now = time.monotonic()
+            wait = max(
+                self._requests.wait_time(1, now),
+                self._tokens.wait_time(grant.tokens, now),
+            )
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self._requests.take(1, now)
+            self._tokens.take(grant.tokens, now)
+            self._queued -= 1
+            self._in_flight += 1
+            if grant._expiry:
+                grant._expiry.cancel()
+
+            waited = now - grant.enqueued_at
+            self._granted[grant.priority] += 1
+            self._wait_total[grant.priority] += waited
+            self._wait_max[grant.priority] = max(self._wait_max[grant.priority], waited)
+            grant.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        queued = {priority: 0 for priority in Priority}
+        for _, _, grant in self._queue:
+            if not grant.future.done():
+                queued[grant.priority] += 1
+
+        return {
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "request_bucket": None if self._requests.unlimited else round(self._requests.level, 1),
+            "token_bucket": None if self._tokens.unlimited else round(self._tokens.level),
+            "classes": {
+                priority.name.lower(): {
+                    "queued": queued[priority],
+                    "granted": self._granted[priority],
+                    "shed": self._shed[priority],
+                    "avg_wait_ms": round(
+                        self._wait_total[priority] / self._granted[priority] * 1000, 1
+                    )
+                    if self._granted[priority]
+                    else None,
+                    "max_wait_ms": round(self._wait_max[priority] * 1000, 1),
+                }
+                for priority in Priority
+            },
+        }
+
+
+def _max_wait(milliseconds: int) -> Optional[float]:
+    return milliseconds / 1000 if milliseconds > 0 else None
+
+
+# Singleton instance
+upstream_scheduler = UpstreamScheduler(
+    max_concurrent=settings.openai_max_concurrent_requests,
+    requests_per_minute=settings.openai_requests_per_minute,
+    tokens_per_minute=settings.openai_tokens_per_minute,
+    max_wait={
+        Priority.INCREMENTAL_REVIEW: _max_wait(settings.openai_incremental_max_wait_ms),
+        Priority.CONTEXT_INJECTION: _max_wait(settings.openai_injection_max_wait_ms),
+    },
+    max_queue_depth=settings.openai_max_queue_depth,
+)
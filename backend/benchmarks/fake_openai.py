@@ -0,0 +1,225 @@
+"""
+Local stand-in for the OpenAI endpoints the backend calls, for load tests.
+
+Serves chat completions (streamed or not), Realtime client secrets and
+Realtime session items, with log-normal latency and a configurable error
+rate. Reviews come back in the section format the review parser expects,
+with complexity sections when the prompt asks for a final review, and JSON
+ratings when JSON output is requested (interview evaluations). Run from
+backend/:
+
+    python -m benchmarks.fake_openai --port 8100 --latency-ms 800 --error-rate 0.01
+
+then start the backend with OPENAI_BASE_URL=http://127.0.0.1:8100/v1.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+INCREMENTAL_REVIEW = (
+    "FEEDBACK: The approach is on track; the loop handles each element once.\n"
+    "BUGS: None\n"
+    "SUGGESTIONS:\n- Handle the empty input explicitly.\n- Name the lookup table more clearly.\n"
+)
+FINAL_REVIEW = INCREMENTAL_REVIEW + (
+    "TIME_COMPLEXITY: O(n)\nSPACE_COMPLEXITY: O(n)\nIS_OPTIMAL: Yes\n"
+)
+EVALUATION = json.dumps(
+    {
+        "communication": 4,
+        "problem_solving": 4,
+        "code_quality": 3,
+        "technical_skills": 4,
+        "optimization": 4,
+        "overall_feedback": "Reached an optimal solution with readable code.",
+        "would_hire": True,
+        "notes": {
+            "clarifying_questions": [],
+            "technical_skills": ["Used a hash map for constant-time lookups."],
+            "soft_skills": [],
+            "concerns": ["Empty input wasn't handled explicitly."],
+        },
+    }
+)
+
+
+class Latency:
+    """Log-normal latency with the given median and spread (sigma of the log)."""
+
+    def __init__(self, median_ms: float, sigma: float = 0.5):
+        self.median_ms = median_ms
+        self.sigma = sigma
+
+    def sample(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median_ms / 1000), self.sigma)
+
+
+class FakeOpenAI:
+    """Latency, error and streaming behaviour of the fake server."""
+
+    def __init__(
+        self,
+        completion: Latency,
+        realtime: Latency,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        chunk_chars: int = 12,
+        chunk_interval_ms: float = 15.0,
+    ):
+        self.completion = completion
+        self.realtime = realtime
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chunk_chars = chunk_chars
+        self.chunk_interval_ms = chunk_interval_ms
+        self.requests: Dict[str, int] = {}
+
+    def failure(self, endpoint: str) -> Optional[JSONResponse]:
+        """An injected error response, or None to serve the request."""
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests"}},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            return JSONResponse(
+                {"error": {"message": "Injected server error", "type": "server_error"}},
+                status_code=500,
+            )
+        return None
+
+
+def create_app(fake: FakeOpenAI) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(fake.completion.sample())
+        failure = fake.failure("chat_completions")
+        if failure:
+            return failure
+
+        prompt = json.dumps(body.get("messages", []))
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            text = EVALUATION
+        elif "TIME_COMPLEXITY" in prompt:
+            text = FINAL_REVIEW
+        else:
+            text = INCREMENTAL_REVIEW
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4-turbo")
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(text) // 4,
+                    "total_tokens": (len(prompt) + len(text)) // 4,
+                },
+            }
+
+        async def events() -> AsyncIterator[str]:
+            for start in range(0, len(text), fake.chunk_chars):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "delta": {"content": text[start : start + fake.chunk_chars]},
+                            "finish_reason": None,
+                        }
+                    ],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(fake.chunk_interval_ms / 1000)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/realtime/client_secrets")
+    async def client_secrets(request: Request):
+        body = await request.json()
+        await asyncio.sleep(fake.realtime.sample())
+        failure = fake.failure("client_secrets")
+        if failure:
+            return failure
+        ttl = body.get("expires_after", {}).get("seconds", 600)
+        return {
+            "value": f"ek_{uuid.uuid4().hex}",
+            "expires_at": int(time.time()) + ttl,
+            "session": body.get("session", {}),
+        }
+
+    @app.post("/v1/realtime/sessions/{session_id}/items")
+    async def session_items(session_id: str):
+        await asyncio.sleep(fake.realtime.sample())
+        failure = fake.failure("session_items")
+        if failure:
+            return failure
+        return {"id": f"item_{uuid.uuid4().hex[:12]}", "session_id": session_id}
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, Any]:
+        return {"requests": fake.requests}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800, help="Median time to first token")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--realtime-latency-ms", type=float, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of 429 responses")
+    parser.add_argument("--chunk-chars", type=int, default=12)
+    parser.add_argument("--chunk-interval-ms", type=float, default=15)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    fake = FakeOpenAI(
+        completion=Latency(args.latency_ms, args.latency_sigma),
+        realtime=Latency(args.realtime_latency_ms, args.latency_sigma),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        chunk_chars=args.chunk_chars,
+        chunk_interval_ms=args.chunk_interval_ms,
+    )
+    uvicorn.run(create_app(fake), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
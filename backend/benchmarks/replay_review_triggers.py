@@ -0,0 +1,215 @@
+"""
+Replay recorded edit streams against review trigger policies.
+
+Compares policy settings on how many reviews they trigger versus how fresh
+the feedback is: the lag from an edit to the review that first covers it,
+and how much unreviewed change is left when the session ends. As in the
+server, a due review first passes the static gate; only snapshots it sends
+to GPT count as reviews, the rest just move the trigger's baseline.
+
+Record edits by setting REVIEW_TRIGGER_RECORD_PATH, then run from backend/:
+
+    python -m benchmarks.replay_review_triggers edits.jsonl
+    python -m benchmarks.replay_review_triggers --synthetic 20 --thresholds 3,5,8
+
+Without a recording, --synthetic generates edit streams by "typing" each
+problem's optimal solution line by line with random pauses and rewrites.
+"""
+
+import argparse
+import itertools
+import json
+import random
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from app.services.review_triggers import POLICIES, ReviewTrigger, TriggerState
+from app.services.static_analyzer import SYNTAX_ERROR, UNCHANGED, static_analyzer
+from data.problems import iter_problems
+
+Edit = Tuple[float, str]
+
+
+def load_recording(path: str) -> Dict[str, List[Edit]]:
+    """Edit streams from a recording, by session, in time order."""
+    sessions: Dict[str, List[Edit]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                event = json.loads(line)
+                sessions[event["session_id"]].append((event["t"], event["code"]))
+    return {session_id: sorted(edits) for session_id, edits in sessions.items()}
+
+
+def synthetic_sessions(count: int, seed: int = 0) -> Dict[str, List[Edit]]:
+    """Edit streams that type out reference solutions with pauses, blank lines and rewrites."""
+    rng = random.Random(seed)
+    solutions = [problem["optimal_solution"] for problem in iter_problems()]
+    sessions = {}
+
+    for index in range(count):
+        lines = rng.choice(solutions).splitlines()
+        typed: List[str] = []
+        t = 0.0
+        edits: List[Edit] = []
+
+        for line in lines:
+            # Client sends a snapshot after each burst of typing
+            t += rng.uniform(2, 8) + (rng.expovariate(1 / 30) if rng.random() < 0.1 else 0)
+            typed.append(line)
+            edits.append((t, "\n".join(typed)))
+
+            if len(typed) > 2 and rng.random() < 0.15:
+                # Rewrite an earlier line
+                position = rng.randrange(len(typed) - 1)
+                original = typed[position]
+                typed[position] = original.rstrip() + "  # TODO"
+                t += rng.uniform(3, 10)
+                edits.append((t, "\n".join(typed)))
+                typed[position] = original
+                t += rng.uniform(3, 10)
+                edits.append((t, "\n".join(typed)))
+
+        sessions[f"synthetic-{index}"] = edits
+    return sessions
+
+
+def replay(trigger: ReviewTrigger, edits: List[Edit]) -> Dict[str, float]:
+    """Run one session's edits through the trigger, simulating the debounce timer."""
+    state = TriggerState()
+    fire_at = None
+    code = ""
+    review_times: List[float] = []
+    last_fingerprint = None
+
+    def fire() -> None:
+        nonlocal last_fingerprint
+        if not trigger.is_due(state, code):
+            return
+        analysis = static_analyzer.analyze(code)
+        decision = static_analyzer.decide(analysis, last_fingerprint)
+        if decision == UNCHANGED:
+            trigger.rebase(state, code)
+            return
+        last_fingerprint = analysis.fingerprint
+        if decision == SYNTAX_ERROR:
+            trigger.rebase(state, code)  # Answered locally
+            return
+        trigger.record(state, code, fire_at)
+        review_times.append(fire_at)
+
+    for t, new_code in edits:
+        if fire_at is not None and fire_at <= t:
+            fire()
+        code = new_code
+        fire_at = trigger.on_edit(state, code, t)
+    if fire_at is not None:
+        fire()
+
+    # Lag from each edit to the first review at or after it
+    lags = []
+    uncovered = 0
+    for t, _ in edits:
+        later = [review for review in review_times if review >= t]
+        if later:
+            lags.append(later[0] - t)
+        else:
+            uncovered += 1
+
+    return {
+        "reviews": len(review_times),
+        "lags": lags,
+        "uncovered": uncovered,
+        "edits": len(edits),
+        "unreviewed_at_end": trigger.policy.score(state.reviewed_code, code),
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def evaluate(
+    sessions: Dict[str, List[Edit]],
+    policy_name: str,
+    threshold: float,
+    debounce: float,
+    min_interval: float,
+    max_reviews: int,
+) -> Dict[str, float]:
+    trigger = ReviewTrigger(
+        POLICIES[policy_name](),
+        threshold=threshold,
+        debounce=debounce,
+        min_interval=min_interval,
+        max_reviews=max_reviews,
+    )
+    results = [replay(trigger, edits) for edits in sessions.values()]
+    lags = [lag for result in results for lag in result["lags"]]
+    edits = sum(result["edits"] for result in results)
+
+    return {
+        "reviews_per_session": sum(result["reviews"] for result in results) / len(results),
+        "mean_lag": sum(lags) / len(lags) if lags else 0.0,
+        "p90_lag": percentile(lags, 0.9),
+        "uncovered": sum(result["uncovered"] for result in results) / edits if edits else 0.0,
+        "unreviewed_at_end": sum(result["unreviewed_at_end"] for result in results)
+        / len(results),
+    }
+
+
+def _floats(text: str) -> List[float]:
+    return [float(value) for value in text.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", nargs="?", help="JSONL edits recorded by the server")
+    parser.add_argument("--synthetic", type=int, default=0, help="Generate this many sessions")
+    parser.add_argument("--policies", default=",".join(POLICIES))
+    parser.add_argument("--thresholds", default="3,5,8")
+    parser.add_argument("--debounce", default="0,1.5,5", help="Seconds")
+    parser.add_argument("--min-interval", default="0,20,60", help="Seconds")
+    parser.add_argument("--max-reviews", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.recording:
+        sessions = load_recording(args.recording)
+    else:
+        sessions = synthetic_sessions(args.synthetic or 20)
+    if not sessions:
+        parser.error("No edit streams to replay")
+
+    print(f"Replaying {len(sessions)} sessions\n")
+    print(
+        f"{'policy':<14}{'thresh':>7}{'debounce':>9}{'min_int':>8}"
+        f"{'reviews':>9}{'mean_lag':>10}{'p90_lag':>9}{'uncovered':>10}{'left_over':>10}"
+    )
+
+    rows = []
+    for policy_name, threshold, debounce, min_interval in itertools.product(
+        args.policies.split(","),
+        _floats(args.thresholds),
+        _floats(args.debounce),
+        _floats(args.min_interval),
+    ):
+        metrics = evaluate(
+            sessions, policy_name, threshold, debounce, min_interval, args.max_reviews
+        )
+        rows.append((policy_name, threshold, debounce, min_interval, metrics))
+
+    rows.sort(key=lambda row: (row[4]["reviews_per_session"], row[4]["mean_lag"]))
+    for policy_name, threshold, debounce, min_interval, metrics in rows:
+        print(
+            f"{policy_name:<14}{threshold:>7g}{debounce:>9g}{min_interval:>8g}"
+            f"{metrics['reviews_per_session']:>9.1f}{metrics['mean_lag']:>9.1f}s"
+            f"{metrics['p90_lag']:>8.1f}s{metrics['uncovered']:>10.0%}"
+            f"{metrics['unreviewed_at_end']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Load test: a swarm of simulated candidates typing over the session WebSocket.
+
+Each candidate creates a session, connects to /ws/{session_id} and types the
+problem's optimal solution one keystroke per code_delta, with log-normal
+pauses between keys and longer ones at line ends, then submits it. Reports
+p50/p95/p99 latency of session creation, code_ack, incremental review
+delivery and the final review. Point the backend at the fake OpenAI server
+(benchmarks/fake_openai.py) so upstream latency is controlled. Run from
+backend/:
+
+    python -m benchmarks.swarm --candidates 50 --ramp 10
+    python -m benchmarks.swarm --url http://10.0.0.5:8000 --candidates 200 --keystroke-ms 80
+
+Review delivery is measured from the latest keystroke to the review, so it
+includes the REVIEW_DEBOUNCE_MS quiet period; the upstream scheduler's rate
+limits (OPENAI_REQUESTS_PER_MINUTE, ...) still apply and may need raising.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+
+FALLBACK_SOLUTION = (
+    "def twoSum(nums, target):\n"
+    "    seen = {}\n"
+    "    for i, num in enumerate(nums):\n"
+    "        if target - num in seen:\n"
+    "            return [seen[target - num], i]\n"
+    "        seen[num] = i\n"
+    "    return []\n"
+)
+
+
+def checksum(text: str) -> int:
+    """Same CRC32 as app.services.code_buffer.code_checksum."""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def pause(median_ms: float, sigma: float = 0.6) -> float:
+    if median_ms <= 0:
+        return 0.0
+    return random.lognormvariate(math.log(median_ms / 1000), sigma)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    index = max(0, math.ceil(q / 100 * len(samples)) - 1)
+    return samples[index]
+
+
+class Results:
+    """Latency samples (seconds) and error counts across the swarm."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.sent = 0
+        self.received = 0
+
+    def report(self, elapsed: float) -> str:
+        lines = [
+            f"{'metric':<16}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}",
+        ]
+        for name in ("create", "code_ack", "review", "final_review"):
+            samples = sorted(self.latencies.get(name, []))
+            if not samples:
+                lines.append(f"{name:<16}{0:>7}")
+                continue
+            lines.append(
+                f"{name:<16}{len(samples):>7}"
+                + "".join(
+                    f"{percentile(samples, q) * 1000:>8.1f}ms" for q in (50, 95, 99, 100)
+                )
+            )
+        lines.append("")
+        lines.append(
+            f"{self.sent} messages sent, {self.received} received in {elapsed:.1f}s "
+            f"({(self.sent + self.received) / elapsed:.0f} msg/s)"
+        )
+        if self.errors:
+            lines.append(
+                "errors: " + ", ".join(f"{kind}={count}" for kind, count in sorted(self.errors.items()))
+            )
+        return "\n".join(lines)
+
+
+class Candidate:
+    """One simulated candidate: a session, a WebSocket and a typing loop."""
+
+    def __init__(self, args: argparse.Namespace, http: httpx.AsyncClient, results: Results):
+        self.args = args
+        self.http = http
+        self.results = results
+        self.sent_at: Dict[int, float] = {}
+        self.last_edit = 0.0
+        self.completed_at: Optional[float] = None
+        self.final = asyncio.Event()
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        try:
+            response = await self.http.post(
+                "/api/session/create", params={"problem_id": self.args.problem}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.results.errors[f"create:{type(e).__name__}"] += 1
+            return
+        self.results.latencies["create"].append(time.perf_counter() - started)
+
+        body = response.json()
+        solution = body["problem"].get("optimal_solution") or FALLBACK_SOLUTION
+        uri = self.args.url.replace("http", "ws", 1) + f"/ws/{body['session_id']}"
+        try:
+            async with websockets.connect(uri, max_size=None) as ws:
+                receiver = asyncio.create_task(self._receive(ws))
+                try:
+                    await self._type(ws, solution[: self.args.max_chars])
+                    self.completed_at = time.perf_counter()
+                    await ws.send(json.dumps({"type": "code_complete"}))
+                    self.results.sent += 1
+                    await asyncio.wait_for(self.final.wait(), self.args.final_timeout)
+                except asyncio.TimeoutError:
+                    self.results.errors["final_review_timeout"] += 1
+                finally:
+                    receiver.cancel()
+        except (OSError, websockets.WebSocketException) as e:
+            self.results.errors[f"websocket:{type(e).__name__}"] += 1
+
+    async def _type(self, ws, solution: str) -> None:
+        text = ""
+        revision = 0
+        for char in solution:
+            await asyncio.sleep(
+                pause(self.args.line_pause_ms if char == "\n" else self.args.keystroke_ms)
+            )
+            position = len(text)
+            text += char
+            message = {
+                "type": "code_delta",
+                "base_revision": revision,
+                "ops": [{"start": position, "end": position, "text": char}],
+                "checksum": checksum(text),
+            }
+            revision += 1
+            self.last_edit = self.sent_at[revision] = time.perf_counter()
+            await ws.send(json.dumps(message))
+            self.results.sent += 1
+
+    async def _receive(self, ws) -> None:
+        async for frame in ws:
+            now = time.perf_counter()
+            self.results.received += 1
+            message = json.loads(frame)
+            kind = message.get("type")
+            if kind == "code_ack":
+                sent = self.sent_at.pop(message["revision"], None)
+                if sent is not None:
+                    self.results.latencies["code_ack"].append(now - sent)
+            elif kind == "review_triggered":
+                self.results.latencies["review"].append(now - self.last_edit)
+            elif kind == "final_review":
+                if self.completed_at is not None:
+                    self.results.latencies["final_review"].append(now - self.completed_at)
+                self.final.set()
+            elif kind in ("resync_required", "error"):
+                self.results.errors[kind] += 1
+
+
+async def run_swarm(args: argparse.Namespace) -> None:
+    results = Results()
+    limits = httpx.Limits(max_connections=args.candidates)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as http:
+        started = time.perf_counter()
+
+        async def launch(index: int) -> None:
+            await asyncio.sleep(args.ramp * index / args.candidates)
+            await Candidate(args, http, results).run()
+
+        await asyncio.gather(*(launch(index) for index in range(args.candidates)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{args.candidates} candidates against {args.url}\n")
+    print(results.report(elapsed))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds to start all candidates")
+    parser.add_argument("--problem", default="two-sum")
+    parser.add_argument("--keystroke-ms", type=float, default=150, help="Median pause between keys")
+    parser.add_argument("--line-pause-ms", type=float, default=1500, help="Median pause at line ends")
+    parser.add_argument("--max-chars", type=int, default=400, help="Type at most this much")
+    parser.add_argument("--final-timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(run_swarm(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Micro-benchmark of the session WebSocket codecs.
+
+Measures, per message type and codec, the cost of turning a typed message
+into a frame and back (including schema validation for client messages),
+the frame size, and what permessage-deflate would add on top. Codecs whose
+library isn't installed are skipped. Run from backend/:
+
+    python -m benchmarks.websocket_codecs
+    python -m benchmarks.websocket_codecs --iterations 20000
+"""
+
+import argparse
+import time
+import zlib
+from typing import Callable, List, Tuple
+
+from pydantic import BaseModel
+
+from app.models import TestCaseResult
+from app.models.messages import (
+    CodeAckMessage,
+    CodeDeltaMessage,
+    CodeSnapshotMessage,
+    FinalReviewMessage,
+    FinalReviewPayload,
+    PingMessage,
+    ReviewDeltaMessage,
+    TestResultsMessage,
+)
+from app.services.message_codec import CODECS, MessageCodec, decode_message, encode_message
+from data.problems import get_problem
+
+SOLUTION = get_problem("two-sum")["optimal_solution"]
+
+# (name, message, sent by the client)
+MESSAGES: List[Tuple[str, BaseModel, bool]] = [
+    ("ping", PingMessage(), True),
+    (
+        "code_delta (keystroke)",
+        CodeDeltaMessage(
+            base_revision=41, ops=[{"start": 120, "end": 120, "text": "s"}], checksum=1197187446
+        ),
+        True,
+    ),
+    ("code_snapshot (full)", CodeSnapshotMessage(code=SOLUTION * 4, revision=42), True),
+    ("code_ack", CodeAckMessage(revision=42), False),
+    (
+        "review_delta",
+        ReviewDeltaMessage(
+            review_id=3,
+            is_final=False,
+            section="feedback",
+            text="Good use of a hash map; consider the case ",
+        ),
+        False,
+    ),
+    (
+        "test_results",
+        TestResultsMessage(
+            revision=42,
+            passed=2,
+            total=3,
+            results=[
+                TestCaseResult(
+                    input="nums = [2,7,11,15], target = 9",
+                    expected=[0, 1],
+                    actual=[0, 1],
+                    passed=True,
+                    duration_ms=0.02,
+                )
+            ]
+            * 3,
+            duration_ms=1.4,
+        ),
+        False,
+    ),
+    (
+        "final_review",
+        FinalReviewMessage(
+            review=FinalReviewPayload(
+                feedback="The solution is correct and runs in linear time. " * 8,
+                bugs=[],
+                suggestions=["Name the complement variable more clearly."] * 2,
+                time_complexity="O(n)",
+                space_complexity="O(n)",
+                is_optimal=True,
+            )
+        ),
+        False,
+    ),
+]
+
+
+def per_call_us(fn: Callable[[], object], iterations: int) -> float:
+    """Best-of-3 mean time per call, in microseconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+def deflate(frame: bytes) -> bytes:
+    """Compress one frame as permessage-deflate does (raw deflate, context reset)."""
+    compressor = zlib.compressobj(wbits=-15)
+    return compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def benchmark(codec: MessageCodec, message: BaseModel, from_client: bool, iterations: int):
+    frame = encode_message(codec, message)
+    raw = frame if isinstance(frame, bytes) else frame.encode("utf-8")
+
+    encode_us = per_call_us(lambda: encode_message(codec, message), iterations)
+    if from_client:
+        decode_us = per_call_us(lambda: decode_message(codec, frame), iterations)
+    else:
+        decode_us = per_call_us(lambda: codec.decode(frame), iterations)
+    deflated = deflate(raw)
+    deflate_us = per_call_us(lambda: deflate(raw), max(1, iterations // 10))
+    return encode_us, decode_us, len(raw), len(deflated), deflate_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--codecs", default=",".join(CODECS))
+    args = parser.parse_args()
+
+    codecs = [CODECS[name] for name in args.codecs.split(",") if name in CODECS]
+    skipped = [name for name in args.codecs.split(",") if name not in CODECS]
+    if skipped:
+        print(f"Skipping unavailable codecs: {', '.join(skipped)}\n")
+
+    print(
+        f"{'message':<24}{'codec':<9}{'encode':>9}{'decode':>9}"
+        f"{'bytes':>8}{'deflated':>10}{'deflate':>9}"
+    )
+    for name, message, from_client in MESSAGES:
+        for codec in codecs:
+            encode_us, decode_us, size, deflated, deflate_us = benchmark(
+                codec, message, from_client, args.iterations
+            )
+            print(
+                f"{name:<24}{codec.name:<9}{encode_us:>7.2f}us{decode_us:>7.2f}us"
+                f"{size:>8}{deflated:>10}{deflate_us:>7.2f}us"
+            )
+        print()
+    print("decode includes schema validation for client messages (ping, code_*).")
+
+
+if __name__ == "__main__":
+    main()
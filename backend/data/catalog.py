@@ -0,0 +1,244 @@
+"""On-disk problem catalog: a compact in-memory index plus lazily loaded bodies."""
+
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import yaml
+
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+PROBLEM_EXTENSIONS = (".json", ".yaml", ".yml") if YAML_AVAILABLE else (".json",)
+
+DIFFICULTY_ORDER = {"easy": 0, "medium": 1, "hard": 2}
+
+
+class ProblemSummary(NamedTuple):
+    """Index entry for one problem; the full body stays on disk."""
+
+    id: str
+    title: str
+    difficulty: str
+    tags: Tuple[str, ...]
+    path: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "difficulty": self.difficulty,
+            "tags": list(self.tags),
+        }
+
+
+def load_problem_file(path: str) -> Dict[str, Any]:
+    """
+    Parse one problem file (JSON, or YAML when PyYAML is installed).
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If it isn't a valid problem
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            problem = json.load(f)
+        else:
+            try:
+                problem = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path}: {e}") from e
+    if not isinstance(problem, dict):
+        raise ValueError(f"{path}: expected a single problem object")
+    problem.setdefault("id", os.path.splitext(os.path.basename(path))[0])
+    return problem
+
+
+def _summarize(problem: Dict[str, Any], path: str) -> ProblemSummary:
+    # Interned, since thousands of entries share a handful of difficulties and tags
+    return ProblemSummary(
+        id=problem["id"],
+        title=problem.get("title", problem["id"]),
+        difficulty=sys.intern(problem.get("difficulty", "")),
+        tags=tuple(sys.intern(tag) for tag in problem.get("tags", [])),
+        path=path,
+    )
+
+
+class ProblemCatalog:
+    """
+    Problem bank loaded from a directory of JSON/YAML files, one problem each.
+
+    Startup only builds the index (id, title, difficulty, tags). Full bodies
+    are parsed on first use and kept in an LRU of `max_loaded` problems. With
+    `index_path` set, the index is persisted with each file's size and mtime,
+    so restarts only stat the directory and re-parse files that changed.
+
+    `version` changes whenever any problem file does, for caches of derived
+    responses.
+    """
+
+    def __init__(self, directory: str, max_loaded: int = 256, index_path: str = ""):
+        self.directory = directory
+        self.max_loaded = max_loaded
+        self.index_path = index_path
+        self._summaries: List[ProblemSummary] = []
+        self._positions: Dict[str, int] = {}
+        self._by_difficulty: Dict[str, List[int]] = {}
+        self._by_tag: Dict[str, List[int]] = {}
+        self._loaded: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.version = ""
+
+        self.hits = 0
+        self.misses = 0
+        self.parsed_at_startup = 0
+
+        self._build_index()
+
+    def _load_persisted_index(self) -> Dict[str, Any]:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable problem index {self.index_path}: {e}")
+            return {}
+
+    def _build_index(self) -> None:
+        previous = self._load_persisted_index()
+        entries: Dict[str, Any] = {}
+        summaries: Dict[str, ProblemSummary] = {}
+
+        with os.scandir(self.directory) as scan:
+            files = sorted(
+                (
+                    entry
+                    for entry in scan
+                    if entry.is_file() and entry.name.endswith(PROBLEM_EXTENSIONS)
+                ),
+                key=lambda entry: entry.name,
+            )
+        for entry in files:
+            stat = entry.stat()
+            signature = [stat.st_size, stat.st_mtime_ns]
+            cached = previous.get(entry.name)
+            if cached and cached["signature"] == signature:
+                record = cached["summary"]
+            else:
+                try:
+                    problem = load_problem_file(entry.path)
+                except (OSError, ValueError) as e:
+                    print(f"Skipping problem file {entry.name}: {e}")
+                    continue
+                self.parsed_at_startup += 1
+                record = _summarize(problem, entry.name).to_dict()
+
+            entries[entry.name] = {"signature": signature, "summary": record}
+            if record["id"] in summaries:
+                print(f"Duplicate problem id {record['id']} in {entry.name}; keeping the first")
+                continue
+            summaries[record["id"]] = _summarize(record, entry.name)
+
+        self._summaries = sorted(
+            summaries.values(),
+            key=lambda s: (DIFFICULTY_ORDER.get(s.difficulty.lower(), 3), s.title.lower()),
+        )
+        for position, summary in enumerate(self._summaries):
+            self._positions[summary.id] = position
+            self._by_difficulty.setdefault(summary.difficulty.lower(), []).append(position)
+            for tag in summary.tags:
+                self._by_tag.setdefault(tag.lower(), []).append(position)
+
+        self.version = hashlib.blake2b(
+            json.dumps(entries, sort_keys=True).encode(), digest_size=8
+        ).hexdigest()
+
+        if self.index_path and entries != previous:
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.index_path)
+
+    def get(self, problem_id: str) -> Optional[Dict[str, Any]]:
+        """Full problem body, loaded from disk on first use."""
+        problem = self._loaded.get(problem_id)
+        if problem is not None:
+            self._loaded.move_to_end(problem_id)
+            self.hits += 1
+            return problem
+
+        position = self._positions.get(problem_id)
+        if position is None:
+            return None
+        self.misses += 1
+        try:
+            problem = load_problem_file(
+                os.path.join(self.directory, self._summaries[position].path)
+            )
+        except (OSError, ValueError) as e:
+            # Removed or broken since the index was built
+            print(f"Failed to load problem {problem_id}: {e}")
+            return None
+        self._loaded[problem_id] = problem
+        if len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+        return problem
+
+    def summaries(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        difficulty: Optional[str] = None,
+        tag: Optional[str] = None,
+        query: Optional[str] = None,
+    ) -> Tuple[int, List[ProblemSummary]]:
+        """
+        Filtered page of summaries, easiest first.
+
+        Returns:
+            (total matching, summaries in [offset, offset + limit))
+        """
+        positions: Optional[List[int]] = None
+        for index, value in ((self._by_difficulty, difficulty), (self._by_tag, tag)):
+            if value:
+                matching = index.get(value.lower(), [])
+                positions = (
+                    matching
+                    if positions is None
+                    else sorted(set(positions).intersection(matching))
+                )
+        candidates = (
+            self._summaries
+            if positions is None
+            else [self._summaries[position] for position in positions]
+        )
+
+        if query:
+            needle = query.lower()
+            candidates = [
+                s for s in candidates if needle in s.title.lower() or needle in s.id
+            ]
+        return len(candidates), candidates[offset : offset + limit]
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def __iter__(self):
+        return iter(self._summaries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "problems": len(self._summaries),
+            "version": self.version,
+            "loaded": len(self._loaded),
+            "max_loaded": self.max_loaded,
+            "hits": self.hits,
+            "misses": self.misses,
+            "parsed_at_startup": self.parsed_at_startup,
+        }
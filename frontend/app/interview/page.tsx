@@ -9,7 +9,14 @@ import PhaseIndicator from "@/components/PhaseIndicator";
 import { useRealtimeVoice } from "@/hooks/useRealtimeVoice";
 import { useCodeSync } from "@/hooks/useCodeSync";
 import { useInterview } from "@/hooks/useInterview";
-import { Session, InterviewPhase, CodeReview } from "@/lib/types";
+import {
+  Session,
+  InterviewPhase,
+  CodeReview,
+  DraftReview,
+  ReviewSection,
+  TestRunResult,
+} from "@/lib/types";
 
 const INTERVIEW_DURATION = 1800; // 30 minutes in seconds
 
@@ -17,6 +24,8 @@ export default function InterviewPage() {
   const router = useRouter();
   const [session, setSession] = useState<Session | null>(null);
   const [showCompleteButton, setShowCompleteButton] = useState(false);
+  const [draftReview, setDraftReview] = useState<DraftReview | null>(null);
+  const [testResults, setTestResults] = useState<TestRunResult | null>(null);
 
   // Load session from sessionStorage
   useEffect(() => {
@@ -55,13 +64,37 @@ export default function InterviewPage() {
   const voice = useRealtimeVoice(session?.ephemeral_key || null);
 
   // Stable callbacks for code sync
+  const handleReviewDelta = useCallback(
+    (reviewId: number, isFinal: boolean, section: ReviewSection, text: string) => {
+      setDraftReview((prev) => {
+        // A new review id means the previous stream was superseded
+        const draft: DraftReview =
+          prev && prev.review_id === reviewId
+            ? { ...prev }
+            : { review_id: reviewId, is_final: isFinal, feedback: "", bugs: [], suggestions: [] };
+
+        if (section === "feedback") {
+          draft.feedback += text;
+        } else if (section === "bugs") {
+          draft.bugs = [...draft.bugs, text];
+        } else if (section === "suggestions") {
+          draft.suggestions = [...draft.suggestions, text];
+        }
+        return draft;
+      });
+    },
+    []
+  );
+
   const handleReviewTriggered = useCallback((review: CodeReview) => {
     console.log("Code review triggered:", review);
+    setDraftReview(null);
     interview.addReview(review);
   }, [interview.addReview]);
 
   const handleFinalReview = useCallback((review: CodeReview) => {
     console.log("Final review received:", review);
+    setDraftReview(null);
     interview.addReview(review);
     setShowCompleteButton(false);
   }, [interview.addReview]);
@@ -72,12 +105,14 @@ export default function InterviewPage() {
   }, [interview.updatePhase]);
 
   const handleTimeUpdate = useCallback((remainingTime: number) => {
-    console.log("Time update from backend:", remainingTime);
-  }, []);
+    interview.syncRemainingTime(remainingTime);
+  }, [interview.syncRemainingTime]);
 
   // Code sync with backend
   const codeSync = useCodeSync({
     sessionId: session?.session_id || "",
+    onReviewDelta: handleReviewDelta,
+    onTestResults: setTestResults,
     onReviewTriggered: handleReviewTriggered,
     onFinalReview: handleFinalReview,
     onPhaseUpdate: handlePhaseUpdate,
@@ -110,9 +145,8 @@ export default function InterviewPage() {
       }
 
       debounceTimerRef.current = setTimeout(() => {
-        // Send code update to backend after user stops typing for 1 second
-        const lineCount = code.split("\n").length;
-        codeSync.sendCodeUpdate(code, lineCount);
+        // Send code edits to backend after user stops typing for 1 second
+        codeSync.sendCodeUpdate(code);
       }, 1000); // 1 second debounce
     },
     [interview.updateCode, codeSync.sendCodeUpdate]
@@ -211,6 +245,38 @@ export default function InterviewPage() {
           {/* Phase Indicator */}
           <PhaseIndicator currentPhase={interview.currentPhase} />
 
+          {/* Test Results */}
+          {testResults && (
+            <div className="bg-white dark:bg-gray-800 p-4 rounded-lg shadow-md">
+              <h3 className="font-semibold mb-2 text-sm">Example Tests</h3>
+              {testResults.error ? (
+                <p className="text-xs text-red-600 whitespace-pre-wrap">{testResults.error}</p>
+              ) : (
+                <>
+                  <p
+                    className={`text-sm font-semibold ${
+                      testResults.passed === testResults.total ? "text-green-600" : "text-red-600"
+                    }`}
+                  >
+                    {testResults.passed}/{testResults.total} passed
+                  </p>
+                  {testResults.results
+                    .filter((result) => !result.passed)
+                    .map((result, i) => (
+                      <div key={i} className="text-xs bg-red-50 dark:bg-red-900/20 p-2 rounded mt-2">
+                        <p><strong>Input:</strong> {result.input}</p>
+                        <p><strong>Expected:</strong> {JSON.stringify(result.expected)}</p>
+                        <p>
+                          <strong>Got:</strong>{" "}
+                          {result.error ? result.error : JSON.stringify(result.actual)}
+                        </p>
+                      </div>
+                    ))}
+                </>
+              )}
+            </div>
+          )}
+
           {/* Code Stats */}
           <div className="bg-white dark:bg-gray-800 p-4 rounded-lg shadow-md">
             <h3 className="font-semibold mb-2 text-sm">Code Stats</h3>
@@ -238,7 +304,7 @@ export default function InterviewPage() {
           {/* Action Buttons */}
           <div className="flex items-center justify-between bg-white dark:bg-gray-800 p-4 rounded-lg shadow-md">
             <div className="text-sm text-gray-600 dark:text-gray-400">
-              Code updates automatically sync every 5 lines
+              Code is reviewed automatically as it changes
             </div>
 
             <button
@@ -265,10 +331,27 @@ export default function InterviewPage() {
           />
 
           {/* Recent Reviews */}
-          {interview.reviews.length > 0 && (
+          {(interview.reviews.length > 0 || draftReview) && (
             <div className="bg-white dark:bg-gray-800 p-4 rounded-lg shadow-md">
               <h3 className="font-semibold mb-2">Recent Feedback</h3>
               <div className="space-y-2 max-h-64 overflow-y-auto">
+                {draftReview && (
+                  <div className="text-xs bg-yellow-50 dark:bg-yellow-900/20 p-2 rounded">
+                    <p className="text-gray-700 dark:text-gray-300">
+                      {draftReview.feedback || "Reviewing..."}
+                    </p>
+                    {draftReview.bugs.length > 0 && (
+                      <ul className="mt-1 list-disc list-inside text-red-600">
+                        {draftReview.bugs.map((bug, i) => (
+                          <li key={i}>{bug}</li>
+                        ))}
+                      </ul>
+                    )}
+                    <p className="mt-1 font-semibold text-yellow-600">
+                      {draftReview.is_final ? "Final review in progress" : "Review in progress"}
+                    </p>
+                  </div>
+                )}
                 {interview.reviews.slice(-3).reverse().map((review, i) => (
                   <div
                     key={i}
@@ -92,6 +92,15 @@ export default function ResultsDisplay({ results }: ResultsDisplayProps) {
               </div>
             )}
 
+            {final_review.complexity_estimate?.time_complexity && (
+              <div className="text-sm text-gray-600 dark:text-gray-400">
+                Measured {final_review.complexity_estimate.time_complexity} for n up to{" "}
+                {final_review.complexity_estimate.sizes[final_review.complexity_estimate.sizes.length - 1]}
+                {final_review.complexity_estimate.slowdown !== null &&
+                  ` (${final_review.complexity_estimate.slowdown}x the optimal solution's run time)`}
+              </div>
+            )}
+
             {final_review.space_complexity && (
               <div>
                 <span className="font-semibold">Space Complexity: </span>
@@ -4,18 +4,32 @@
 
 import { useState, useEffect, useCallback, useRef } from "react";
 import { BackendWSClient, MessageHandler } from "@/lib/backend-ws-client";
-import { WSMessage, CodeReview } from "@/lib/types";
+import { WSMessage, CodeReview, JobUpdate, ReviewSection, TestRunResult } from "@/lib/types";
 
 interface UsCodeSyncOptions {
   sessionId: string;
+  onReviewDelta?: (reviewId: number, isFinal: boolean, section: ReviewSection, text: string) => void;
+  onTestResults?: (results: TestRunResult) => void;
   onReviewTriggered?: (review: CodeReview) => void;
   onFinalReview?: (review: CodeReview) => void;
   onPhaseUpdate?: (phase: string) => void;
   onTimeUpdate?: (remainingTime: number) => void;
+  onDeadline?: (event: "wrap_up" | "expired") => void;
+  onJobUpdate?: (job: JobUpdate) => void;
 }
 
 export function useCodeSync(options: UsCodeSyncOptions) {
-  const { sessionId, onReviewTriggered, onFinalReview, onPhaseUpdate, onTimeUpdate } = options;
+  const {
+    sessionId,
+    onReviewDelta,
+    onTestResults,
+    onReviewTriggered,
+    onFinalReview,
+    onPhaseUpdate,
+    onTimeUpdate,
+    onDeadline,
+    onJobUpdate,
+  } = options;
 
   const [isConnected, setIsConnected] = useState(false);
   const [error, setError] = useState<Error | null>(null);
@@ -23,21 +37,29 @@ export function useCodeSync(options: UsCodeSyncOptions) {
 
   // Store callbacks in refs to avoid reconnection loops
   const callbacksRef = useRef({
+    onReviewDelta,
+    onTestResults,
     onReviewTriggered,
     onFinalReview,
     onPhaseUpdate,
     onTimeUpdate,
+    onDeadline,
+    onJobUpdate,
   });
 
   // Update refs when callbacks change
   useEffect(() => {
     callbacksRef.current = {
+      onReviewDelta,
+      onTestResults,
       onReviewTriggered,
       onFinalReview,
       onPhaseUpdate,
       onTimeUpdate,
+      onDeadline,
+      onJobUpdate,
     };
-  }, [onReviewTriggered, onFinalReview, onPhaseUpdate, onTimeUpdate]);
+  }, [onReviewDelta, onTestResults, onReviewTriggered, onFinalReview, onPhaseUpdate, onTimeUpdate, onDeadline, onJobUpdate]);
 
   // Stable message handler that uses refs
   const messageHandler = useCallback<MessageHandler>((message: WSMessage) => {
@@ -46,6 +68,22 @@ export function useCodeSync(options: UsCodeSyncOptions) {
     switch (message.type) {
       case "connected":
         setIsConnected(true);
+        if (message.remaining_time !== null) {
+          callbacksRef.current.onTimeUpdate?.(message.remaining_time);
+        }
+        break;
+
+      case "review_delta":
+        callbacksRef.current.onReviewDelta?.(
+          message.review_id,
+          message.is_final,
+          message.section,
+          message.text
+        );
+        break;
+
+      case "test_results":
+        callbacksRef.current.onTestResults?.(message);
         break;
 
       case "review_triggered":
@@ -60,8 +98,23 @@ export function useCodeSync(options: UsCodeSyncOptions) {
         callbacksRef.current.onPhaseUpdate?.(message.phase);
         break;
 
+      case "time_update":
+        callbacksRef.current.onTimeUpdate?.(message.remaining);
+        break;
+
+      case "deadline":
+        callbacksRef.current.onTimeUpdate?.(message.remaining);
+        callbacksRef.current.onDeadline?.(message.event);
+        break;
+
+      case "job_update":
+        callbacksRef.current.onJobUpdate?.(message);
+        break;
+
       case "pong":
-        callbacksRef.current.onTimeUpdate?.(message.remaining_time);
+        if (message.remaining_time !== null) {
+          callbacksRef.current.onTimeUpdate?.(message.remaining_time);
+        }
         break;
 
       case "error":
@@ -104,8 +157,8 @@ export function useCodeSync(options: UsCodeSyncOptions) {
   }, [sessionId, messageHandler]); // Only reconnect if sessionId changes
 
   // Send code update
-  const sendCodeUpdate = useCallback((code: string, lineCount: number) => {
-    clientRef.current?.sendCodeUpdate(code, lineCount);
+  const sendCodeUpdate = useCallback((code: string) => {
+    clientRef.current?.sendCodeUpdate(code);
   }, []);
 
   // Send code complete
@@ -59,6 +59,14 @@ export function useInterview(options: UseInterviewOptions) {
     setCurrentPhase(phase);
   }, []);
 
+  // Correct local drift with the server's clock
+  const syncRemainingTime = useCallback(
+    (remaining: number) => {
+      setElapsedTime(Math.max(0, Math.round(duration - remaining)));
+    },
+    [duration]
+  );
+
   const endInterview = useCallback(() => {
     setIsInterviewActive(false);
   }, []);
@@ -81,6 +89,7 @@ export function useInterview(options: UseInterviewOptions) {
     addReview,
     updatePhase,
     endInterview,
+    syncRemainingTime,
     formatTime,
   };
 }
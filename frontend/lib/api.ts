@@ -2,7 +2,12 @@
  * API client for backend HTTP endpoints
  */
 
-import { Session, SessionResults } from "./types";
+import {
+  CodeHistoryEvent,
+  ProblemList,
+  Session,
+  SessionResults,
+} from "./types";
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -52,8 +57,65 @@ export class APIClient {
     return response.json();
   }
 
-  async listProblems(): Promise<any> {
-    const response = await fetch(`${this.baseUrl}/api/session/problems`);
+  /**
+   * Stream the candidate's code history for playback, calling onEvent for
+   * each keyframe or edit as it arrives.
+   */
+  async streamCodeHistory(
+    sessionId: string,
+    onEvent: (event: CodeHistoryEvent) => void
+  ): Promise<void> {
+    const response = await fetch(
+      `${this.baseUrl}/api/session/history/${sessionId}`
+    );
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to get code history: ${response.statusText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      buffered += decoder.decode(value, { stream: !done });
+      const lines = buffered.split("\n");
+      buffered = lines.pop() ?? "";
+      for (const line of lines) {
+        if (line) onEvent(JSON.parse(line));
+      }
+      if (done) break;
+    }
+  }
+
+  async getCodeAt(sessionId: string, t: number): Promise<string> {
+    const response = await fetch(
+      `${this.baseUrl}/api/session/history/${sessionId}/at?t=${t}`
+    );
+
+    if (!response.ok) {
+      throw new Error(`Failed to get code: ${response.statusText}`);
+    }
+
+    return (await response.json()).code;
+  }
+
+  async listProblems(
+    filters: {
+      offset?: number;
+      limit?: number;
+      difficulty?: string;
+      tag?: string;
+      q?: string;
+    } = {}
+  ): Promise<ProblemList> {
+    const params = new URLSearchParams();
+    for (const [key, value] of Object.entries(filters)) {
+      if (value !== undefined && value !== "") params.set(key, String(value));
+    }
+    const response = await fetch(
+      `${this.baseUrl}/api/session/problems?${params.toString()}`
+    );
 
     if (!response.ok) {
       throw new Error(`Failed to list problems: ${response.statusText}`);
@@ -4,6 +4,7 @@
  */
 
 import { WSMessage } from "./types";
+import { codeChecksum, computeEdit } from "./code-delta";
 
 export type MessageHandler = (message: WSMessage) => void;
 
@@ -15,6 +16,11 @@ export class BackendWSClient {
   private maxReconnectAttempts = 5;
   private reconnectDelay = 1000; // Start with 1 second
 
+  // Delta sync state: the text and revision the server is expected to hold
+  private syncedCode = "";
+  private revision = 0;
+  private awaitingResync = false;
+
   constructor(sessionId: string) {
     this.sessionId = sessionId;
   }
@@ -33,6 +39,7 @@ export class BackendWSClient {
         this.ws.onmessage = (event) => {
           try {
             const message: WSMessage = JSON.parse(event.data);
+            this.handleSyncMessage(message);
             this.messageHandlers.forEach((handler) => handler(message));
           } catch (error) {
             console.error("Failed to parse WebSocket message:", error);
@@ -82,14 +89,64 @@ export class BackendWSClient {
     this.messageHandlers.delete(handler);
   }
 
-  sendCodeUpdate(code: string, lineCount: number): void {
+  /**
+   * Send only the edited range of the buffer. Falls back to a full snapshot
+   * while a resync is pending.
+   */
+  sendCodeUpdate(code: string): void {
+    if (this.awaitingResync) {
+      this.sendCodeSnapshot(code);
+      return;
+    }
+
+    const edit = computeEdit(this.syncedCode, code);
+    if (!edit) return;
+
     this.send({
-      type: "code_update",
+      type: "code_delta",
+      base_revision: this.revision,
+      ops: [edit],
+      checksum: codeChecksum(code),
+    });
+    this.syncedCode = code;
+    this.revision++;
+  }
+
+  private sendCodeSnapshot(code: string): void {
+    this.revision++;
+    this.syncedCode = code;
+    this.send({
+      type: "code_snapshot",
       code,
-      line_count: lineCount,
+      revision: this.revision,
     });
   }
 
+  private handleSyncMessage(message: WSMessage): void {
+    switch (message.type) {
+      case "connected":
+        // Server starts from its stored copy of the code
+        this.revision = message.revision;
+        if (message.checksum !== codeChecksum(this.syncedCode)) {
+          this.awaitingResync = true;
+        }
+        break;
+
+      case "code_ack":
+        if (message.revision >= this.revision) {
+          this.awaitingResync = false;
+        }
+        break;
+
+      case "resync_required":
+        if (!this.awaitingResync) {
+          this.awaitingResync = true;
+          this.sendCodeSnapshot(this.syncedCode);
+        }
+        break;
+    }
+  }
+
   sendCodeComplete(): void {
     this.send({
       type: "code_complete",
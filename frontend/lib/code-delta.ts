@@ -0,0 +1,85 @@
+/**
+ * Helpers for the delta-based code sync protocol
+ */
+
+export interface CodeEdit {
+  start: number;
+  end: number;
+  text: string;
+}
+
+let crcTable: Uint32Array | null = null;
+
+function getCrcTable(): Uint32Array {
+  if (crcTable) return crcTable;
+
+  crcTable = new Uint32Array(256);
+  for (let n = 0; n < 256; n++) {
+    let c = n;
+    for (let k = 0; k < 8; k++) {
+      c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+    }
+    crcTable[n] = c >>> 0;
+  }
+  return crcTable;
+}
+
+/**
+ * CRC32 of the UTF-8 encoded text (matches zlib.crc32 on the backend)
+ */
+export function codeChecksum(text: string): number {
+  const table = getCrcTable();
+  const bytes = new TextEncoder().encode(text);
+  let crc = 0xffffffff;
+  for (let i = 0; i < bytes.length; i++) {
+    crc = table[(crc ^ bytes[i]) & 0xff] ^ (crc >>> 8);
+  }
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+function isHighSurrogate(text: string, index: number): boolean {
+  const unit = text.charCodeAt(index);
+  return unit >= 0xd800 && unit <= 0xdbff;
+}
+
+function isLowSurrogate(text: string, index: number): boolean {
+  const unit = text.charCodeAt(index);
+  return unit >= 0xdc00 && unit <= 0xdfff;
+}
+
+/**
+ * Compute a single range-replace edit turning `previous` into `next`.
+ * Offsets are UTF-16 code units, but never split a surrogate pair (the
+ * server works in code points). Returns null if nothing changed.
+ */
+export function computeEdit(previous: string, next: string): CodeEdit | null {
+  if (previous === next) return null;
+
+  const maxPrefix = Math.min(previous.length, next.length);
+  let prefix = 0;
+  while (prefix < maxPrefix && previous[prefix] === next[prefix]) {
+    prefix++;
+  }
+  // Emoji that share a high surrogate differ only in the low one
+  if (prefix > 0 && isHighSurrogate(previous, prefix - 1)) {
+    prefix--;
+  }
+
+  const maxSuffix = maxPrefix - prefix;
+  let suffix = 0;
+  while (
+    suffix < maxSuffix &&
+    previous[previous.length - 1 - suffix] === next[next.length - 1 - suffix]
+  ) {
+    suffix++;
+  }
+  if (suffix > 0 && isLowSurrogate(previous, previous.length - suffix)) {
+    suffix--;
+  }
+
+  return {
+    start: prefix,
+    end: previous.length - suffix,
+    text: next.slice(prefix, next.length - suffix),
+  };
+}
@@ -16,6 +16,20 @@ export interface Problem {
   hints?: string[];
 }
 
+export interface ProblemSummary {
+  id: string;
+  title: string;
+  difficulty: string;
+  tags: string[];
+}
+
+export interface ProblemList {
+  problems: ProblemSummary[];
+  total: number;
+  offset: number;
+  limit: number;
+}
+
 export interface Example {
   input: string;
   output: string;
@@ -39,6 +53,19 @@ export enum InterviewPhase {
   COMPLETE = "complete",
 }
 
+// Complexity measured by timing the solution at increasing input sizes
+export interface ComplexityEstimate {
+  time_complexity: string | null;
+  exponent: number | null;
+  reference_time_complexity: string | null;
+  slowdown: number | null;
+  is_optimal: boolean | null;
+  sizes: number[];
+  timings_ms: number[];
+  timed_out: boolean;
+  error: string | null;
+}
+
 export interface CodeReview {
   line_count: number;
   feedback: string;
@@ -48,6 +75,7 @@ export interface CodeReview {
   time_complexity?: string;
   space_complexity?: string;
   is_optimal?: boolean;
+  complexity_estimate?: ComplexityEstimate | null;
 }
 
 export interface FinalRatings {
@@ -72,15 +100,76 @@ export interface SessionResults {
     concerns: string[];
   };
   final_ratings: FinalRatings | null;
+  // Set once the report is materialized (the interview reached evaluation)
+  version?: number;
+  materialized_at?: number;
+}
+
+// One step of the candidate's code history; offsets are in code points
+export type CodeHistoryEvent =
+  | { type: "keyframe"; t: number; code: string }
+  | { type: "edit"; t: number; start: number; end: number; text: string };
+
+export interface TestCaseResult {
+  input: string;
+  expected: unknown;
+  actual: unknown;
+  passed: boolean;
+  error: string | null;
+  duration_ms: number;
+}
+
+// Outcome of running the code against the problem's examples in the backend sandbox
+export interface TestRunResult {
+  passed: number;
+  total: number;
+  results: TestCaseResult[];
+  error: string | null;
+  duration_ms: number;
+}
+
+export type ReviewSection =
+  | "feedback"
+  | "bugs"
+  | "suggestions"
+  | "time_complexity"
+  | "space_complexity"
+  | "is_optimal";
+
+// Review being streamed from the backend, built up from review_delta messages
+export interface DraftReview {
+  review_id: number;
+  is_final: boolean;
+  feedback: string;
+  bugs: string[];
+  suggestions: string[];
+}
+
+// Background job status, as pushed in job_update messages and listed by /api/session/jobs
+export type JobStatus = "queued" | "running" | "succeeded" | "failed";
+
+export interface JobUpdate {
+  job_id: number;
+  kind: string;
+  status: JobStatus;
+  attempts: number;
+  error: string | null;
 }
 
 // WebSocket message types
 export type WSMessage =
-  | { type: "connected"; session_id: string; phase: string }
+  | { type: "connected"; session_id: string; phase: string; revision: number; checksum: number; codec: string; remaining_time: number | null }
+  | { type: "code_ack"; revision: number }
+  | { type: "resync_required"; revision: number; reason: string }
+  | { type: "review_delta"; review_id: number; is_final: boolean; section: ReviewSection; text: string }
+  | ({ type: "test_results"; revision: number } & TestRunResult)
   | { type: "review_triggered"; line_count: number; review: CodeReview }
   | { type: "final_review"; review: CodeReview }
   | { type: "phase_updated"; phase: string }
-  | { type: "pong"; remaining_time: number }
+  | { type: "time_update"; remaining: number }
+  | { type: "deadline"; event: "wrap_up" | "expired"; remaining: number }
+  | ({ type: "job_update" } & JobUpdate)
+  | { type: "pong"; remaining_time: number | null }
   | { type: "error"; message: string };
 
 export interface RealtimeConfig {